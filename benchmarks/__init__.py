@@ -0,0 +1,4 @@
+"""
+Performance Benchmarks
+Times the core modules on synthetic waveforms; run with `python -m benchmarks`
+"""
@@ -0,0 +1,62 @@
+"""
+Benchmark Command Line (run from the repository root)
+
+    python -m benchmarks                                  # Run all, write benchmark_results.json
+    python -m benchmarks --quick -k auto_picker           # Up to 10^5 samples, picker benchmarks only
+    python -m benchmarks --output benchmarks/baseline.json    # Store a baseline
+    python -m benchmarks --compare benchmarks/baseline.json   # Exit with 1 on regressions
+"""
+
+import argparse
+import sys
+
+from benchmarks.suite import (
+    DEFAULT_REPEAT,
+    DEFAULT_TOLERANCE,
+    compare,
+    load_results,
+    run_benchmarks,
+    save_results
+)
+
+QUICK_MAX_SIZE = 10**5
+
+def main(argv=None):
+    """Runs the benchmarks, saves the results and compares them with a baseline"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='P-wave picker performance benchmarks')
+    parser.add_argument('-k', dest='pattern', help='only run benchmarks whose name contains PATTERN')
+    parser.add_argument('--max-size', type=int, help='skip sizes above MAX_SIZE')
+    parser.add_argument('--quick', action='store_true', help=f'same as --max-size {QUICK_MAX_SIZE}')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='maximum runs per benchmark size')
+    parser.add_argument('--output', default='benchmark_results.json', help='results JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown before a regression is reported')
+    args = parser.parse_args(argv)
+
+    max_size = QUICK_MAX_SIZE if args.quick and args.max_size is None else args.max_size
+
+    def report(key, entry):
+        error = '' if entry['pick_error'] is None else f"  pick error {entry['pick_error']:.3f} s"
+        print(f"{key:<55} {entry['median'] * 1e3:12.3f} ms  ({entry['runs']} runs){error}", flush=True)
+
+    results = run_benchmarks(args.pattern, max_size, args.repeat, report)
+    save_results(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.tolerance)
+        for regression in regressions:
+            if regression['kind'] == 'time':
+                print(f"REGRESSION {regression['key']}: {regression['baseline'] * 1e3:.3f} ms -> "
+                      f"{regression['current'] * 1e3:.3f} ms ({regression['ratio']:.2f}x)")
+            else:
+                current = 'no pick' if regression['current'] is None else f"{regression['current']:.3f} s"
+                print(f"REGRESSION {regression['key']}: pick error {regression['baseline']:.3f} s -> {current}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
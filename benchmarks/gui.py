@@ -0,0 +1,268 @@
+"""
+GUI Rendering Benchmarks
+Frame times of PlotWidget interactions on the Agg backend, without a display
+
+    python -m benchmarks.gui                                   # Write gui_benchmark_results.json
+    python -m benchmarks.gui --sizes 100000 --picks 1 100 -k zoom
+    python -m benchmarks.gui --compare gui_baseline.json       # Exit with 1 on regressions
+"""
+
+import argparse
+import copy
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from tkinter import ttk
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from config.constants import DEFAULT_PARAMS
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.waveform_pyramid import PyramidCache
+from gui.event_bus import EventBus
+from gui.plot_widget import PlotWidget
+from benchmarks.suite import DEFAULT_TOLERANCE, compare, load_results, save_results
+from benchmarks.synthetic import make_trace
+
+GUI_TRACE_SIZES = (10**4, 10**5, 10**6, 10**7)  # Samples per trace
+GUI_PICK_COUNTS = (1, 100, 10**4)  # Picks per file
+DEFAULT_FRAMES = 30
+FRAME_BUDGET = 10.0  # Seconds spent on one operation before it stops early
+
+class _DetachedFrame(ttk.Frame):
+    """Stands in for ttk.Frame so that PlotWidget can be built without a Tk interpreter"""
+
+    def __init__(self, parent=None):
+        """Nothing to initialize: the widget is never packed or shown"""
+
+class HeadlessPlotWidget(PlotWidget, _DetachedFrame):
+    """PlotWidget drawing to an Agg canvas
+
+    draw_idle renders synchronously on Agg, so the time of a call is its frame time.
+    Pyramid results are delivered by draining the event bus explicitly.
+    """
+
+    def __init__(self, file_manager, pick_manager, cache_dir: str):
+        """
+        Initializes the widget with default settings
+
+        Args:
+            file_manager: File manager
+            pick_manager: Pick manager holding the picks to draw
+            cache_dir: Directory of the waveform pyramid cache
+        """
+        super().__init__(None, file_manager, pick_manager, event_bus=EventBus(None))
+        self.settings.settings = copy.deepcopy(DEFAULT_PARAMS)
+        self.pyramid_cache.close()
+        self.pyramid_cache = PyramidCache(cache_dir)
+
+    def _create_canvas(self):
+        """Agg canvas instead of the Tk canvas"""
+        return FigureCanvasAgg(self.figure)
+
+    def wait_for_pyramids(self):
+        """Wait for pending pyramid builds and apply their results"""
+        self.pyramid_cache._executor.submit(lambda: None).result()
+        self.event_bus.drain()
+
+    def show(self, trace, file_path):
+        """Show a file at the initial zoom, as after opening it"""
+        self.zoom_level = 1.0
+        self.pan_offset = 0.0
+        self.plot_trace(trace, file_path)
+        self.update_view()
+
+# Operations: (widget, scene, frame index) -> None; one call is one frame
+
+def _plot_trace(widget, scene, i):
+    """Switch between two open files"""
+    widget.plot_trace(scene.traces[i % 2], scene.files[i % 2])
+
+def _update_view(widget, scene, i):
+    """Redraw the current view"""
+    widget.update_view()
+
+def _zoom(widget, scene, i):
+    """Zoom in five steps, then out five steps"""
+    if i % 10 < 5:
+        widget.zoom_in()
+    else:
+        widget.zoom_out()
+
+def _pan(widget, scene, i):
+    """Pan by a tenth of the trace, five steps each way"""
+    step = scene.duration / 10
+    widget.pan(SimpleNamespace(x=0.0, xdata=step if i % 10 < 5 else -step))
+
+def _add_pick(widget, scene, i):
+    """Add a pick to the current file"""
+    pick = widget.pick_manager.create_pick(scene.duration * ((i * 0.618) % 1.0), 'B')
+    widget.pick_manager.add_pick(scene.files[0], pick)
+    widget.add_pick(pick)
+
+def _select_pick(widget, scene, i):
+    """Change the selected pick"""
+    picks = widget.pick_manager.get_picks_for_file(scene.files[0])
+    widget.update_picks(picks[(i * 7919) % len(picks)])
+
+OPERATIONS: Dict[str, Callable[[HeadlessPlotWidget, SimpleNamespace, int], None]] = {
+    'plot_trace': _plot_trace,
+    'update_view': _update_view,
+    'zoom': _zoom,
+    'pan': _pan,
+    'add_pick': _add_pick,
+    'select_pick': _select_pick
+}
+
+def _scene(size: int, work_dir: str) -> SimpleNamespace:
+    """Two files of `size` samples with their traces"""
+    files, traces = [], []
+    for i in range(2):
+        trace, _ = make_trace(size, seed=i, station=f'GUI{i}')
+        trace.data = trace.data.astype(np.float64)
+        path = os.path.join(work_dir, f'XX.GUI{i}.evid.{size}.mseed')
+        trace.write(path, format='MSEED')
+        files.append(path)
+        traces.append(trace)
+    return SimpleNamespace(files=files, traces=traces, duration=(size - 1) / traces[0].stats.sampling_rate)
+
+def _picks(scene: SimpleNamespace, n_picks: int) -> PickManager:
+    """Pick manager with n_picks picks spread over each file"""
+    pick_manager = PickManager(store_path='')
+    times = np.linspace(0.0, scene.duration, n_picks + 2)[1:-1]
+    pick_manager.add_picks({path: [pick_manager.create_pick(float(t), 'ABC'[j % 3]) for j, t in enumerate(times)]
+                            for path in scene.files})
+    return pick_manager
+
+def frame_times(widget: HeadlessPlotWidget, scene: SimpleNamespace, operation: Callable, frames: int = DEFAULT_FRAMES,
+                budget: float = FRAME_BUDGET) -> List[float]:
+    """
+    Times the frames of one operation, starting from the opened first file
+
+    Args:
+        widget: Widget showing the scene
+        scene: Files and traces
+        operation: Operation to repeat
+        frames: Number of frames
+        budget: Stop early once the frames took this long (s); at least one frame is timed
+
+    Returns:
+        Frame times in seconds
+    """
+    widget.show(scene.traces[0], scene.files[0])
+    operation(widget, scene, 0)  # Warm-up frame
+    times = []
+    for i in range(1, frames + 1):
+        start = time.perf_counter()
+        operation(widget, scene, i)
+        times.append(time.perf_counter() - start)
+        if sum(times) >= budget:
+            break
+    return times
+
+def run_gui_benchmarks(sizes: Iterable[int] = GUI_TRACE_SIZES, pick_counts: Iterable[int] = GUI_PICK_COUNTS,
+                       pattern: Optional[str] = None, frames: int = DEFAULT_FRAMES,
+                       progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Runs every operation for each trace size and pick count
+
+    Args:
+        sizes: Trace lengths (samples)
+        pick_counts: Picks per file
+        pattern: Only run operations whose name contains this
+        frames: Frames per operation
+        progress: Called with (key, entry) after each operation
+
+    Returns:
+        {'meta': {...}, 'results': {key: entry}}; an entry has p50/p95/max/mean frame
+        times (s), with 'median' equal to p50 for benchmarks.suite.compare
+    """
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='p_wave_gui_benchmarks_')
+    try:
+        for size in sizes:
+            scene = _scene(size, work_dir)
+            for n_picks in pick_counts:
+                widget = HeadlessPlotWidget(FileManager(), _picks(scene, n_picks), work_dir)
+                for trace, path in zip(scene.traces, scene.files):  # Pyramids are built once, as on first open
+                    widget.plot_trace(trace, path)
+                    widget.wait_for_pyramids()
+                for name, operation in OPERATIONS.items():
+                    if pattern and pattern not in name:
+                        continue
+                    times = frame_times(widget, scene, operation, frames)
+                    key = f"plot_widget.{name}[{size}x{n_picks}]"
+                    entry = {
+                        'name': f"plot_widget.{name}",
+                        'size': size,
+                        'picks': n_picks,
+                        'frames': len(times),
+                        'p50': float(np.percentile(times, 50)),
+                        'p95': float(np.percentile(times, 95)),
+                        'max': max(times),
+                        'mean': float(np.mean(times)),
+                        'median': float(np.percentile(times, 50))
+                    }
+                    results[key] = entry
+                    if progress:
+                        progress(key, entry)
+                widget.pyramid_cache.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'matplotlib': matplotlib.__version__,
+            'backend': 'Agg',
+            'figure_size': [800, 600],
+            'frames': frames
+        },
+        'results': results
+    }
+
+def main(argv=None):
+    """Runs the GUI benchmarks, saves the results and compares them with a baseline"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.gui', description='PlotWidget frame time benchmarks')
+    parser.add_argument('-k', dest='pattern', help='only run operations whose name contains PATTERN')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(GUI_TRACE_SIZES), help='trace lengths (samples)')
+    parser.add_argument('--picks', type=int, nargs='+', default=list(GUI_PICK_COUNTS), help='picks per file')
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help='frames per operation')
+    parser.add_argument('--output', default='gui_benchmark_results.json', help='results JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='baseline JSON file to compare p50 frame times against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown before a regression is reported')
+    args = parser.parse_args(argv)
+
+    def report(key, entry):
+        print(f"{key:<45} p50 {entry['p50'] * 1e3:10.2f} ms   p95 {entry['p95'] * 1e3:10.2f} ms   "
+              f"({entry['frames']} frames)", flush=True)
+
+    results = run_gui_benchmarks(args.sizes, args.picks, args.pattern, args.frames, report)
+    save_results(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['key']}: p50 {regression['baseline'] * 1e3:.2f} ms -> "
+                  f"{regression['current'] * 1e3:.2f} ms ({regression['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
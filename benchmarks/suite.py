@@ -0,0 +1,393 @@
+"""
+Benchmark Suite
+Benchmark registry, timing runner and comparison against a stored baseline
+"""
+
+import copy
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import obspy
+
+from config.constants import DEFAULT_PARAMS
+from core.auto_picker import AutoPicker
+from core.batch_processor import BatchProcessor
+from core.data_exporter import DataExporter, pa
+from core.file_manager import FileManager
+from core.mseed_index import MseedIndexCache
+from core.pick_manager import PickManager
+from core.waveform_processor import ProcessingPlan
+from benchmarks.synthetic import SYNTHETIC_STARTTIME, make_trace, write_event_files
+
+WAVEFORM_SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)  # Samples per trace
+PICK_SIZES = (10**3, 10**4, 10**5)  # Picks
+BATCH_SIZES = (10, 100)  # Files of 60 s
+BATCH_FILE_SAMPLES = 6000
+STATIONS_PER_EVENT = 5
+MIXED_LARGE_FACTOR = 20  # The last event of the mixed-size batch has files this much longer
+
+DEFAULT_REPEAT = 5
+TIME_BUDGET = 5.0  # Seconds spent repeating one benchmark after its first run
+DEFAULT_TOLERANCE = 0.25  # Allowed slowdown before a benchmark is flagged
+MIN_TIME_DELTA = 1e-3  # Slowdowns smaller than this (s) are timer noise
+PICK_ERROR_TOLERANCE = 0.1  # Allowed increase of the pick error (s)
+
+# Setup functions: (size, work directory) -> (timed callable, result -> pick error in s or None)
+Setup = Callable[[int, str], Tuple[Callable[[], Any], Optional[Callable[[Any], Optional[float]]]]]
+
+class Benchmark:
+    """One timed operation, run at several sizes"""
+
+    def __init__(self, name: str, setup: Setup, sizes: Iterable[int], unit: str, max_size: Optional[int] = None):
+        """
+        Initializes the benchmark
+
+        Args:
+            name: Benchmark name (module.operation)
+            setup: Prepares the inputs of one size and returns the timed callable
+            sizes: Input sizes
+            unit: What the size counts ('samples', 'picks' or 'files')
+            max_size: Largest size worth running (e.g. for per-sample Python loops)
+        """
+        self.name = name
+        self.setup = setup
+        self.sizes = tuple(size for size in sizes if max_size is None or size <= max_size)
+        self.unit = unit
+
+BENCHMARKS: List[Benchmark] = []
+
+def benchmark(name: str, sizes: Iterable[int], unit: str = 'samples', max_size: Optional[int] = None):
+    """Registers a setup function as a benchmark"""
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(name, setup, sizes, unit, max_size))
+        return setup
+    return register
+
+def _default_settings(obj, work_dir: str):
+    """Replaces the user's settings of a component with the defaults, caching under work_dir"""
+    obj.settings.settings = copy.deepcopy(DEFAULT_PARAMS)
+    obj.settings.settings['storage']['cache_dir'] = work_dir
+    obj.settings.save_settings = lambda settings=None: True  # Never overwrite the user's settings file
+    if isinstance(obj, FileManager):
+        obj.mseed_indexes = MseedIndexCache(work_dir)
+    return obj
+
+def _float_trace(size: int):
+    """Preprocessed-like float trace and its onset"""
+    trace, onset = make_trace(size)
+    trace.data = trace.data.astype(np.float64)
+    return trace, onset
+
+def _picks(size: int) -> PickManager:
+    """Pick manager holding `size` picks, 10 per file"""
+    pick_manager = PickManager(store_path='')
+    pick_manager.add_picks({f'/data/XX.STA{i:05d}.evid.{i}.mseed':
+                            [pick_manager.create_pick(float(j), 'ABC'[j % 3]) for j in range(10)]
+                            for i in range(size // 10)})
+    return pick_manager
+
+def _pick_dicts(size: int) -> List[Dict[str, Any]]:
+    """Export rows for `size` picks"""
+    return [{'filename': f'XX.STA{i % 500:03d}.evid.{i}.mseed', 'network': 'XX', 'station': f'STA{i % 500:03d}',
+             'location': '', 'channel': 'HHZ', 'pick_time': i * 0.01, 'quality': i % 3, 'snr': 10.0,
+             'offset': 0.0} for i in range(size)]
+
+# --- Automatic picking ---
+
+@benchmark('auto_picker.pick_sta_lta', WAVEFORM_SIZES)
+def _pick_sta_lta(size, work_dir):
+    """Classic STA/LTA over the whole trace"""
+    trace, onset = _float_trace(size)
+    picker = AutoPicker()
+    return (lambda: picker.pick_sta_lta(trace)), (lambda pick: None if pick is None else abs(pick - onset))
+
+@benchmark('auto_picker.pick_sta_lta_recursive', WAVEFORM_SIZES)
+def _pick_sta_lta_recursive(size, work_dir):
+    """Recursive STA/LTA over the whole trace"""
+    trace, onset = _float_trace(size)
+    picker = AutoPicker()
+    return ((lambda: picker.pick_sta_lta(trace, algorithm='recursive')),
+            (lambda pick: None if pick is None else abs(pick - onset)))
+
+@benchmark('auto_picker.pick_energy_ratio', WAVEFORM_SIZES, max_size=10**5)
+def _pick_energy_ratio(size, work_dir):
+    """Sliding energy ratio (per-sample loop)"""
+    trace, onset = _float_trace(size)
+    picker = AutoPicker()
+    return (lambda: picker.pick_energy_ratio(trace)), (lambda pick: None if pick is None else abs(pick - onset))
+
+@benchmark('auto_picker.pick_ar_aic', WAVEFORM_SIZES, max_size=10**4)
+def _pick_ar_aic(size, work_dir):
+    """AR-AIC (per-sample polynomial fits)"""
+    trace, onset = _float_trace(size)
+    picker = AutoPicker()
+
+    def run():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # Ill-conditioned fits on short windows
+            return picker.pick_ar_aic(trace)
+    return run, (lambda pick: None if pick is None else abs(pick - onset))
+
+@benchmark('auto_picker.evaluate_signal_quality', WAVEFORM_SIZES)
+def _evaluate_signal_quality(size, work_dir):
+    """SNR-based quality"""
+    trace, _ = _float_trace(size)
+    picker = AutoPicker()
+    return (lambda: picker.evaluate_signal_quality(trace)), None
+
+@benchmark('batch_processor.auto_pick', WAVEFORM_SIZES)
+def _batch_auto_pick(size, work_dir):
+    """STA/LTA picker of the batch processor"""
+    trace, onset = _float_trace(size)
+    processor = BatchProcessor(_default_settings(FileManager(), work_dir), PickManager(store_path=''))
+    return ((lambda: processor._auto_pick(trace)),
+            (lambda pick: None if pick is None else abs(pick - trace.stats.starttime - onset)))
+
+# --- Files and preprocessing ---
+
+@benchmark('file_manager.load_file', WAVEFORM_SIZES)
+def _load_file(size, work_dir):
+    """Read and preprocess a whole MiniSEED file"""
+    path = os.path.join(work_dir, f'XX.SYN.evid.{size}.mseed')
+    make_trace(size)[0].write(path, format='MSEED')
+    file_manager = _default_settings(FileManager(), work_dir)
+    return (lambda: file_manager.load_file(path)), None
+
+@benchmark('file_manager.load_file_window', WAVEFORM_SIZES)
+def _load_file_window(size, work_dir):
+    """Read and preprocess 40 s around the onset through the record index"""
+    path = os.path.join(work_dir, f'XX.SYN.evid.{size}.mseed')
+    trace, onset = make_trace(size)
+    trace.write(path, format='MSEED')
+    file_manager = _default_settings(FileManager(), work_dir)
+    start = SYNTHETIC_STARTTIME + max(onset - 10.0, 0.0)
+    file_manager.load_file(path, start, start + 40.0)  # Builds the index
+    return (lambda: file_manager.load_file(path, start, start + 40.0)), None
+
+@benchmark('waveform_processor.process', WAVEFORM_SIZES)
+def _process(size, work_dir):
+    """Default preprocessing plan on an integer trace"""
+    trace, _ = make_trace(size)
+    file_manager = _default_settings(FileManager(), work_dir)
+    plan = ProcessingPlan.from_settings(file_manager.settings)
+    return (lambda: file_manager.processor.process(trace.copy(), plan)), None
+
+# --- Picks ---
+
+@benchmark('pick_manager.add_picks', PICK_SIZES, unit='picks')
+def _add_picks(size, work_dir):
+    """Add picks in one transaction"""
+    return (lambda: _picks(size)), None
+
+@benchmark('pick_manager.find_nearest_pick', PICK_SIZES, unit='picks')
+def _find_nearest_pick(size, work_dir):
+    """One nearest-pick lookup per pick"""
+    pick_manager = _picks(size)
+    files = list(pick_manager.picks_by_file)
+
+    def run():
+        for i in range(size):
+            pick_manager.find_nearest_pick(files[i % len(files)], (i % 10) + 0.05)
+    return run, None
+
+@benchmark('pick_manager.save_picks', PICK_SIZES, unit='picks')
+def _save_picks(size, work_dir):
+    """Save all picks to CSV"""
+    pick_manager = _picks(size)
+    path = os.path.join(work_dir, 'picks.csv')
+    return (lambda: pick_manager.save_picks(None, path)), None
+
+def _export(format):
+    """Setup of the export benchmark of one format"""
+    def setup(size, work_dir):
+        """Export picks in one format"""
+        exporter = DataExporter()
+        picks = _pick_dicts(size)
+        path = os.path.join(work_dir, f'picks.{format}')
+        return (lambda: exporter.export_picks(picks, path, format)), None
+    return setup
+
+for _format in ('csv', 'json', 'ndjson') + (('parquet',) if pa is not None else ()):
+    benchmark(f'data_exporter.export_picks_{_format}', PICK_SIZES, unit='picks')(_export(_format))
+
+# --- Batch processing ---
+
+def _batch(group_by_event, mixed=False):
+    """Setup of the batch benchmark in file or event mode, optionally ending with one long event"""
+    def setup(size, work_dir):
+        """Auto-pick a directory of synthetic events end to end"""
+        data_dir = os.path.join(work_dir, f'batch_{size}_{int(mixed)}')
+        os.makedirs(data_dir, exist_ok=True)
+        n_events = max(size // STATIONS_PER_EVENT, 1)
+        files, onsets = write_event_files(data_dir, n_events - mixed, STATIONS_PER_EVENT, BATCH_FILE_SAMPLES)
+        if mixed:
+            # Listed last, like a large file late in directory order
+            large_files, large_onsets = write_event_files(data_dir, 1, STATIONS_PER_EVENT,
+                                                          BATCH_FILE_SAMPLES * MIXED_LARGE_FACTOR,
+                                                          first_event=1000 + n_events)
+            files, onsets = files + large_files, onsets + large_onsets
+        processor = BatchProcessor(_default_settings(FileManager(), work_dir), None)
+        _default_settings(processor, work_dir)
+
+        def run():
+            processor.pick_manager = PickManager(store_path='')
+            done = threading.Event()
+            cwd = os.getcwd()
+            os.chdir(work_dir)  # The progress file goes to the working directory
+            try:
+                processor.process_batch(files, mode='auto', done_callback=lambda summary: done.set(),
+                                        group_by_event=group_by_event)
+                done.wait()
+            finally:
+                os.chdir(cwd)
+            return processor.pick_manager
+
+        def pick_error(pick_manager):
+            errors = []
+            for path, onset in zip(files, onsets):
+                picks = pick_manager.get_picks_for_file(path)
+                if picks:
+                    errors.append(abs(picks[0].time - onset))
+            return float(np.mean(errors)) if errors else None
+        return run, pick_error
+    return setup
+
+benchmark('batch_processor.process_batch', BATCH_SIZES, unit='files')(_batch(False))
+benchmark('batch_processor.process_batch_events', BATCH_SIZES, unit='files')(_batch(True))
+benchmark('batch_processor.process_batch_events_mixed', BATCH_SIZES, unit='files')(_batch(True, mixed=True))
+
+# --- Runner ---
+
+def measure(run: Callable[[], Any], repeat: int = DEFAULT_REPEAT, budget: float = TIME_BUDGET) -> Tuple[List[float], Any]:
+    """
+    Times a callable after one untimed warm-up run (lazy imports, caches, page cache)
+
+    Args:
+        run: Callable to time
+        repeat: Maximum number of runs
+        budget: Stop repeating once the runs took this long (s); at least one run is made
+
+    Returns:
+        (run times in seconds, result of the last run)
+    """
+    result = run()
+    times = []
+    while len(times) < repeat and (not times or sum(times) < budget):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+def result_key(name: str, size: int) -> str:
+    """Key of one benchmark size in the results"""
+    return f"{name}[{size}]"
+
+def run_benchmarks(pattern: Optional[str] = None, max_size: Optional[int] = None, repeat: int = DEFAULT_REPEAT,
+                   progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Runs the registered benchmarks
+
+    Args:
+        pattern: Only run benchmarks whose name contains this
+        max_size: Skip sizes above this
+        repeat: Maximum runs per benchmark size
+        progress: Called with (key, entry) after each benchmark size
+
+    Returns:
+        {'meta': {...}, 'results': {key: entry}}; an entry has the benchmark name, size,
+        unit, min/median/mean times (s), runs and pick error (s, or None)
+    """
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='p_wave_benchmarks_')
+    try:
+        for bench in BENCHMARKS:
+            if pattern and pattern not in bench.name:
+                continue
+            for size in bench.sizes:
+                if max_size is not None and size > max_size:
+                    continue
+                run, check = bench.setup(size, work_dir)
+                times, result = measure(run, repeat)
+                entry = {
+                    'name': bench.name,
+                    'size': size,
+                    'unit': bench.unit,
+                    'min': min(times),
+                    'median': float(np.median(times)),
+                    'mean': float(np.mean(times)),
+                    'runs': len(times),
+                    'pick_error': check(result) if check else None
+                }
+                results[result_key(bench.name, size)] = entry
+                if progress:
+                    progress(result_key(bench.name, size), entry)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'obspy': obspy.__version__,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE,
+            min_delta: float = MIN_TIME_DELTA) -> List[Dict[str, Any]]:
+    """
+    Finds regressions against a baseline
+
+    Median times are compared; a benchmark regresses if it is more than `tolerance`
+    slower and at least `min_delta` seconds slower, or if its pick error grew by more
+    than PICK_ERROR_TOLERANCE (or it stopped picking).
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Stored output of run_benchmarks
+        tolerance: Allowed relative slowdown
+        min_delta: Smallest slowdown (s) that counts
+
+    Returns:
+        Regressions as {'key', 'kind' ('time' or 'pick_error'), 'baseline', 'current', 'ratio'}
+    """
+    regressions = []
+    for key, entry in results.get('results', {}).items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None:
+            continue
+        current, previous = entry['median'], reference['median']
+        if current > previous * (1 + tolerance) and current - previous >= min_delta:
+            regressions.append({'key': key, 'kind': 'time', 'baseline': previous, 'current': current,
+                                'ratio': current / previous if previous else float('inf')})
+        error, previous_error = entry.get('pick_error'), reference.get('pick_error')
+        if previous_error is not None and (error is None or error > previous_error + PICK_ERROR_TOLERANCE):
+            regressions.append({'key': key, 'kind': 'pick_error', 'baseline': previous_error, 'current': error,
+                                'ratio': None})
+    return regressions
+
+def save_results(results: Dict[str, Any], path: str):
+    """Writes results to a JSON file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Reads results written by save_results"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
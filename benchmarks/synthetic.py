@@ -0,0 +1,67 @@
+"""
+Synthetic Waveforms
+Noise traces with a P onset at a known time, for benchmarks and tests
+"""
+
+import os
+import numpy as np
+from typing import List, Optional, Tuple
+from obspy import Trace, UTCDateTime
+
+SYNTHETIC_STARTTIME = UTCDateTime(2020, 1, 1)
+
+def make_trace(npts: int, sampling_rate: float = 100.0, onset: Optional[float] = None,
+               amplitude: float = 20.0, seed: int = 0, station: str = 'SYN') -> Tuple[Trace, float]:
+    """
+    Gaussian noise with a decaying oscillation starting at the onset
+
+    Args:
+        npts: Number of samples
+        sampling_rate: Sampling rate (Hz)
+        onset: Onset time from the trace start (s); defaults to 60% of the trace
+        amplitude: Signal amplitude relative to the noise
+        seed: Random seed
+        station: Station code
+
+    Returns:
+        (integer trace, onset time in seconds from the trace start)
+    """
+    rng = np.random.default_rng(seed)
+    if onset is None:
+        onset = round(0.6 * npts) / sampling_rate
+    data = rng.normal(0.0, 100.0, npts)
+    start = int(round(onset * sampling_rate))
+    t = np.arange(npts - start) / sampling_rate
+    data[start:] += amplitude * 100.0 * np.exp(-t / 20.0) * np.sin(2 * np.pi * 5.0 * t)
+    trace = Trace(data=data.astype(np.int32), header={
+        'network': 'XX', 'station': station, 'channel': 'HHZ',
+        'sampling_rate': sampling_rate, 'starttime': SYNTHETIC_STARTTIME})
+    return trace, start / sampling_rate
+
+def write_event_files(directory: str, n_events: int, n_stations: int, npts: int,
+                      sampling_rate: float = 100.0, first_event: int = 1000) -> Tuple[List[str], List[float]]:
+    """
+    Writes one MiniSEED file per event and station (XX.STAnnn.evid.ID.mseed)
+
+    Args:
+        directory: Output directory
+        n_events: Number of events
+        n_stations: Stations per event
+        npts: Samples per file
+        sampling_rate: Sampling rate (Hz)
+        first_event: ID of the first event
+
+    Returns:
+        (file paths, onset of each file in seconds from its start)
+    """
+    files, onsets = [], []
+    for event in range(n_events):
+        for station in range(n_stations):
+            seed = event * n_stations + station
+            onset = (0.4 + 0.3 * ((seed * 7919) % 100) / 100.0) * npts / sampling_rate
+            trace, onset = make_trace(npts, sampling_rate, onset, seed=seed, station=f'STA{station:03d}')
+            path = os.path.join(directory, f'XX.STA{station:03d}.evid.{first_event + event}.mseed')
+            trace.write(path, format='MSEED')
+            files.append(path)
+            onsets.append(onset)
+    return files, onsets
@@ -14,8 +14,63 @@ SUPPORTED_EXTENSIONS = {
     '.sac': 'SAC Format'
 }
 MAX_FILES_PER_BATCH = 1000
+BATCH_EVENT_WORKERS = 4  # Events processed in parallel in event-grouped batches
+BATCH_TASKS_PER_WORKER = 4  # Events costlier than total/(workers * this) are split into smaller tasks
 PROGRESS_FILE = 'progress.json'
 
+# Stage Timing
+STAGE_HISTOGRAM_RANGE = (1e-5, 1e3)  # Per-file stage durations binned (s)
+STAGE_HISTOGRAM_BINS_PER_DECADE = 5
+
+# Batch Metrics
+METRICS_PREFIX = 'p_wave_batch_'  # Prefix of the exposed metric names
+METRICS_INTERVAL = 5.0  # Seconds between rewrites of the metrics file
+METRICS_RATE_WINDOW = 60.0  # Seconds over which files/s and picks/s are computed
+METRICS_HOST = '127.0.0.1'  # The endpoint only listens locally by default
+
+# Logging
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVEL = 'INFO'
+
+# Pick Store
+PICK_STORE_FILE = 'picks.db'  # SQLite pick store kept in the project directory
+
+# Session Journal
+JOURNAL_FILE = 'picks.journal'  # Append-only log of manual pick commands in the project directory
+JOURNAL_SNAPSHOT_FILE = 'picks.snapshot.json'  # Pick state the journal was compacted into
+JOURNAL_FSYNC_INTERVAL = 0.5  # Seconds between fsyncs of the journal
+JOURNAL_COMPACT_ENTRIES = 5000  # Journal entries that trigger a snapshot
+
+# MiniSEED Record Index
+MSEED_INDEX_DIR = 'mseed_index'  # Subdirectory of the cache directory
+MSEED_INDEX_CACHE = 256  # Indexes kept in memory
+
+# Predicted Arrivals
+TRAVEL_TIME_DIR = 'travel_time'  # Subdirectory of the cache directory
+TRAVEL_TIME_PHASES = ('ttp',)  # TauP phases whose first arrival is predicted
+TRAVEL_TIME_DISTANCE_STEP = 0.5  # Grid spacing (degrees)
+TRAVEL_TIME_DEPTH_STEP = 10.0  # Grid spacing (km)
+TRAVEL_TIME_MAX_DEPTH = 700.0  # km
+
+# Waveform Pyramid
+CACHE_DIR_NAME = 'cache'  # Under ~/.p_wave_picker unless storage.cache_dir is set
+PYRAMID_FACTOR = 8  # Bin size ratio between pyramid levels
+PYRAMID_MIN_BINS = 1024  # Coarsest level kept
+PYRAMID_MIN_SAMPLES = 1000000  # Shorter traces are decimated from raw samples
+
+# Record Section
+RECORD_SECTION_ROWS = 20  # Rows shown at once
+RECORD_SECTION_WORKERS = 4  # Threads loading rows
+RECORD_SECTION_CACHE = 64  # Loaded rows kept in memory
+
+# File List Statuses
+FILE_STATUS = {
+    'unprocessed': 'Unprocessed',
+    'processed': 'Processed'
+}
+FILE_LIST_ROW_HEIGHT = 20  # Treeview row height (pixels) used to size the visible window
+UI_REFRESH_INTERVAL_MS = 50  # How often worker events are applied to the UI
+
 # Processing Modes
 PROCESSING_MODES = {
     'manual': 'Manual Picking',
@@ -36,6 +91,12 @@ CSV_COLUMNS = {
     'offset': 'Offset'
 }
 
+# Export Formats
+SUPPORTED_EXPORT_FORMATS = ['csv', 'json', 'ndjson', 'parquet', 'mseed', 'sac', 'segy']
+EXPORT_BUFFER_SIZE = 1024 * 1024  # Write buffer for streaming exports (bytes)
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_ROW_GROUP_SIZE = 100000
+
 # File Types
 FILE_TYPES = [
     ("MiniSEED Files", "*.mseed"),
@@ -51,6 +112,41 @@ PICK_QUALITY = {
 
 DEFAULT_PICK_QUALITY = 'A' # Define the default pick quality
 
+# Automatic Picker
+DEFAULT_STA_LTA_WINDOW = (1.0, 10.0)  # STA and LTA window lengths (s)
+DEFAULT_STA_LTA_THRESHOLD = 3.0
+DEFAULT_SNR_WINDOW = 100  # Leading noise samples used for the SNR
+DEFAULT_SNR_THRESHOLD = 3.0  # dB
+
+# Batch STA/LTA picker
+AUTO_PICK_STA_WINDOW = 0.5  # s
+AUTO_PICK_LTA_WINDOW = 5.0  # s
+AUTO_PICK_THRESHOLD = 3.0
+
+# Batch Memory Budget
+MEMORY_BUDGET_FRACTION = 0.5  # Of physical memory, when process.memory_budget_mb is 0
+MEMORY_BUDGET_FALLBACK_MB = 2048  # When physical memory is unknown
+MEMORY_FLOAT_COPIES = 5  # float64 arrays per sample while preprocessing and picking (trace, filter, STA/LTA buffers)
+MEMORY_SIZE_EXPANSION = 16  # Bytes in memory per byte on disk when only the file size is known
+MEMORY_ESTIMATE_MIN_SIZE = 1024 * 1024  # Smaller files are estimated from their size alone
+MEMORY_OVERSIZE_FRACTION = 0.5  # MiniSEED files estimated above this share of the budget are picked in chunks
+MEMORY_CHUNK_FRACTION = 0.125  # Share of the budget one chunk may use
+MEMORY_CHUNK_OVERLAP = 10.0  # Seconds re-read before each chunk so the LTA window and filters settle
+MEMORY_SCALE_RANGE = (0.5, 4.0)  # Bounds of the learned measured/estimated memory ratio
+MEMORY_SCALE_SMOOTHING = 0.3  # Weight of each new measurement of the ratio
+MEMORY_OBSERVE_MIN = 64 * 1024 * 1024  # Estimated bytes in flight below which RSS is too noisy to learn from
+
+# Preprocessing
+DEFAULT_TAPER_PERCENTAGE = 0.05  # Fraction of the trace tapered at each end
+FILTER_CORNERS = 4  # Butterworth filter corners (obspy default)
+
+# Numeric quality levels used by the automatic picker
+PICK_QUALITY_LEVELS = {
+    0: 'Excellent',
+    1: 'Good',
+    2: 'Fair'
+}
+
 # Color Definitions
 COLORS = {
     'waveform': '#1f77b4',  # Waveform color
@@ -70,7 +166,8 @@ DEFAULT_PARAMS = {
         'window_size': [1200, 800],
         'theme': 'default',
         'font_size': 10,
-        'show_grid': True
+        'show_grid': True,
+        'history_depth': 1000
     },
     'plot': {
         'line_width': 1.0,
@@ -82,12 +179,37 @@ DEFAULT_PARAMS = {
     'process': {
         'sampling_rate': 100.0,
         'preprocess': True,
-        'auto_pick': False
+        'taper': 0.0,  # Fraction tapered at each end, 0 disables
+        'normalize': False,
+        'envelope': False,
+        'auto_pick': False,
+        'group_by_event': False,  # Batch files event by event, sharing event-level resources
+        'batch_workers': 4,  # Events processed in parallel when grouping by event
+        'stage_timing': True,  # Time read/preprocess/pick/quality/persist per batch file
+        'memory_budget_mb': 0  # Estimated memory batch work may hold at once, 0 uses half the physical memory
     },
     'paths': {
         'data_dir': '',
         'output_dir': ''
     },
+    'travel_time': {
+        'enabled': False,  # Pick only around predicted P arrivals
+        'catalog': '',  # CSV: event_id, time, latitude, longitude, depth (km)
+        'stations': '',  # CSV: network, station, latitude, longitude
+        'model': 'iasp91',
+        'window_before': 10.0,  # Seconds before the predicted arrival
+        'window_after': 30.0  # Seconds after the predicted arrival
+    },
+    'metrics': {
+        'file': '',  # Prometheus text file rewritten during batches, empty for none
+        'port': 0,  # Local HTTP port serving /metrics, 0 for none
+        'interval': 5.0,  # Seconds between rewrites of the file
+        'host': '127.0.0.1'
+    },
+    'storage': {
+        'pick_store': '',  # Empty keeps picks in memory only
+        'cache_dir': ''  # Empty uses ~/.p_wave_picker/cache
+    },
     'filter': {
         'type': 'bandpass',
         'freq_range': [1.0, 10.0]
@@ -124,6 +246,9 @@ KEYBOARD_SHORTCUTS = {
     'quit': 'Ctrl+Q'
 }
 
+# Undo History
+DEFAULT_HISTORY_DEPTH = 1000  # Commands kept for undo/redo
+
 # Command Types
 COMMAND_TYPES = {
     'add_pick': 'Add Pick',
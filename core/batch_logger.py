@@ -7,13 +7,14 @@ import os
 import json
 import logging
 import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from config.constants import (
     LOG_FORMAT,
     LOG_LEVEL,
     PROGRESS_FILE
 )
+from core.stage_timer import format_stage_times
 
 class BatchLogger:
     """Batch Logger Class"""
@@ -81,7 +82,9 @@ class BatchLogger:
     def log_file_complete(self, filename: str,
                          success: bool,
                          picks: Optional[List[Dict[str, Any]]] = None,
-                         error: Optional[str] = None) -> None:
+                         error: Optional[str] = None,
+                         duration: Optional[float] = None,
+                         stage_times: Optional[Dict[str, Tuple[float, float]]] = None) -> None:
         """
         Logs the completion of file processing
         
@@ -90,6 +93,8 @@ class BatchLogger:
             success: Whether successful
             picks: Picking results
             error: Error message
+            duration: Processing time of the file (seconds)
+            stage_times: {stage: (wall seconds, CPU seconds)} of the file
         """
         if success:
             self.logger.info(f"File processed successfully: {filename}")
@@ -109,15 +114,23 @@ class BatchLogger:
             'success': success,
             'picks': picks if picks else [],
             'error': error,
-            'processing_time': datetime.datetime.now().isoformat()
+            'processing_time': duration,
+            'completed_at': datetime.datetime.now().isoformat()
         }
+        if stage_times:
+            result['stage_times'] = {stage: list(times) for stage, times in stage_times.items()}
+            self.logger.debug(f"Stage times of {filename}: " + ", ".join(
+                f"{stage} {wall:.4f} s" for stage, (wall, _) in stage_times.items()))
         progress['results'].append(result)
         
         self._save_progress(progress)
     
-    def log_complete(self) -> None:
+    def log_complete(self, summary=None) -> None:
         """
         Logs the completion of batch processing
+        
+        Args:
+            summary: BatchSummary of the run; its stage timings are logged and saved
         """
         progress = self._load_progress()
         end_time = datetime.datetime.now()
@@ -127,6 +140,11 @@ class BatchLogger:
         self.logger.info(f"Batch processing complete, total time: {duration:.2f} seconds")
         self.logger.info(f"Successful files: {progress['successful_files']}")
         self.logger.info(f"Failed files: {progress['failed_files']}")
+        if summary is not None:
+            summary = summary.to_dict()
+            for line in format_stage_times(summary['stage_times']):
+                self.logger.info(f"Stage {line}")
+            progress['summary'] = summary
         
         progress['status'] = 'completed'
         progress['end_time'] = end_time.isoformat()
@@ -0,0 +1,361 @@
+"""
+Batch Metrics Module
+Live throughput, queue, worker, cache and memory metrics of a batch run, exposed in the
+Prometheus text format as a file rewritten atomically or on a local HTTP endpoint
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.constants import METRICS_PREFIX, METRICS_INTERVAL, METRICS_RATE_WINDOW, METRICS_HOST
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def resident_memory() -> Optional[int]:
+    """
+    Resident set size of this process
+
+    Returns:
+        Bytes from /proc/self/statm, the peak RSS where /proc is unavailable, or None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Bytes on macOS, KiB elsewhere
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value: float) -> str:
+    """Sample value without trailing zeros"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return repr(float(value))
+
+class _Family:
+    """Samples of one metric"""
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        """Initializes an empty family"""
+        self.name = METRICS_PREFIX + name
+        self.kind = kind
+        self.help_text = help_text
+        self.samples: List[Tuple[Dict[str, str], float]] = []
+
+    def add(self, value: float, **labels):
+        """Add a sample"""
+        self.samples.append((labels, value))
+        return self
+
+    def render(self) -> List[str]:
+        """Lines of the family in the text format"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.samples:
+            label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+            lines.append(f"{self.name}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{self.name} {_format_value(value)}")
+        return lines
+
+class BatchMetrics:
+    """Live metrics of the running (or last) batch
+
+    The batch processor reports the work it takes from the queue and the time its
+    workers are busy; file, pick and error counts are read from the batch summary and
+    cache statistics from registered callables when the metrics are rendered. Thread-safe.
+    """
+
+    def __init__(self):
+        """Initializes metrics of no batch"""
+        self._lock = threading.Lock()
+        self._caches: Dict[str, Callable[[], Tuple[int, int]]] = {}
+        self._reset(None, 0, 1)
+
+    def _reset(self, summary, total_files: int, workers: int):
+        """Start the metrics of a new batch (caller holds the lock or is the constructor)"""
+        self.summary = summary
+        self.total_files = total_files
+        self.workers = max(1, workers)
+        self.queue_depth = total_files
+        self.started = time.monotonic()
+        self.finished = None
+        self._busy = 0.0
+        self._active: Dict[int, float] = {}  # {task id: start}
+        self._samples = deque()  # (time, files done, picks) for the recent rates
+
+    def start(self, summary, total_files: int, workers: int = 1):
+        """
+        Starts the metrics of a batch
+
+        Args:
+            summary: BatchSummary the batch updates
+            total_files: Files in the batch
+            workers: Worker threads
+        """
+        with self._lock:
+            self._reset(summary, total_files, workers)
+
+    def finish(self):
+        """Marks the batch as finished; rates and utilisation stop at this time"""
+        with self._lock:
+            self.finished = time.monotonic()
+            self.queue_depth = 0
+
+    def dequeue(self, files: int = 1):
+        """Files taken from the queue by a worker"""
+        with self._lock:
+            self.queue_depth = max(self.queue_depth - files, 0)
+
+    @contextmanager
+    def working(self):
+        """Context counting a worker as busy while the block runs"""
+        token = object()
+        with self._lock:
+            self._active[id(token)] = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy += time.monotonic() - self._active.pop(id(token))
+
+    def add_cache(self, name: str, stats: Callable[[], Tuple[int, int]]):
+        """
+        Registers a cache whose hit rate is exposed
+
+        Args:
+            name: Label of the cache
+            stats: Callable returning (hits, misses)
+        """
+        with self._lock:
+            self._caches[name] = stats
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Current values
+
+        Returns:
+            Dictionary of the values rendered by render(); rates are over the last
+            METRICS_RATE_WINDOW seconds of snapshots, or since the start of the batch
+        """
+        summary = self.summary.to_dict() if self.summary is not None else {}
+        cache_stats = {}
+        for name, stats in list(self._caches.items()):
+            try:
+                cache_stats[name] = tuple(stats())
+            except Exception as e:
+                logging.warning(f"Failed to read statistics of cache {name}: {str(e)}")
+
+        with self._lock:
+            now = self.finished if self.finished is not None else time.monotonic()
+            elapsed = now - self.started
+            busy = self._busy + sum(now - start for start in self._active.values())
+            files = summary.get('total_files', 0)
+            picks = summary.get('total_picks', 0)
+            if self.finished is None:
+                self._samples.append((now, files, picks))
+                while len(self._samples) > 2 and now - self._samples[0][0] > METRICS_RATE_WINDOW:
+                    self._samples.popleft()
+            first = self._samples[0] if len(self._samples) > 1 and self.finished is None else (self.started, 0, 0)
+            span = now - first[0]
+            values = {
+                'running': self.summary is not None and self.finished is None,
+                'elapsed_seconds': elapsed,
+                'files_total': self.total_files,
+                'files_processed': files,
+                'files_failed': summary.get('failed_files', 0),
+                'picks': picks,
+                'files_per_second': (files - first[1]) / span if span > 0 else 0.0,
+                'picks_per_second': (picks - first[2]) / span if span > 0 else 0.0,
+                'queue_depth': self.queue_depth,
+                'workers': self.workers,
+                'workers_busy': len(self._active),
+                'worker_busy_seconds': busy,
+                'worker_utilisation': min(busy / (self.workers * elapsed), 1.0) if elapsed > 0 else 0.0,
+            }
+        values['errors'] = dict(summary.get('failures_by_error', {}))
+        values['stage_seconds'] = {stage: entry['wall'] for stage, entry in summary.get('stage_times', {}).items()}
+        values['caches'] = cache_stats
+        values['resident_memory_bytes'] = resident_memory()
+        return values
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format"""
+        values = self.snapshot()
+        families = [
+            _Family('running', 'gauge', 'Whether a batch is running.').add(int(values['running'])),
+            _Family('elapsed_seconds', 'gauge', 'Seconds since the batch started.').add(values['elapsed_seconds']),
+            _Family('files', 'gauge', 'Files in the batch.').add(values['files_total']),
+            _Family('files_processed_total', 'counter', 'Files processed.').add(values['files_processed']),
+            _Family('files_failed_total', 'counter', 'Files that failed.').add(values['files_failed']),
+            _Family('picks_total', 'counter', 'Picks made.').add(values['picks']),
+            _Family('files_per_second', 'gauge', 'Recent file throughput.').add(values['files_per_second']),
+            _Family('picks_per_second', 'gauge', 'Recent pick throughput.').add(values['picks_per_second']),
+            _Family('queue_depth', 'gauge', 'Files not yet taken by a worker.').add(values['queue_depth']),
+            _Family('workers', 'gauge', 'Worker threads.').add(values['workers']),
+            _Family('workers_busy', 'gauge', 'Workers processing a file or event.').add(values['workers_busy']),
+            _Family('worker_busy_seconds_total', 'counter', 'Seconds workers spent busy.').add(
+                values['worker_busy_seconds']),
+            _Family('worker_utilisation', 'gauge', 'Busy fraction of the workers since the batch started.').add(
+                values['worker_utilisation']),
+        ]
+        errors = _Family('errors_total', 'counter', 'Failed files by error type.')
+        for error_type, count in sorted(values['errors'].items()):
+            errors.add(count, type=error_type)
+        stages = _Family('stage_seconds_total', 'counter', 'Wall-clock seconds spent per processing stage.')
+        for stage, seconds in values['stage_seconds'].items():
+            stages.add(seconds, stage=stage)
+        hits = _Family('cache_hits_total', 'counter', 'Cache hits.')
+        misses = _Family('cache_misses_total', 'counter', 'Cache misses.')
+        ratios = _Family('cache_hit_ratio', 'gauge', 'Fraction of cache lookups that hit.')
+        for name, (hit, miss) in sorted(values['caches'].items()):
+            hits.add(hit, cache=name)
+            misses.add(miss, cache=name)
+            ratios.add(hit / (hit + miss) if hit + miss else 0.0, cache=name)
+        families += [errors, stages, hits, misses, ratios]
+
+        lines = []
+        for family in families:
+            lines += family.render()
+        if values['resident_memory_bytes'] is not None:
+            # Standard name, so existing process dashboards pick it up
+            lines += ['# HELP process_resident_memory_bytes Resident memory size in bytes.',
+                      '# TYPE process_resident_memory_bytes gauge',
+                      f"process_resident_memory_bytes {values['resident_memory_bytes']}"]
+        return '\n'.join(lines) + '\n'
+
+class MetricsExporter:
+    """Publishes BatchMetrics while a batch runs
+
+    Either or both of: a text file rewritten atomically every interval (for the
+    node-exporter textfile collector or a plain `cat`), and an HTTP endpoint serving
+    /metrics on a local port.
+    """
+
+    def __init__(self, metrics: BatchMetrics, file_path: str = '', port: Optional[int] = None,
+                 interval: float = METRICS_INTERVAL, host: str = METRICS_HOST):
+        """
+        Initializes the exporter
+
+        Args:
+            metrics: Metrics to publish
+            file_path: Exposition file, empty for none
+            port: HTTP port, None for no endpoint (0 picks a free port)
+            interval: Seconds between rewrites of the file
+            host: Interface the endpoint listens on
+        """
+        self.metrics = metrics
+        self.file_path = file_path
+        self.port = port
+        self.interval = interval
+        self.host = host
+        self._stop = threading.Event()
+        self._writer = None
+        self._server = None
+
+    @classmethod
+    def from_settings(cls, metrics: BatchMetrics, settings) -> Optional['MetricsExporter']:
+        """
+        Exporter configured by the 'metrics' settings
+
+        Returns:
+            Exporter, or None if neither a file nor a port is set
+        """
+        file_path = settings.get('metrics', 'file', '')
+        port = settings.get('metrics', 'port', 0)
+        if not file_path and not port:
+            return None
+        return cls(metrics, file_path, port or None,
+                   settings.get('metrics', 'interval', METRICS_INTERVAL),
+                   settings.get('metrics', 'host', METRICS_HOST))
+
+    def start(self):
+        """Starts the file writer and the HTTP endpoint"""
+        self._stop.clear()
+        if self.port is not None:
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+                self._server.daemon_threads = True
+                self.port = self._server.server_address[1]
+                threading.Thread(target=self._server.serve_forever, name='batch-metrics-http', daemon=True).start()
+                logging.info(f"Batch metrics served on http://{self.host}:{self.port}/metrics")
+            except OSError as e:
+                logging.error(f"Failed to start the metrics endpoint: {str(e)}")
+                self._server = None
+        if self.file_path:
+            self._writer = threading.Thread(target=self._write_loop, name='batch-metrics-file', daemon=True)
+            self._writer.start()
+
+    def stop(self):
+        """Writes the final metrics and stops the writer and the endpoint"""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        if self.file_path:
+            self.write_file()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def write_file(self) -> bool:
+        """
+        Rewrites the exposition file atomically
+
+        Returns:
+            Whether the file was written
+        """
+        temp_path = self.file_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.metrics.render())
+            os.replace(temp_path, self.file_path)
+            return True
+        except Exception as e:
+            logging.error(f"Failed to write metrics file: {str(e)}")
+            return False
+
+    def _write_loop(self):
+        """Rewrite the file every interval until stopped"""
+        while not self._stop.is_set():
+            self.write_file()
+            self._stop.wait(self.interval)
+
+    def _handler(self):
+        """Request handler class serving the metrics"""
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            """Serves /metrics"""
+
+            def do_GET(self):
+                """Render the metrics for a scrape"""
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                """Keep scrapes out of the log"""
+
+        return Handler
@@ -4,15 +4,27 @@ Batch Processing Module
 
 import os
 import json
+import time
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from obspy import read, UTCDateTime
 from config.settings import Settings
-from config.constants import MAX_FILES_PER_BATCH, PROGRESS_FILE, PROCESSING_MODES
+from config.constants import (MAX_FILES_PER_BATCH, PROGRESS_FILE, PROCESSING_MODES, BATCH_EVENT_WORKERS, PICK_QUALITY,
+                              MEMORY_CHUNK_OVERLAP)
 from core.file_manager import FileManager
 from core.pick_manager import PickManager
+from core.data_exporter import BatchSummary
+from core.travel_time import ArrivalPredictor
+from core.waveform_processor import ProcessingPlan
+from core.event_batch import EnergyWorkspace, EventGroup, group_files_by_event, sta_lta_trigger
+from core.stage_timer import StageTimer, format_stage_times
+from core.auto_picker import AutoPicker
+from core.batch_metrics import BatchMetrics, MetricsExporter
+from core.batch_scheduler import MemoryBudget, estimate_footprint, schedule_events
+from core.waveform_processor import filter_sos
 import numpy as np # Import numpy
 
 class BatchProcessor:
@@ -29,11 +41,19 @@ class BatchProcessor:
         self.is_paused = False
         self.progress_callback = None
         self.status_callback = None
+        self.file_callback = None
+        self.done_callback = None
         self.command_history = [] # This attribute is not used in this class, it's in MainWindow
         self.processing = False
         self.current_batch = 0
         self.total_batches = 0
         self.cancel_flag = False
+        self.summary = BatchSummary()
+        self.auto_picker = AutoPicker()  # Grades automatic picks by SNR
+        self.metrics = BatchMetrics()  # Live metrics, published when the 'metrics' settings ask for it
+        self.metrics.add_cache('mseed_index', self.file_manager.mseed_indexes.stats)
+        self.metrics.add_cache('filter_design', lambda: filter_sos.cache_info()[:2])
+        self.memory_budget = None  # MemoryBudget of the running (or last) batch
     
     def scan_folder(self, folder_path):
         """Scan folder"""
@@ -121,8 +141,9 @@ class BatchProcessor:
             if self.mode == 'auto':
                 # Automatic picking
                 pick_time = self._auto_pick(trace)
-                if pick_time:
-                    self.pick_manager.add_pick(filename, self.pick_manager.create_pick(pick_time))
+                if pick_time is not None:
+                    self.pick_manager.add_pick(filename, self.pick_manager.create_pick(
+                        self._record_seconds(filename, pick_time, trace)))
                     return True, "Automatic pick successful"
                 return False, "Automatic pick failed"
             
@@ -136,49 +157,24 @@ class BatchProcessor:
             logging.error(f"Error processing file: {str(e)}")
             return False, f"Error processing file: {str(e)}"
     
-    def _auto_pick(self, trace):
-        """Automatic picking algorithm (STA/LTA method)"""
+    def _record_seconds(self, file_path, pick_time, trace=None):
+        """Seconds of an absolute pick time from the start of the record
+        Every batch mode stores picks this way, like manual picks. Pass the trace if it
+        was read whole (it then starts with the record); the start of windowed and
+        chunked reads is not the record start, so it is looked up.
+        """
+        record_start = trace.stats.starttime if trace is not None else self.file_manager.record_starttime(file_path)
+        return float(pick_time - record_start)
+
+    def _auto_pick(self, trace, workspace=None):
+        """Automatic picking algorithm (STA/LTA method, 0.5 s STA, 5 s LTA, threshold 3)
+        workspace: EnergyWorkspace reused between traces
+        """
         try:
-            # Calculate STA/LTA
-            data = trace.data
             sampling_rate = trace.stats.sampling_rate
-            
-            # Set STA and LTA window lengths
-            sta_window = int(0.5 * sampling_rate)  # 0.5 seconds
-            lta_window = int(5.0 * sampling_rate)  # 5 seconds
-            
-            # Calculate STA and LTA
-            sta = np.zeros_like(data)
-            lta = np.zeros_like(data)
-            
-            # Calculate STA
-            for i in range(len(data)):
-                if i < sta_window:
-                    sta[i] = np.mean(data[:i+1]**2)
-                else:
-                    sta[i] = np.mean(data[i-sta_window:i]**2)
-            
-            # Calculate LTA
-            for i in range(len(data)):
-                if i < lta_window:
-                    lta[i] = np.mean(data[:i+1]**2)
-                else:
-                    lta[i] = np.mean(data[i-lta_window:i]**2)
-            
-            # Calculate STA/LTA ratio
-            ratio = sta / (lta + 1e-10)  # Avoid division by zero
-            
-            # Set trigger threshold
-            threshold = 3.0
-            
-            # Find trigger points
-            trigger_points = np.where(ratio > threshold)[0]
-            if len(trigger_points) > 0:
-                # Take the first trigger point
-                pick_sample = trigger_points[0]
-                pick_time = trace.stats.starttime + pick_sample / sampling_rate
-                return pick_time
-            
+            pick_sample = sta_lta_trigger(np.asarray(trace.data, dtype=np.float64), sampling_rate, workspace)
+            if pick_sample is not None:
+                return trace.stats.starttime + pick_sample / sampling_rate
             return None
             
         except Exception as e:
@@ -224,18 +220,35 @@ class BatchProcessor:
         self.progress_callback = progress_callback
         self.status_callback = status_callback
     
-    def process_batch(self, files, mode='manual', callback=None):
-        """Process a batch of files"""
+    def process_batch(self, files, mode='manual', callback=None, file_callback=None, done_callback=None,
+                      group_by_event=None, resume=False):
+        """Process a batch of files
+        Callbacks run in the processing thread: callback(progress, message) after each file,
+        file_callback(file_path, success) per file and done_callback(summary) at the end.
+        With group_by_event (default: the 'process'/'group_by_event' setting), files are
+        processed event by event in parallel and checkpointed per event; resume skips the
+        events completed by a previous run.
+        """
+        if group_by_event is None:
+            group_by_event = self.settings.get('process', 'group_by_event', False)
         if self.processing:
             return False, "Another processing task is already running"
         
         self.processing = True
         self.cancel_flag = False
         self.progress_callback = callback
+        self.file_callback = file_callback
+        self.done_callback = done_callback
         
         # Calculate total batches
         self.total_batches = (len(files) + MAX_FILES_PER_BATCH - 1) // MAX_FILES_PER_BATCH
         
+        if group_by_event:
+            completed = self._load_completed_events() if resume else set()
+            thread = threading.Thread(target=self._process_events, args=(files, mode, completed))
+            thread.start()
+            return True, "Batch processing started"
+        
         # Create progress file
         self._create_progress_file()
         
@@ -255,43 +268,338 @@ class BatchProcessor:
             self.status_callback("Processing cancelled")
 
     def _process_files(self, files, mode):
-        """Process files in a separate thread"""
+        """Process files in a separate thread
+        Files are processed most costly first (estimated from their memory footprint),
+        like event work; files of equal cost keep their order.
+        """
+        self.summary = BatchSummary()
+        timing = self.settings.get('process', 'stage_timing', True)
+        exporter = self._start_metrics(len(files), 1)
+        budget = self.memory_budget = MemoryBudget.from_settings(self.settings)
+        windows = self._arrival_windows(files) if mode == 'auto' else {}
+        footprints = {file_path: estimate_footprint(self.file_manager, file_path, windows.get(file_path))
+                      for file_path in files}
+        files = sorted(files, key=lambda file_path: footprints[file_path].nbytes, reverse=True)
         for i, file_path in enumerate(files):
             if self.cancel_flag:
                 break
+            self.metrics.dequeue()
 
             # Update status
             if self.status_callback:
                 self.status_callback(f"Processing file: {os.path.basename(file_path)}")
 
             # Process single file
-            success, message = self._process_single_file(file_path, mode)
+            timer = StageTimer(timing)
+            start = time.perf_counter()
+            footprint = footprints[file_path]
+            chunk_seconds = budget.chunk_seconds(footprint) if mode == 'auto' and budget.oversized(footprint) else None
+            with budget.admit(budget.chunk_bytes(footprint) if chunk_seconds else footprint.nbytes), self.metrics.working():
+                success, message = self._process_single_file(file_path, mode, windows.get(file_path), timer,
+                                                             budget, chunk_seconds)
+            duration = time.perf_counter() - start
             if not success:
                 logging.error(f"Failed to process {os.path.basename(file_path)}: {message}")
                 # Continue to next file on error, but log it
 
+            # Update running summary
+            self.summary.update({
+                'file': file_path,
+                'success': success,
+                'picks': [{'time': p.time, 'quality': p.quality} for p in self.pick_manager.get_picks_for_file(file_path)],
+                'error': None if success else message,
+                'duration': duration,
+                'stage_times': timer.times
+            })
+
             # Update progress
+            if self.file_callback:
+                self.file_callback(file_path, success)
             if self.progress_callback:
                 progress = (i + 1) / len(files) * 100
                 self.progress_callback(progress, f"Processed {os.path.basename(file_path)}")
 
+        self._stop_metrics(exporter)
+        self._log_stage_times()
+        self.processing = False
+        if self.status_callback:
+            self.status_callback("Batch processing finished.")
+        if self.done_callback:
+            self.done_callback(self.summary)
+
+    def _process_events(self, files, mode, completed=frozenset()):
+        """Process files grouped by event (batch thread)
+        Events are the unit of parallel work. They are dispatched most costly first
+        (estimated from their memory footprint) and costly events are split into
+        chunks, so no large event is left for a single worker at the end. Picks of a
+        chunk are added in one transaction and an event is checkpointed once all its
+        files are done.
+        """
+        self.summary = BatchSummary()
+        groups = [EventGroup(event_id, event_files) for event_id, event_files in group_files_by_event(files).items()]
+        total_events = len(groups)
+        done_files = sum(len(group) for group in groups if group.event_id in completed)
+        groups = [group for group in groups if group.event_id not in completed]
+        completed = set(completed)
+
+        # Event-independent resources are created once for the whole batch
+        predictor = ArrivalPredictor.from_settings(self.settings) if mode == 'auto' else None
+        before = self.settings.get('travel_time', 'window_before', 10.0)
+        after = self.settings.get('travel_time', 'window_after', 30.0)
+        plan = ProcessingPlan.from_settings(self.settings)
+        workers = self.settings.get('process', 'batch_workers', BATCH_EVENT_WORKERS)
+        timing = self.settings.get('process', 'stage_timing', True)
+        exporter = self._start_metrics(len(files) - done_files, max(1, workers))
+        budget = self.memory_budget = MemoryBudget.from_settings(self.settings)
+
+        footprints = {}
+        for group in groups:
+            group.prepare(plan, predictor, before, after)
+            for file_path in group.files:
+                footprints[file_path] = estimate_footprint(self.file_manager, file_path, group.windows.get(file_path))
+        tasks = schedule_events(groups, {path: footprint.nbytes for path, footprint in footprints.items()},
+                                max(1, workers))
+        remaining = {}  # Unfinished chunks of each event
+        for task in tasks:
+            remaining[task.event_id] = remaining.get(task.event_id, 0) + 1
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='batch-event') as executor:
+            futures = {executor.submit(self._process_event, group, mode, timing, budget,
+                                       [footprints[file_path] for file_path in group.files]): group
+                       for group in tasks}
+            for future in as_completed(futures):
+                group = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logging.error(f"Failed to process event {group.event_id}: {str(e)}")
+                    results = [{'file': file_path, 'success': False, 'error': str(e), 'pick': None,
+                                'timer': StageTimer(False)} for file_path in group.files]
+                if results is None:
+                    continue  # Cancelled before it started
+
+                picks = {r['file']: [r['pick']] for r in results if r.get('pick') is not None}
+                if picks:
+                    # One transaction per chunk; its time is shared by the files with a pick
+                    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+                    self.pick_manager.add_picks(picks)
+                    wall = (time.perf_counter() - wall_start) / len(picks)
+                    cpu = (time.thread_time() - cpu_start) / len(picks)
+                    for result in results:
+                        if result.get('pick') is not None:
+                            result['timer'].add('persist', wall, cpu)
+                for result in results:
+                    pick = result.pop('pick', None)
+                    result['stage_times'] = result.pop('timer').times
+                    if result['stage_times']:
+                        result['duration'] = sum(wall for wall, _ in result['stage_times'].values())
+                    if not result['success']:
+                        logging.error(f"Failed to process {os.path.basename(result['file'])}: {result['error']}")
+                    result['picks'] = [{'time': pick.time, 'quality': pick.quality}] if pick else []
+                    self.summary.update(result)
+                    if self.file_callback:
+                        self.file_callback(result['file'], result['success'])
+                done_files += len(group)
+                remaining[group.event_id] -= 1
+                if not remaining[group.event_id]:
+                    completed.add(group.event_id)
+                    self._save_event_progress(mode, total_events, completed)
+                if self.progress_callback:
+                    self.progress_callback(done_files / len(files) * 100, f"Processed event {group.event_id}")
+                if self.cancel_flag:
+                    for pending in futures:
+                        pending.cancel()
+
+        self._stop_metrics(exporter)
+        self._log_stage_times()
         self.processing = False
         if self.status_callback:
             self.status_callback("Batch processing finished.")
+        if self.done_callback:
+            self.done_callback(self.summary)
+
+    def _process_event(self, group, mode, timing=True, budget=None, footprints=None):
+        """Read, preprocess, pick and grade all files of one prepared event or chunk of an event (worker thread)
+        The work waits until its estimated memory fits in the budget; oversized
+        MiniSEED files are picked chunk by chunk.
+        footprints: FileFootprint of each file of the group (estimated here if None)
+
+        Returns:
+            Per-file results with a 'pick' (Pick or None) and a StageTimer 'timer',
+            or None if cancelled
+        """
+        if self.cancel_flag:
+            return None
+        if budget is None:
+            budget = MemoryBudget.from_settings(self.settings)
+        if footprints is None:
+            footprints = [estimate_footprint(self.file_manager, file_path, group.windows.get(file_path))
+                          for file_path in group.files]
+        chunked = {footprint.file_path: budget.chunk_seconds(footprint) for footprint in footprints
+                   if mode == 'auto' and budget.oversized(footprint)}
+        # Whole traces are held together; chunks of oversized files are read one at a time after them
+        nbytes = sum(footprint.nbytes for footprint in footprints if footprint.file_path not in chunked)
+        nbytes += max((budget.chunk_bytes(footprint) for footprint in footprints if footprint.file_path in chunked),
+                      default=0)
+        with budget.admit(nbytes):
+            self.metrics.dequeue(len(group))
+            with self.metrics.working():
+                return self._process_event_files(group, mode, timing, budget, chunked)
+
+    def _process_event_files(self, group, mode, timing, budget, chunked):
+        """Body of _process_event, run once the event is admitted
+        chunked: {file_path: chunk seconds} of the files picked in chunks
+        """
+        if self.status_callback:
+            self.status_callback(f"Processing event {group.event_id} ({len(group)} files)")
+
+        results = []
+        traces = []
+        chunk_results = []
+        for file_path in group.files:
+            window = group.windows.get(file_path)
+            result = {'file': file_path, 'success': False, 'error': None, 'pick': None, 'timer': StageTimer(timing)}
+            if file_path in chunked:
+                results.append(result)
+                chunk_results.append(result)
+                continue
+            try:
+                with result['timer'].stage('read'):
+                    trace = self.file_manager.read_trace(file_path, *(window or (None, None)), preprocess=False)
+                traces.append((result, trace))
+            except Exception as e:
+                result['error'] = str(e)
+            results.append(result)
 
-    def _process_single_file(self, file_path, mode):
-        """Process a single file (for batch processing)"""
+        # One plan for the whole event; equal-length traces are filtered together
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
         try:
-            trace = self.file_manager.load_file(file_path)
-            if trace is None:
-                return False, "Failed to load file"
+            self.file_manager.processor.process_many([trace for _, trace in traces], group.plan)
+        except Exception as e:
+            for result, _ in traces:
+                result['error'] = f"Preprocessing failed: {str(e)}"
+            traces = []
+        wall = (time.perf_counter() - wall_start) / max(len(traces), 1)
+        cpu = (time.thread_time() - cpu_start) / max(len(traces), 1)
+
+        for result, trace in traces:
+            timer = result['timer']
+            timer.add('preprocess', wall, cpu)
+            if mode != 'auto':
+                result['success'] = True
+                continue
+            with timer.stage('pick'):
+                pick_time = self._auto_pick(trace, group.workspace)
+                if pick_time is not None:
+                    pick_time = self._record_seconds(result['file'], pick_time,
+                                                     None if group.windows.get(result['file']) else trace)
+            if pick_time is None:
+                result['error'] = "Automatic pick failed"
+                continue
+            with timer.stage('quality'):
+                quality = self._pick_quality(trace)
+            result['pick'] = self.pick_manager.create_pick(pick_time, quality)
+            result['success'] = True
+        budget.observe()  # All traces of the event and the picker buffers are in memory
+        traces.clear()
+
+        for result in chunk_results:
+            try:
+                pick_time, quality = self._pick_chunked(result['file'], chunked[result['file']], result['timer'],
+                                                        budget, group.plan, group.workspace)
+            except Exception as e:
+                result['error'] = str(e)
+                continue
+            if pick_time is None:
+                result['error'] = "Automatic pick failed"
+                continue
+            result['pick'] = self.pick_manager.create_pick(self._record_seconds(result['file'], pick_time), quality)
+            result['success'] = True
+        return results
+
+    def _save_event_progress(self, mode, total_events, completed):
+        """Checkpoint the completed events (written atomically)"""
+        progress = {
+            'mode': mode,
+            'group_by_event': True,
+            'total_events': total_events,
+            'completed_events': sorted(completed),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        try:
+            temp_path = PROGRESS_FILE + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(progress, f, indent=4, ensure_ascii=False)
+            os.replace(temp_path, PROGRESS_FILE)
+        except Exception as e:
+            logging.error(f"Failed to save event progress: {str(e)}")
+
+    def _load_completed_events(self):
+        """Events completed by a previous event-grouped run"""
+        try:
+            if os.path.exists(PROGRESS_FILE):
+                with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
+                    progress = json.load(f)
+                return set(progress.get('completed_events', []))
+        except Exception as e:
+            logging.error(f"Failed to load event progress: {str(e)}")
+        return set()
+
+    def _arrival_windows(self, files):
+        """Windows around the predicted P arrivals {file_path: (start, end) or None}, empty if disabled"""
+        predictor = ArrivalPredictor.from_settings(self.settings)
+        if predictor is None:
+            return {}
+        before = self.settings.get('travel_time', 'window_before', 10.0)
+        after = self.settings.get('travel_time', 'window_after', 30.0)
+        windows = predictor.windows(files, before, after)
+        missing = sum(window is None for window in windows.values())
+        if missing:
+            logging.warning(f"No predicted arrival for {missing} files, picking over the whole record")
+        return windows
+
+    def _process_single_file(self, file_path, mode, window=None, timer=None, budget=None, chunk_seconds=None):
+        """Process a single file (for batch processing)
+        With a (start, end) window only that part of the record is read and picked;
+        with chunk_seconds the record is picked chunk by chunk.
+        Stages are timed with timer (StageTimer) if given and the peak memory is
+        reported to budget (MemoryBudget) if given.
+        """
+        if timer is None:
+            timer = StageTimer(False)
+        try:
+            if mode == 'auto' and chunk_seconds:
+                pick_time, quality = self._pick_chunked(file_path, chunk_seconds, timer, budget)
+                if pick_time is None:
+                    return False, "Automatic pick failed"
+                with timer.stage('persist'):
+                    self.pick_manager.add_pick(file_path, self.pick_manager.create_pick(
+                        self._record_seconds(file_path, pick_time), quality))
+                return True, "Automatic pick successful"
+
+            # Read without changing the file shown in the main window
+            with timer.stage('read'):
+                trace = self.file_manager.read_trace(file_path, *(window or (None, None)), preprocess=False)
+            if self.file_manager.settings.get('process', 'preprocess'):
+                with timer.stage('preprocess'):
+                    self.file_manager.processor.process(trace)
 
             if mode == 'auto':
-                pick_time = self._auto_pick(trace)
-                if pick_time:
-                    self.pick_manager.add_pick(file_path, self.pick_manager.create_pick(pick_time))
-                    return True, "Automatic pick successful"
-                return False, "Automatic pick failed"
+                with timer.stage('pick'):
+                    pick_time = self._auto_pick(trace)
+                    if pick_time is not None:
+                        pick_time = self._record_seconds(file_path, pick_time, None if window else trace)
+                if budget is not None:
+                    budget.observe()
+                if pick_time is None:
+                    return False, "Automatic pick failed"
+                with timer.stage('quality'):
+                    quality = self._pick_quality(trace)
+                with timer.stage('persist'):
+                    self.pick_manager.add_pick(file_path, self.pick_manager.create_pick(pick_time, quality))
+                return True, "Automatic pick successful"
             elif mode == 'manual':
                 # For manual mode in batch, just load and make sure it's in file list
                 return True, "File loaded for manual picking"
@@ -302,6 +610,71 @@ class BatchProcessor:
             logging.error(f"Error processing file {os.path.basename(file_path)}: {str(e)}")
             return False, str(e)
 
+    def _pick_chunked(self, file_path, chunk_seconds, timer, budget=None, plan=None, workspace=None):
+        """Pick an oversized MiniSEED record chunk by chunk, stopping at the first trigger
+        Each chunk is read with MEMORY_CHUNK_OVERLAP seconds of the previous one, so the
+        STA/LTA windows are full and filter transients fall in samples that are not
+        picked; the trigger equals the one on the whole record up to those transients.
+
+        Returns:
+            (pick time, quality), or (None, None) if no chunk triggers
+        """
+        index = self.file_manager.mseed_indexes.get(file_path)
+        mask = index.trace_codes == 0
+        start, end = float(index.starttimes[mask].min()), float(index.endtimes[mask].max())
+        workspace = workspace or EnergyWorkspace()
+        chunk_start = start
+        while chunk_start < end and not self.cancel_flag:
+            chunk_end = min(chunk_start + chunk_seconds, end)
+            with timer.stage('read'):
+                trace = self.file_manager.read_trace(file_path, UTCDateTime(max(chunk_start - MEMORY_CHUNK_OVERLAP, start)),
+                                                     UTCDateTime(chunk_end), preprocess=False)
+            if plan is not None or self.file_manager.settings.get('process', 'preprocess'):
+                with timer.stage('preprocess'):
+                    self.file_manager.processor.process(trace, plan)
+            with timer.stage('pick'):
+                sampling_rate = trace.stats.sampling_rate
+                first = max(int(round((chunk_start - float(trace.stats.starttime)) * sampling_rate)), 0)
+                pick_sample = sta_lta_trigger(np.asarray(trace.data, dtype=np.float64), sampling_rate,
+                                              workspace, first=first)
+            if budget is not None:
+                budget.observe()
+            if pick_sample is not None:
+                with timer.stage('quality'):
+                    quality = self._pick_quality(trace)
+                return trace.stats.starttime + pick_sample / sampling_rate, quality
+            chunk_start = chunk_end
+        return None, None
+
+    def _pick_quality(self, trace):
+        """Pick quality ('A'/'B'/'C') from the signal-to-noise ratio of the trace"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            level, _ = self.auto_picker.evaluate_signal_quality(trace)
+        return list(PICK_QUALITY)[level]
+
+    def _start_metrics(self, total_files, workers):
+        """Reset the live metrics for a batch and start publishing them if configured
+
+        Returns:
+            MetricsExporter, or None if the 'metrics' settings set no file or port
+        """
+        self.metrics.start(self.summary, total_files, workers)
+        exporter = MetricsExporter.from_settings(self.metrics, self.settings)
+        if exporter is not None:
+            exporter.start()
+        return exporter
+
+    def _stop_metrics(self, exporter):
+        """Mark the batch finished and publish the final metrics"""
+        self.metrics.finish()
+        if exporter is not None:
+            exporter.stop()
+
+    def _log_stage_times(self):
+        """Write the per-stage timings of the batch to the log"""
+        for line in format_stage_times(self.summary.to_dict()['stage_times']):
+            logging.info(f"Batch stage {line}")
+
     def _create_progress_file(self):
         """Create a progress file to track batch processing state"""
         progress = {
@@ -0,0 +1,242 @@
+"""
+Batch Scheduler Module
+Estimates the memory footprint of batch files and admits work only while the estimated total stays under a budget
+"""
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from obspy import read, UTCDateTime
+
+from config.constants import (
+    BATCH_TASKS_PER_WORKER,
+    MEMORY_BUDGET_FRACTION,
+    MEMORY_BUDGET_FALLBACK_MB,
+    MEMORY_FLOAT_COPIES,
+    MEMORY_SIZE_EXPANSION,
+    MEMORY_ESTIMATE_MIN_SIZE,
+    MEMORY_OVERSIZE_FRACTION,
+    MEMORY_CHUNK_FRACTION,
+    MEMORY_CHUNK_OVERLAP,
+    MEMORY_SCALE_RANGE,
+    MEMORY_SCALE_SMOOTHING,
+    MEMORY_OBSERVE_MIN
+)
+from core.batch_metrics import resident_memory
+from core.event_batch import EventGroup
+
+class FileFootprint:
+    """Estimated memory needed to preprocess and pick one file"""
+
+    __slots__ = ('file_path', 'nbytes', 'npts', 'sampling_rate', 'bytes_per_sample', 'chunkable')
+
+    def __init__(self, file_path: str, nbytes: int, npts: int = 0, sampling_rate: float = 0.0,
+                 bytes_per_sample: int = 0, chunkable: bool = False):
+        """
+        Initializes the estimate
+
+        Args:
+            file_path: Batch file
+            nbytes: Estimated peak bytes
+            npts: Samples read (0 if only the file size is known)
+            sampling_rate: Sampling rate (Hz)
+            bytes_per_sample: Estimated bytes per sample read
+            chunkable: Whether the file can be read in time windows (indexed MiniSEED)
+        """
+        self.file_path = file_path
+        self.nbytes = nbytes
+        self.npts = npts
+        self.sampling_rate = sampling_rate
+        self.bytes_per_sample = bytes_per_sample
+        self.chunkable = chunkable
+
+def estimate_footprint(file_manager, file_path: str, window: Optional[Tuple[UTCDateTime, UTCDateTime]] = None,
+                       min_size: int = MEMORY_ESTIMATE_MIN_SIZE) -> FileFootprint:
+    """
+    Estimates the memory footprint of a file before it is read
+
+    MiniSEED files are estimated from their record index (duration) and one decoded
+    record (sampling rate and sample type), other formats from their headers. Each
+    sample costs its decoded size plus MEMORY_FLOAT_COPIES float64 copies. Small files
+    and files whose headers cannot be read are estimated from their size.
+
+    Args:
+        file_manager: FileManager whose MiniSEED index cache is used
+        file_path: Batch file
+        window: (start, end) read window, None for the whole record
+        min_size: Files smaller than this (bytes) are estimated from their size
+
+    Returns:
+        Estimate (0 bytes for a missing file)
+    """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return FileFootprint(file_path, 0)
+    fallback = FileFootprint(file_path, size * MEMORY_SIZE_EXPANSION)
+    if size < min_size:
+        return fallback
+
+    try:
+        if os.path.splitext(file_path)[1].lower() in ('.mseed', '.seed'):
+            index = file_manager.mseed_indexes.get(file_path)
+            mask = index.trace_codes == 0
+            if not mask.any():
+                return fallback
+            first = UTCDateTime(float(index.starttimes[mask][0]))
+            head = index.read(first, first)  # Decodes only the first record
+            if not len(head):
+                return fallback
+            stats, itemsize = head[0].stats, head[0].data.dtype.itemsize
+            duration = float(np.sum(index.endtimes[mask] - index.starttimes[mask]))
+            chunkable = True
+        else:
+            stats = read(file_path, headonly=True)[0].stats
+            itemsize = 4  # Most formats decode to 32-bit samples
+            duration = stats.npts / stats.sampling_rate
+            chunkable = False
+    except Exception as e:
+        logging.warning(f"Failed to estimate the memory footprint of {file_path}: {str(e)}")
+        return fallback
+
+    if window is not None:
+        duration = min(duration, window[1] - window[0])
+    npts = int(round(duration * stats.sampling_rate))
+    bytes_per_sample = itemsize + MEMORY_FLOAT_COPIES * 8
+    return FileFootprint(file_path, npts * bytes_per_sample, npts, stats.sampling_rate, bytes_per_sample, chunkable)
+
+def default_budget() -> int:
+    """MEMORY_BUDGET_FRACTION of the physical memory (bytes)"""
+    try:
+        return int(os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') * MEMORY_BUDGET_FRACTION)
+    except (ValueError, OSError, AttributeError):
+        return MEMORY_BUDGET_FALLBACK_MB * 1024 * 1024
+
+class MemoryBudget:
+    """Admits batch work while its estimated memory stays under a budget
+
+    Estimates are multiplied by a scale learned from the resident memory measured at
+    the peak of each piece of work. Workers are threads sharing one address space, so
+    the growth of the process RSS over its baseline is attributed to the work in flight
+    in proportion to its estimates. Work is always admitted when nothing else is in
+    flight, so a file larger than the budget runs alone instead of blocking. Thread-safe.
+    """
+
+    def __init__(self, budget_bytes: int, baseline: Optional[int] = None, min_observed: int = MEMORY_OBSERVE_MIN):
+        """
+        Initializes the budget
+
+        Args:
+            budget_bytes: Estimated bytes that may be in flight at once
+            baseline: RSS without batch work (defaults to the RSS now)
+            min_observed: Estimated bytes in flight below which RSS is not learned from
+        """
+        self.budget = budget_bytes
+        self.baseline = resident_memory() if baseline is None else baseline
+        self.min_observed = min_observed
+        self.scale = 1.0
+        self.in_use = 0.0  # Scaled bytes admitted
+        self.in_flight = 0  # Estimated bytes admitted
+        self.active = 0  # Admitted reservations
+        self.peak_in_use = 0.0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_settings(cls, settings) -> 'MemoryBudget':
+        """Budget of the 'process'/'memory_budget_mb' setting (0 for the default budget)"""
+        budget_mb = settings.get('process', 'memory_budget_mb', 0)
+        return cls(int(budget_mb * 1024 * 1024) if budget_mb else default_budget())
+
+    def cost(self, nbytes: float) -> float:
+        """Scaled cost of an estimate"""
+        return nbytes * self.scale
+
+    def oversized(self, footprint: FileFootprint) -> bool:
+        """Whether a file should be picked in chunks"""
+        return footprint.chunkable and self.cost(footprint.nbytes) > self.budget * MEMORY_OVERSIZE_FRACTION
+
+    def chunk_seconds(self, footprint: FileFootprint) -> float:
+        """Length of the chunks of an oversized file (s), not counting the overlap"""
+        target = self.budget * MEMORY_CHUNK_FRACTION / self.scale
+        return max(target / (footprint.bytes_per_sample * footprint.sampling_rate), 4 * MEMORY_CHUNK_OVERLAP)
+
+    def chunk_bytes(self, footprint: FileFootprint) -> int:
+        """Estimated bytes of one chunk of an oversized file, including the overlap"""
+        return int((self.chunk_seconds(footprint) + MEMORY_CHUNK_OVERLAP)
+                   * footprint.sampling_rate * footprint.bytes_per_sample)
+
+    @contextmanager
+    def admit(self, nbytes: int):
+        """
+        Context holding a reservation while the block runs
+
+        Blocks until the scaled estimate fits in the budget or nothing else is in flight.
+
+        Args:
+            nbytes: Estimated bytes
+        """
+        with self._condition:
+            cost = self.cost(nbytes)
+            while self.active and self.in_use + cost > self.budget:
+                self._condition.wait()
+            self.active += 1
+            self.in_use += cost
+            self.in_flight += nbytes
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.active -= 1
+                self.in_use = self.in_use - cost if self.active else 0.0
+                self.in_flight -= nbytes
+                self._condition.notify_all()
+
+    def observe(self, rss: Optional[int] = None):
+        """
+        Learns the scale from the resident memory at a peak of the work in flight
+
+        Args:
+            rss: Measured RSS (bytes), read from the process if None
+        """
+        if rss is None:
+            rss = resident_memory()
+        with self._condition:
+            if rss is None or self.baseline is None or self.in_flight < self.min_observed:
+                return
+            low, high = MEMORY_SCALE_RANGE
+            ratio = min(max((rss - self.baseline) / self.in_flight, low), high)
+            self.scale += MEMORY_SCALE_SMOOTHING * (ratio - self.scale)
+
+def schedule_events(groups: List[EventGroup], costs: Dict[str, float], workers: int,
+                    tasks_per_worker: int = BATCH_TASKS_PER_WORKER) -> List[EventGroup]:
+    """
+    Orders event work longest-processing-time first
+
+    Events costing more than total / (workers * tasks_per_worker) are split into
+    chunks of about that cost, so one large event cannot leave a single worker busy
+    after the others are done. Workers take the chunks from one shared queue in the
+    returned order: the most costly first, so the small ones fill the gaps at the end.
+
+    Args:
+        groups: Prepared event groups
+        costs: Estimated cost of each file (e.g. FileFootprint.nbytes)
+        workers: Worker threads
+        tasks_per_worker: Target number of tasks per worker
+
+    Returns:
+        Groups and chunks of groups, most costly first (ties keep their order)
+    """
+    def group_cost(group):
+        return sum(costs.get(file_path, 0.0) for file_path in group.files)
+
+    target = sum(group_cost(group) for group in groups) / max(workers * tasks_per_worker, 1)
+    tasks = []
+    for group in groups:
+        cost = group_cost(group)
+        tasks += group.split(costs, int(-(-cost // target))) if target > 0 and cost > target else [group]
+    return sorted(tasks, key=group_cost, reverse=True)
@@ -3,11 +3,17 @@ Command History Management
 """
 
 import logging
+from collections import deque
 from datetime import datetime
-from config.constants import COMMAND_TYPES
+from config.constants import COMMAND_TYPES, DEFAULT_HISTORY_DEPTH
 
 class Command:
-    """Base class for commands"""
+    """Base class for commands
+    Commands keep pick IDs and plain values (see Pick.record) rather than references
+    to pick objects, so a deep history stays small.
+    """
+    
+    __slots__ = ('type', 'timestamp')
     
     def __init__(self, command_type):
         """Initialize the command"""
@@ -21,21 +27,49 @@ class Command:
     def undo(self):
         """Undo the command"""
         raise NotImplementedError
+    
+    def merge(self, command):
+        """Absorb a command executed right after this one
+        
+        Returns:
+            True if merged (the later command is then not pushed)
+        """
+        return False
+    
+    def is_noop(self):
+        """Whether undoing/redoing the command would change nothing"""
+        return False
+    
+    def changes(self, undo=False):
+        """Pick changes made by executing (or undoing) the command, for the session journal
+        
+        Returns:
+            (added records, removed IDs, {pick ID: quality}), or None if not journaled
+        """
+        return None
 
 class AddPickCommand(Command):
     """Command to add a pick"""
     
+    __slots__ = ('pick_manager', 'record')
+    
     def __init__(self, pick_manager, file_path, pick):
         """Initialize the command"""
         super().__init__(COMMAND_TYPES['add_pick'])
         self.pick_manager = pick_manager
-        self.file_path = file_path
-        self.pick = pick
+        if pick.id is None:
+            pick.id = pick_manager.create_pick(pick.time).id
+        self.record = pick.record(file_path)
+    
+    @property
+    def pick_id(self):
+        """ID of the added pick"""
+        return self.record[1]
     
     def execute(self):
         """Execute the command"""
         try:
-            self.pick_manager.add_pick(self.file_path, self.pick)
+            self.pick_manager.restore_picks([self.record])
             return True, "Pick added successfully"
         except Exception as e:
             logging.error(f"Failed to add pick: {str(e)}")
@@ -44,26 +78,33 @@ class AddPickCommand(Command):
     def undo(self):
         """Undo the command"""
         try:
-            self.pick_manager.remove_pick(self.file_path, self.pick)
+            self.pick_manager.remove_picks([self.pick_id])
             return True, "Undo add pick successful"
         except Exception as e:
             logging.error(f"Failed to undo add pick: {str(e)}")
             return False, str(e)
+    
+    def changes(self, undo=False):
+        """Pick changes of the command"""
+        return ([], [self.pick_id], {}) if undo else ([self.record], [], {})
 
 class RemovePickCommand(Command):
     """Command to remove a pick"""
     
+    __slots__ = ('pick_manager', 'record')
+    
     def __init__(self, pick_manager, file_path, pick):
         """Initialize the command"""
         super().__init__(COMMAND_TYPES['remove_pick'])
         self.pick_manager = pick_manager
-        self.file_path = file_path
-        self.pick = pick
+        self.record = pick.record(file_path)
     
     def execute(self):
         """Execute the command"""
         try:
-            self.pick_manager.remove_pick(self.file_path, self.pick)
+            removed = self.pick_manager.remove_picks([self.record[1]])
+            if removed:
+                self.record = removed[0]  # Keep the latest quality for undo
             return True, "Pick removed successfully"
         except Exception as e:
             logging.error(f"Failed to remove pick: {str(e)}")
@@ -72,29 +113,37 @@ class RemovePickCommand(Command):
     def undo(self):
         """Undo the command"""
         try:
-            self.pick_manager.add_pick(self.file_path, self.pick)
+            self.pick_manager.restore_picks([self.record])
             return True, "Undo remove pick successful"
         except Exception as e:
             logging.error(f"Failed to undo remove pick: {str(e)}")
             return False, str(e)
+    
+    def changes(self, undo=False):
+        """Pick changes of the command"""
+        return ([self.record], [], {}) if undo else ([], [self.record[1]], {})
 
 class UpdatePickCommand(Command):
-    """Command to update a pick"""
+    """Command to update a pick
+    Consecutive quality changes of the same pick merge into one command.
+    """
+    
+    __slots__ = ('pick_manager', 'file_path', 'pick_id', 'old_quality', 'new_quality')
     
     def __init__(self, pick_manager, file_path, pick, new_quality):
         """Initialize the command"""
         super().__init__(COMMAND_TYPES['update_pick'])
         self.pick_manager = pick_manager
         self.file_path = file_path
-        self.pick = pick
-        self.old_quality = pick.quality
+        self.pick_id = pick.id
+        stored = pick_manager.get_pick_by_id(pick.id)
+        self.old_quality = stored.quality if stored is not None else pick.quality
         self.new_quality = new_quality
     
     def execute(self):
         """Execute the command"""
         try:
-            self.pick_manager.update_pick_quality(self.file_path, self.pick, self.new_quality)
-            self.pick.quality = self.new_quality
+            self.pick_manager.update_qualities({self.pick_id: self.new_quality})
             return True, "Pick updated successfully"
         except Exception as e:
             logging.error(f"Failed to update pick: {str(e)}")
@@ -103,26 +152,159 @@ class UpdatePickCommand(Command):
     def undo(self):
         """Undo the command"""
         try:
-            self.pick_manager.update_pick_quality(self.file_path, self.pick, self.old_quality)
-            self.pick.quality = self.old_quality
+            self.pick_manager.update_qualities({self.pick_id: self.old_quality})
             return True, "Undo update pick successful"
         except Exception as e:
             logging.error(f"Failed to undo update pick: {str(e)}")
             return False, str(e)
+    
+    def merge(self, command):
+        """Merge a following quality change of the same pick"""
+        if isinstance(command, UpdatePickCommand) and command.pick_id == self.pick_id:
+            self.new_quality = command.new_quality
+            self.timestamp = command.timestamp
+            return True
+        return False
+    
+    def is_noop(self):
+        """Quality changed back to where it started"""
+        return self.old_quality == self.new_quality
+    
+    def changes(self, undo=False):
+        """Pick changes of the command"""
+        return [], [], {self.pick_id: self.old_quality if undo else self.new_quality}
+
+class BatchCommand(Command):
+    """Command applying many pick changes as one vectorized operation
+    Executing removes picks, adds picks and changes qualities in bulk through
+    PickManager; undo reverts all of it in bulk.
+    """
+    
+    __slots__ = ('pick_manager', 'added', 'removed', 'quality_changes', 'description')
+    
+    def __init__(self, pick_manager, added=(), removed=(), quality_changes=(), description="Batch operation"):
+        """Initialize the command
+        added: records (file_path, id, time, quality, created_at) of picks to add
+        removed: IDs of picks to remove
+        quality_changes: (pick ID, old quality, new quality) tuples
+        """
+        super().__init__(COMMAND_TYPES['batch_process'])
+        self.pick_manager = pick_manager
+        self.added = tuple(added)
+        self.removed = tuple(removed)  # IDs until executed, then records for undo
+        self.quality_changes = tuple(quality_changes)
+        self.description = description
+    
+    @classmethod
+    def add_picks(cls, pick_manager, picks_by_file, description="Add picks"):
+        """Batch adding picks {file_path: [pick, ...]}"""
+        added = []
+        for file_path, picks in picks_by_file.items():
+            for pick in picks:
+                if pick.id is None:
+                    pick.id = pick_manager.create_pick(pick.time).id
+                added.append(pick.record(file_path))
+        return cls(pick_manager, added=added, description=description)
+    
+    @classmethod
+    def remove_picks(cls, pick_manager, pick_ids, description="Remove picks"):
+        """Batch removing picks by ID"""
+        return cls(pick_manager, removed=pick_ids, description=description)
+    
+    @classmethod
+    def set_quality(cls, pick_manager, pick_ids, quality, description="Set pick quality"):
+        """Batch setting the quality of picks by ID"""
+        changes = []
+        for pick_id in pick_ids:
+            pick = pick_manager.get_pick_by_id(pick_id)
+            if pick is not None and pick.quality != quality:
+                changes.append((pick_id, pick.quality, quality))
+        return cls(pick_manager, quality_changes=changes, description=description)
+    
+    def __len__(self):
+        """Number of pick changes"""
+        return len(self.added) + len(self.removed) + len(self.quality_changes)
+    
+    def _removed_ids(self):
+        """IDs of the removed picks"""
+        return [r[1] if isinstance(r, tuple) else r for r in self.removed]
+    
+    def execute(self):
+        """Execute the command"""
+        try:
+            if self.removed:
+                self.removed = tuple(self.pick_manager.remove_picks(self._removed_ids()))
+            if self.added:
+                self.pick_manager.restore_picks(self.added)
+            if self.quality_changes:
+                self.pick_manager.update_qualities({pick_id: new for pick_id, _, new in self.quality_changes})
+            return True, f"{self.description}: {len(self)} picks"
+        except Exception as e:
+            logging.error(f"Failed to execute batch command: {str(e)}")
+            return False, str(e)
+    
+    def undo(self):
+        """Undo the command"""
+        try:
+            if self.quality_changes:
+                self.pick_manager.update_qualities({pick_id: old for pick_id, old, _ in self.quality_changes})
+            if self.added:
+                self.pick_manager.remove_picks([record[1] for record in self.added])
+            if self.removed:
+                self.pick_manager.restore_picks(self.removed)
+            return True, f"Undo {self.description.lower()}: {len(self)} picks"
+        except Exception as e:
+            logging.error(f"Failed to undo batch command: {str(e)}")
+            return False, str(e)
+    
+    def is_noop(self):
+        """No pick changes"""
+        return len(self) == 0
+    
+    def changes(self, undo=False):
+        """Pick changes of the command"""
+        if undo:
+            return (list(self.removed), [record[1] for record in self.added],
+                    {pick_id: old for pick_id, old, _ in self.quality_changes})
+        return (list(self.added), self._removed_ids(),
+                {pick_id: new for pick_id, _, new in self.quality_changes})
 
 class CommandHistory:
     """Command History Class"""
     
-    def __init__(self):
-        """Initialize command history"""
-        self.undo_stack = []
-        self.redo_stack = []
+    def __init__(self, max_depth=DEFAULT_HISTORY_DEPTH, journal=None):
+        """Initialize command history
+        Only the last max_depth commands can be undone. If a journal (SessionJournal)
+        is set, every executed, undone and redone command is written to it.
+        """
+        self.max_depth = max_depth
+        self.undo_stack = deque(maxlen=max_depth)
+        self.redo_stack = deque(maxlen=max_depth)
+        self.journal = journal
+    
+    def set_journal(self, journal):
+        """Set (or with None, unset) the session journal"""
+        self.journal = journal
+    
+    def _record(self, operation, command):
+        """Write a command to the journal; a failing journal never blocks picking"""
+        if self.journal is None:
+            return
+        try:
+            self.journal.record(operation, command)
+        except Exception as e:
+            logging.error(f"Failed to journal {operation}: {str(e)}")
     
     def execute_command(self, command):
         """Execute command"""
         success, message = command.execute()
         if success:
-            self.undo_stack.append(command)
+            self._record('execute', command)
+            if self.undo_stack and self.undo_stack[-1].merge(command):
+                if self.undo_stack[-1].is_noop():
+                    self.undo_stack.pop()
+            elif not command.is_noop():
+                self.undo_stack.append(command)
             self.redo_stack.clear()
         return success, message
     
@@ -134,6 +316,7 @@ class CommandHistory:
         command = self.undo_stack.pop()
         success, message = command.undo()
         if success:
+            self._record('undo', command)
             self.redo_stack.append(command)
         return success, message
     
@@ -145,6 +328,7 @@ class CommandHistory:
         command = self.redo_stack.pop()
         success, message = command.execute()
         if success:
+            self._record('redo', command)
             self.undo_stack.append(command)
         return success, message
     
@@ -159,4 +343,4 @@ class CommandHistory:
     
     def can_redo(self):
         """Can redo?"""
-        return len(self.redo_stack) > 0 
\ No newline at end of file
+        return len(self.redo_stack) > 0
@@ -3,20 +3,166 @@ Data Export Module
 Provides data export functionality in various formats
 """
 
+import io
 import os
 import csv
+import gzip
 import json
+import time
+import itertools
+import threading
 import numpy as np
-from obspy import Stream, Trace
-from obspy.io.seg2.seg2 import _write_seg2
-from obspy.io.segy.segy import _write_segy
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timezone
+from obspy import Stream, Trace, UTCDateTime
+from typing import List, Dict, Any, Optional, Iterable, Iterator, IO
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
 
 from config.constants import (
     SUPPORTED_EXPORT_FORMATS,
     CSV_COLUMNS,
-    PICK_QUALITY_LEVELS
+    PICK_QUALITY,
+    PICK_QUALITY_LEVELS,
+    PARQUET_COMPRESSION,
+    PARQUET_ROW_GROUP_SIZE,
+    EXPORT_BUFFER_SIZE
 )
+from core.stage_timer import StageHistogram
+
+# Columnar pick schema: (column, pyarrow type factory)
+PARQUET_PICK_COLUMNS = [
+    ('file', lambda: pa.string()),
+    ('network', lambda: pa.string()),
+    ('station', lambda: pa.string()),
+    ('channel', lambda: pa.string()),
+    ('pick_time', lambda: pa.timestamp('us', tz='UTC')),
+    ('offset', lambda: pa.float64()),
+    ('quality', lambda: pa.dictionary(pa.int8(), pa.string())),
+    ('snr', lambda: pa.float64()),
+    ('method', lambda: pa.dictionary(pa.int32(), pa.string())),
+    ('param_hash', lambda: pa.dictionary(pa.int32(), pa.string()))
+]
+
+# Columnar batch result schema
+PARQUET_RESULT_COLUMNS = [
+    ('file', lambda: pa.string()),
+    ('success', lambda: pa.bool_()),
+    ('pick_count', lambda: pa.int32()),
+    ('error', lambda: pa.string()),
+    ('processing_time', lambda: pa.float64())
+]
+
+class BatchSummary:
+    """Running Batch Summary
+    
+    Batch workers call update() as each file finishes; the summary is then
+    available in O(1) without walking the results again. Thread-safe.
+    """
+    
+    def __init__(self):
+        """Initialize an empty summary"""
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.total_files = 0
+        self.successful_files = 0
+        self.failed_files = 0
+        self.total_picks = 0
+        self.quality_distribution = {}
+        self.failures_by_error = {}
+        self.file_wall_time = 0.0
+        self.stage_times = {}  # {stage: {'count': n, 'wall': seconds, 'cpu': seconds}}
+        self.stage_histograms = {}  # {stage: StageHistogram of per-file wall times}
+    
+    def update(self, result: Dict[str, Any]) -> None:
+        """
+        Add the result of one file
+        
+        Args:
+            result: Batch result with 'success', 'picks', 'error' and optionally
+                    'error_type', 'duration' (seconds) and 'stage_times' ({stage: (wall, cpu)})
+        """
+        picks = result.get('picks') or []
+        with self._lock:
+            self.total_files += 1
+            if result.get('success', False):
+                self.successful_files += 1
+            else:
+                self.failed_files += 1
+                error_type = result.get('error_type') or self._error_class(result.get('error'))
+                self.failures_by_error[error_type] = self.failures_by_error.get(error_type, 0) + 1
+            
+            self.total_picks += len(picks)
+            for pick in picks:
+                if 'quality' in pick:
+                    quality = pick['quality']
+                    self.quality_distribution[quality] = self.quality_distribution.get(quality, 0) + 1
+            
+            # processing_time used to hold a completion timestamp; only numeric durations are summed
+            duration = result.get('duration', result.get('processing_time'))
+            if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+                self.file_wall_time += duration
+            
+            for stage, (wall, cpu) in (result.get('stage_times') or {}).items():
+                self._add_stage_time(stage, wall, cpu)
+    
+    def add_stage_time(self, stage: str, wall: float, cpu: float) -> None:
+        """
+        Add wall-clock and CPU time spent in a processing stage by one file
+        
+        Args:
+            stage: Stage name (e.g. 'read', 'preprocess', 'pick')
+            wall: Wall-clock seconds
+            cpu: CPU seconds
+        """
+        with self._lock:
+            self._add_stage_time(stage, wall, cpu)
+    
+    def _add_stage_time(self, stage: str, wall: float, cpu: float) -> None:
+        """Add stage time (caller holds the lock)"""
+        entry = self.stage_times.setdefault(stage, {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+        entry['count'] += 1
+        entry['wall'] += wall
+        entry['cpu'] += cpu
+        histogram = self.stage_histograms.get(stage)
+        if histogram is None:
+            histogram = self.stage_histograms[stage] = StageHistogram()
+        histogram.add(wall)
+    
+    def _error_class(self, error: Optional[str]) -> str:
+        """
+        Get the error class from an error message of the form 'ValueError: ...'
+        """
+        if error:
+            prefix = str(error).split(':', 1)[0].strip()
+            if prefix.isidentifier():
+                return prefix
+        return 'Error'
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the summary as a dictionary
+        
+        Returns:
+            Summary dictionary
+        """
+        with self._lock:
+            return {
+                'total_files': self.total_files,
+                'successful_files': self.successful_files,
+                'failed_files': self.failed_files,
+                'total_picks': self.total_picks,
+                'quality_distribution': dict(self.quality_distribution),
+                'failures_by_error': dict(self.failures_by_error),
+                'processing_time': self.file_wall_time,
+                'elapsed_time': time.monotonic() - self._started,
+                'stage_times': {stage: dict(entry, **self.stage_histograms[stage].to_dict())
+                                for stage, entry in self.stage_times.items()}
+            }
 
 class DataExporter:
     """Data Exporter Class"""
@@ -47,6 +193,10 @@ class DataExporter:
                 self._export_csv(picks, output_file)
             elif format == 'json':
                 self._export_json(picks, output_file)
+            elif format == 'ndjson':
+                return self.stream_picks(picks, output_file, format='ndjson')
+            elif format == 'parquet':
+                self.export_picks_parquet(picks, output_file)
             else:
                 raise ValueError(f"Unsupported export format: {format}")
             
@@ -78,9 +228,7 @@ class DataExporter:
             elif format == 'sac':
                 st.write(output_file, format='SAC')
             elif format == 'segy':
-                _write_segy(st, output_file)
-            elif format == 'seg2':
-                _write_seg2(st, output_file)
+                st.write(output_file, format='SEGY')
             else:
                 raise ValueError(f"Unsupported export format: {format}")
             
@@ -89,16 +237,21 @@ class DataExporter:
             print(f"Export failed: {str(e)}")
             return False
     
-    def export_batch_results(self, results: List[Dict[str, Any]],
+    def export_batch_results(self, results: Iterable[Dict[str, Any]],
                            output_dir: str,
-                           format: str = 'csv') -> bool:
+                           format: str = 'csv',
+                           summary: Optional[BatchSummary] = None,
+                           consolidate: bool = False) -> bool:
         """
-        Export batch results
+        Export batch results in a single pass over results
         
         Args:
-            results: List of batch results
+            results: Iterable of batch results
             output_dir: Output directory
             format: Output format
+            summary: Summary already kept up to date by the batch workers (built here if None)
+            consolidate: Write the picks of all files into one picks.<format> file
+                         instead of one file per input
             
         Returns:
             Whether export was successful
@@ -106,25 +259,311 @@ class DataExporter:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
+        if format == 'parquet':
+            return self.export_batch_results_parquet(list(results), output_dir)
+        
         try:
+            build_summary = summary is None
+            if build_summary:
+                summary = BatchSummary()
+            
+            if consolidate:
+                def all_picks():
+                    for result in results:
+                        if build_summary:
+                            summary.update(result)
+                        for pick in result.get('picks', []):
+                            yield pick if 'file' in pick else dict(pick, file=result['file'])
+                
+                stream_format = 'ndjson' if format == 'json' else format
+                self.stream_picks(all_picks(), os.path.join(output_dir, f'picks.{stream_format}'), stream_format)
+            else:
+                # Export detailed results
+                for result in results:
+                    if build_summary:
+                        summary.update(result)
+                    filename = os.path.basename(result['file'])
+                    base_name = os.path.splitext(filename)[0]
+                    output_file = os.path.join(output_dir, f'{base_name}_picks.{format}')
+                    
+                    if 'picks' in result:
+                        self.export_picks(result['picks'], output_file, format)
+            
             # Export summary results
             summary_file = os.path.join(output_dir, f'summary.{format}')
-            self._export_summary(results, summary_file, format)
+            self._export_summary(summary, summary_file, format)
             
-            # Export detailed results
-            for result in results:
-                filename = os.path.basename(result['file'])
-                base_name = os.path.splitext(filename)[0]
-                output_file = os.path.join(output_dir, f'{base_name}_picks.{format}')
-                
-                if 'picks' in result:
-                    self.export_picks(result['picks'], output_file, format)
+            return True
+        except Exception as e:
+            print(f"Export failed: {str(e)}")
+            return False
+    
+    def stream_picks(self, picks: Iterable[Dict[str, Any]],
+                     output_file: str,
+                     format: str = 'csv',
+                     fieldnames: Optional[List[str]] = None,
+                     compress: Optional[bool] = None,
+                     buffer_size: int = EXPORT_BUFFER_SIZE) -> bool:
+        """
+        Stream picking results to CSV or newline-delimited JSON
+        Picks are written one at a time through a buffered (optionally gzip) stream,
+        so memory use does not depend on the number of picks. Input dictionaries are not modified.
+        
+        Args:
+            picks: Iterable of picking results, e.g. PickManager.iter_pick_rows()
+            output_file: Output file path
+            format: 'csv' or 'ndjson'
+            fieldnames: CSV columns (default: keys of the first pick)
+            compress: Write gzip output (default: when output_file ends with .gz)
+            buffer_size: Write buffer size in bytes
             
+        Returns:
+            Whether export was successful
+        """
+        if format not in ('csv', 'ndjson'):
+            raise ValueError(f"Unsupported streaming format: {format}")
+        if compress is None:
+            compress = output_file.endswith('.gz')
+        
+        try:
+            with self._open_text_stream(output_file, compress, buffer_size) as f:
+                if format == 'ndjson':
+                    for pick in picks:
+                        f.write(json.dumps(pick, default=str, ensure_ascii=False))
+                        f.write('\n')
+                else:
+                    iterator = iter(picks)
+                    first = next(iterator, None)
+                    if first is None and fieldnames is None:
+                        return True
+                    writer = csv.DictWriter(f, fieldnames=fieldnames or list(first.keys()),
+                                            restval='', extrasaction='ignore')
+                    writer.writeheader()
+                    if first is not None:
+                        writer.writerows(self._csv_rows(itertools.chain([first], iterator)))
             return True
         except Exception as e:
             print(f"Export failed: {str(e)}")
             return False
     
+    def _open_text_stream(self, output_file: str, compress: bool, buffer_size: int) -> IO[str]:
+        """
+        Open a buffered text stream for writing, optionally gzip-compressed
+        
+        Args:
+            output_file: Output file path
+            compress: Whether to gzip the output
+            buffer_size: Write buffer size in bytes
+            
+        Returns:
+            Text stream
+        """
+        if compress:
+            raw = io.BufferedWriter(gzip.GzipFile(output_file, mode='wb', compresslevel=6), buffer_size)
+        else:
+            raw = open(output_file, 'wb', buffering=buffer_size)
+        return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    
+    def _csv_rows(self, picks: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield CSV-ready copies of picks, with numeric quality levels converted to descriptions
+        """
+        for pick in picks:
+            quality = pick.get('quality')
+            if isinstance(quality, (int, np.integer)) and not isinstance(quality, bool):
+                pick = dict(pick, quality=PICK_QUALITY_LEVELS.get(int(quality), "Unknown"))
+            yield pick
+    
+    def export_picks_parquet(self, picks: Iterable[Dict[str, Any]],
+                             output_file: str,
+                             compression: str = PARQUET_COMPRESSION,
+                             row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> bool:
+        """
+        Export picking results to a columnar Parquet file
+        Picks are consumed in row-group sized batches, so any iterable can be exported.
+        
+        Args:
+            picks: Iterable of picking results
+            output_file: Output file path
+            compression: Parquet compression codec
+            row_group_size: Number of picks per row group
+            
+        Returns:
+            Whether export was successful
+        """
+        self._require_pyarrow()
+        schema = self._schema(PARQUET_PICK_COLUMNS)
+        
+        try:
+            with pq.ParquetWriter(output_file, schema, compression=compression) as writer:
+                iterator = iter(picks)
+                while True:
+                    batch = list(itertools.islice(iterator, row_group_size))
+                    if not batch:
+                        break
+                    writer.write_table(self._pick_table(batch, schema), row_group_size=row_group_size)
+            return True
+        except Exception as e:
+            print(f"Export failed: {str(e)}")
+            return False
+    
+    def export_batch_results_parquet(self, results: List[Dict[str, Any]],
+                                     output_dir: str,
+                                     compression: str = PARQUET_COMPRESSION,
+                                     row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> bool:
+        """
+        Export batch results as two Parquet tables: one row per file (results.parquet)
+        and one row per pick (picks.parquet). Summary metrics are stored as file metadata.
+        
+        Args:
+            results: List of batch results
+            output_dir: Output directory
+            compression: Parquet compression codec
+            row_group_size: Number of rows per row group
+            
+        Returns:
+            Whether export was successful
+        """
+        self._require_pyarrow()
+        
+        try:
+            schema = self._schema(PARQUET_RESULT_COLUMNS)
+            table = pa.table({
+                'file': [r.get('file') for r in results],
+                'success': [bool(r.get('success', False)) for r in results],
+                'pick_count': [len(r.get('picks', [])) for r in results],
+                'error': [r.get('error') for r in results],
+                'processing_time': [self._seconds(r.get('processing_time')) for r in results]
+            }, schema=schema)
+            
+            summary = BatchSummary()
+            for result in results:
+                summary.update(result)
+            table = table.replace_schema_metadata({'summary': json.dumps(summary.to_dict(), default=str)})
+            pq.write_table(table, os.path.join(output_dir, 'results.parquet'),
+                           compression=compression, row_group_size=row_group_size)
+            
+            # Flatten picks of all files into one table
+            def all_picks():
+                for result in results:
+                    for pick in result.get('picks', []):
+                        if 'file' in pick:
+                            yield pick
+                        else:
+                            yield dict(pick, file=result.get('file'))
+            
+            return self.export_picks_parquet(all_picks(), os.path.join(output_dir, 'picks.parquet'),
+                                             compression=compression, row_group_size=row_group_size)
+        except Exception as e:
+            print(f"Export failed: {str(e)}")
+            return False
+    
+    def read_parquet(self, input_file: str,
+                     columns: Optional[List[str]] = None,
+                     filters: Optional[List] = None):
+        """
+        Read a Parquet file written by this exporter
+        Filters are pushed down to row groups, e.g. [('station', '=', 'BHPC'), ('quality', 'in', ['A', 'B'])].
+        
+        Args:
+            input_file: Parquet file path
+            columns: Columns to read (all if None)
+            filters: pyarrow filter expression in DNF list form
+            
+        Returns:
+            pandas DataFrame
+        """
+        self._require_pyarrow()
+        return pq.read_table(input_file, columns=columns, filters=filters).to_pandas()
+    
+    def read_parquet_summary(self, input_file: str) -> Dict[str, Any]:
+        """
+        Read the summary metrics stored in a results.parquet file
+        
+        Args:
+            input_file: Parquet file path
+            
+        Returns:
+            Summary dictionary
+        """
+        self._require_pyarrow()
+        metadata = pq.read_schema(input_file).metadata or {}
+        return json.loads(metadata.get(b'summary', b'{}'))
+    
+    def _require_pyarrow(self) -> None:
+        """
+        Ensure the optional pyarrow dependency is installed
+        """
+        if pa is None:
+            raise ImportError("Parquet support requires pyarrow: pip install pyarrow")
+    
+    def _schema(self, columns: List) -> 'pa.Schema':
+        """
+        Build a pyarrow schema from a column specification
+        """
+        return pa.schema([(name, type_factory()) for name, type_factory in columns])
+    
+    def _pick_table(self, picks: List[Dict[str, Any]], schema: 'pa.Schema') -> 'pa.Table':
+        """
+        Convert a batch of pick dictionaries to a pyarrow table
+        
+        Args:
+            picks: Batch of picking results
+            schema: Pick schema
+            
+        Returns:
+            pyarrow table
+        """
+        columns = {
+            'file': [p.get('file', p.get('file_path')) for p in picks],
+            'network': [p.get('network') for p in picks],
+            'station': [p.get('station') for p in picks],
+            'channel': [p.get('channel') for p in picks],
+            'pick_time': [self._absolute_time(p) for p in picks],
+            'offset': [self._seconds(p.get('offset', p.get('time'))) for p in picks],
+            'quality': [self._quality_code(p.get('quality')) for p in picks],
+            'snr': [self._seconds(p.get('snr')) for p in picks],
+            'method': [p.get('method') for p in picks],
+            'param_hash': [p.get('param_hash') for p in picks]
+        }
+        return pa.table(columns, schema=schema)
+    
+    def _absolute_time(self, pick: Dict[str, Any]) -> Optional[datetime]:
+        """
+        Get the absolute pick time of a pick, if known
+        Uses 'pick_time' (UTCDateTime, datetime, ISO string or POSIX seconds),
+        or 'starttime' plus the relative 'time'.
+        """
+        value = pick.get('pick_time')
+        if value is None and pick.get('starttime') is not None and pick.get('time') is not None:
+            value = UTCDateTime(pick['starttime']) + float(pick['time'])
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        if isinstance(value, (int, float, np.floating)):
+            value = UTCDateTime(float(value))
+        return UTCDateTime(value).datetime.replace(tzinfo=timezone.utc)
+    
+    def _seconds(self, value: Any) -> Optional[float]:
+        """
+        Convert a numeric value to float, mapping non-numeric values (e.g. timestamps) to None
+        """
+        if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+            return float(value)
+        return None
+    
+    def _quality_code(self, quality: Any) -> Optional[str]:
+        """
+        Normalize numeric quality levels (0, 1, 2) to letter codes (A, B, C)
+        """
+        if quality is None:
+            return None
+        if isinstance(quality, (int, np.integer)):
+            codes = list(PICK_QUALITY)
+            return codes[int(quality)] if 0 <= int(quality) < len(codes) else "Unknown"
+        return str(quality)
+    
     def _export_csv(self, picks: List[Dict[str, Any]],
                    output_file: str) -> None:
         """
@@ -135,13 +574,13 @@ class DataExporter:
             output_file: Output file path
         """
         with open(output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
             writer.writeheader()
             
             for pick in picks:
-                # Convert quality level to description
+                # Convert quality level to description on a copy, leaving the caller's pick intact
                 if 'quality' in pick:
-                    pick['quality'] = PICK_QUALITY_LEVELS.get(pick['quality'], "Unknown")
+                    pick = dict(pick, pick_quality=PICK_QUALITY_LEVELS.get(pick['quality'], "Unknown"))
                 
                 writer.writerow(pick)
     
@@ -157,30 +596,22 @@ class DataExporter:
         with open(output_file, 'w') as f:
             json.dump(picks, f, indent=4, ensure_ascii=False)
     
-    def _export_summary(self, results: List[Dict[str, Any]],
+    def _export_summary(self, summary: BatchSummary,
                        output_file: str,
                        format: str) -> None:
         """
         Export summary results
         
         Args:
-            results: List of batch results
+            summary: Batch summary
             output_file: Output file path
             format: Output format
         """
-        summary = {
-            'total_files': len(results),
-            'successful_files': sum(1 for r in results if r.get('success', False)),
-            'failed_files': sum(1 for r in results if not r.get('success', False)),
-            'total_picks': sum(len(r.get('picks', [])) for r in results),
-            'quality_distribution': self._get_quality_distribution(results),
-            'processing_time': sum(r.get('processing_time', 0) for r in results),
-            'results': results
-        }
+        summary = summary.to_dict()
         
         if format == 'json':
             with open(output_file, 'w') as f:
-                json.dump(summary, f, indent=4, ensure_ascii=False)
+                json.dump(summary, f, indent=4, ensure_ascii=False, default=str)
         else:
             with open(output_file, 'w', newline='') as f:
                 writer = csv.writer(f)
@@ -190,30 +621,25 @@ class DataExporter:
                 writer.writerow(['Failed Files', summary['failed_files']])
                 writer.writerow(['Total Picks', summary['total_picks']])
                 writer.writerow(['Total Processing Time', f"{summary['processing_time']:.2f} seconds"])
+                writer.writerow(['Elapsed Time', f"{summary['elapsed_time']:.2f} seconds"])
                 
                 # Write quality distribution
                 writer.writerow([])
                 writer.writerow(['Quality Distribution'])
                 for quality, count in summary['quality_distribution'].items():
-                    writer.writerow([PICK_QUALITY_LEVELS.get(quality, "Unknown"), count])
-    
-    def _get_quality_distribution(self, results: List[Dict[str, Any]]) -> Dict[int, int]:
-        """
-        Get quality distribution
-        
-        Args:
-            results: List of batch results
-            
-        Returns:
-            Quality distribution dictionary
-        """
-        distribution = {}
-        
-        for result in results:
-            if 'picks' in result:
-                for pick in result['picks']:
-                    if 'quality' in pick:
-                        quality = pick['quality']
-                        distribution[quality] = distribution.get(quality, 0) + 1
-        
-        return distribution 
\ No newline at end of file
+                    writer.writerow([PICK_QUALITY_LEVELS.get(quality, quality), count])
+                
+                # Write failures by error class
+                if summary['failures_by_error']:
+                    writer.writerow([])
+                    writer.writerow(['Failures', 'Count'])
+                    for error_type, count in summary['failures_by_error'].items():
+                        writer.writerow([error_type, count])
+                
+                # Write stage timings
+                if summary['stage_times']:
+                    writer.writerow([])
+                    writer.writerow(['Stage', 'Files', 'Wall Time (s)', 'CPU Time (s)', 'P50 (s)', 'P95 (s)', 'Max (s)'])
+                    for stage, entry in summary['stage_times'].items():
+                        writer.writerow([stage, entry['count'], f"{entry['wall']:.3f}", f"{entry['cpu']:.3f}",
+                                         f"{entry['p50']:.4f}", f"{entry['p95']:.4f}", f"{entry['max']:.4f}"])
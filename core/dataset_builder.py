@@ -0,0 +1,270 @@
+"""
+Training Dataset Builder Module
+Cuts fixed-length waveform windows around picks into sharded, memory-mappable arrays
+"""
+
+import os
+import csv
+import json
+import logging
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+from obspy import read
+
+METADATA_FILE = 'metadata.csv'
+DATASET_FILE = 'dataset.json'
+SHARD_PATTERN = 'waveforms_{:05d}.npy'
+
+METADATA_COLUMNS = [
+    'shard', 'row', 'trace_id', 'file_path', 'pick_id', 'pick_sample',
+    'trace_sample', 'quality', 'snr', 'sampling_rate', 'window_start'
+]
+
+def extract_windows(task: Tuple[str, List[Tuple[int, float, str]], Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]], Optional[np.ndarray], Optional[str]]:
+    """
+    Read one waveform file and cut a window around each of its picks (runs in a worker process)
+
+    Args:
+        task: (file path, [(pick ID, pick time relative to trace start, quality), ...], parameters)
+
+    Returns:
+        (file path, metadata rows, windows array [n_picks, window_length], error message)
+    """
+    file_path, picks, params = task
+    try:
+        tr = read(file_path)[0]
+        sampling_rate = params['sampling_rate']
+        if sampling_rate and tr.stats.sampling_rate != sampling_rate:
+            tr.resample(sampling_rate)
+        fs = tr.stats.sampling_rate
+        data = tr.data
+
+        n_before = int(round(params['window_before'] * fs))
+        n_after = int(round(params['window_after'] * fs))
+        window_length = n_before + n_after
+        snr_samples = max(1, int(round(params['snr_window'] * fs)))
+
+        windows = np.zeros((len(picks), window_length), dtype=np.float32)
+        rows = []
+        for i, (pick_id, pick_time, quality) in enumerate(picks):
+            trace_sample = int(round(pick_time * fs))
+            start = trace_sample - n_before
+
+            # Copy the overlap between the window and the trace, zero-padding outside
+            src_start = max(start, 0)
+            src_end = min(start + window_length, len(data))
+            if src_end > src_start:
+                windows[i, src_start - start:src_end - start] = data[src_start:src_end]
+
+            noise = windows[i, max(0, n_before - snr_samples):n_before]
+            signal = windows[i, n_before:n_before + snr_samples]
+            noise_power = float(np.mean(noise.astype(np.float64) ** 2)) if len(noise) else 0.0
+            signal_power = float(np.mean(signal.astype(np.float64) ** 2)) if len(signal) else 0.0
+            snr = 10 * np.log10(signal_power / noise_power) if noise_power > 0 and signal_power > 0 else float('nan')
+
+            rows.append({
+                'trace_id': tr.id,
+                'file_path': file_path,
+                'pick_id': pick_id,
+                'pick_sample': n_before,
+                'trace_sample': trace_sample,
+                'quality': quality,
+                'snr': snr,
+                'sampling_rate': fs,
+                'window_start': str(tr.stats.starttime + start / fs)
+            })
+        return file_path, rows, windows, None
+    except Exception as e:
+        return file_path, [], None, f"{type(e).__name__}: {str(e)}"
+
+class DatasetBuilder:
+    """Training Dataset Builder Class"""
+
+    def __init__(self, window_before: float = 5.0,
+                 window_after: float = 25.0,
+                 sampling_rate: Optional[float] = 100.0,
+                 snr_window: float = 2.0,
+                 shard_size: int = 4096,
+                 n_workers: int = 0):
+        """
+        Initializes the dataset builder
+
+        Args:
+            window_before: Seconds kept before each pick
+            window_after: Seconds kept after each pick
+            sampling_rate: Common sampling rate of the dataset (None keeps the native rate,
+                           which must then be identical for all traces)
+            snr_window: Seconds before/after the pick used for the SNR estimate
+            shard_size: Number of windows per shard file
+            n_workers: Worker processes (0 processes files in the calling process)
+        """
+        self.params = {
+            'window_before': window_before,
+            'window_after': window_after,
+            'sampling_rate': sampling_rate,
+            'snr_window': snr_window
+        }
+        self.shard_size = shard_size
+        self.n_workers = n_workers
+
+    def build(self, pick_rows: Iterable[Dict[str, Any]], output_dir: str) -> Dict[str, Any]:
+        """
+        Builds a dataset from pick rows
+
+        Args:
+            pick_rows: Pick rows grouped by file, e.g. PickManager.iter_pick_rows()
+            output_dir: Output directory
+
+        Returns:
+            Dataset description (also written to dataset.json)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        writer = _ShardWriter(output_dir, self.shard_size)
+        errors = {}
+
+        try:
+            for file_path, rows, windows, error in self._run(self._tasks(pick_rows)):
+                if error:
+                    errors[file_path] = error
+                    logging.warning(f"Dataset builder skipped {os.path.basename(file_path)}: {error}")
+                    continue
+                writer.write(rows, windows)
+        finally:
+            writer.close()
+
+        description = dict(self.params,
+                           window_length=writer.window_length,
+                           n_windows=writer.n_windows,
+                           shards=writer.shards,
+                           failed_files=errors)
+        with open(os.path.join(output_dir, DATASET_FILE), 'w', encoding='utf-8') as f:
+            json.dump(description, f, indent=4, ensure_ascii=False)
+        logging.info(f"Dataset written to {output_dir}: {writer.n_windows} windows in {len(writer.shards)} shards")
+        return description
+
+    def _tasks(self, pick_rows: Iterable[Dict[str, Any]]) -> Iterator[Tuple]:
+        """
+        Groups consecutive pick rows of the same file into worker tasks
+        """
+        for file_path, rows in itertools.groupby(pick_rows, key=lambda row: row['file_path']):
+            picks = [(row['id'], float(row['time']), row['quality']) for row in rows]
+            yield file_path, picks, self.params
+
+    def _run(self, tasks: Iterator[Tuple]) -> Iterator[Tuple]:
+        """
+        Runs extraction tasks, keeping at most two tasks per worker in flight to bound memory
+        """
+        if self.n_workers <= 0:
+            for task in tasks:
+                yield extract_windows(task)
+            return
+
+        max_pending = 2 * self.n_workers
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            pending = set()
+            for task in tasks:
+                pending.add(executor.submit(extract_windows, task))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in pending:
+                yield future.result()
+
+class _ShardWriter:
+    """Collects windows into fixed-size shards and streams their metadata"""
+
+    def __init__(self, output_dir: str, shard_size: int):
+        """Initialize the writer"""
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.window_length = None
+        self.n_windows = 0
+        self.shards = []
+        self.buffer = None
+        self.buffer_rows = 0
+        self.metadata_file = open(os.path.join(output_dir, METADATA_FILE), 'w', newline='', encoding='utf-8')
+        self.metadata = csv.DictWriter(self.metadata_file, fieldnames=METADATA_COLUMNS)
+        self.metadata.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]], windows: np.ndarray) -> None:
+        """Append windows of one file"""
+        if self.window_length is None:
+            self.window_length = windows.shape[1]
+            self.buffer = np.empty((self.shard_size, self.window_length), dtype=np.float32)
+        elif windows.shape[1] != self.window_length:
+            raise ValueError("All traces must share one sampling rate; set a dataset sampling_rate")
+
+        for row, window in zip(rows, windows):
+            self.buffer[self.buffer_rows] = window
+            self.metadata.writerow(dict(row, shard=len(self.shards), row=self.buffer_rows))
+            self.buffer_rows += 1
+            self.n_windows += 1
+            if self.buffer_rows == self.shard_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Write the buffered windows as one shard"""
+        if self.buffer_rows == 0:
+            return
+        name = SHARD_PATTERN.format(len(self.shards))
+        np.save(os.path.join(self.output_dir, name), self.buffer[:self.buffer_rows])
+        self.shards.append(name)
+        self.buffer_rows = 0
+
+    def close(self) -> None:
+        """Flush the last shard and close the metadata table"""
+        self._flush()
+        self.metadata_file.close()
+
+class TrainingDataset:
+    """Memory-mapped reader for datasets written by DatasetBuilder"""
+
+    def __init__(self, dataset_dir: str):
+        """
+        Opens a dataset
+
+        Args:
+            dataset_dir: Directory written by DatasetBuilder.build
+        """
+        import pandas as pd
+
+        self.dataset_dir = dataset_dir
+        with open(os.path.join(dataset_dir, DATASET_FILE), 'r', encoding='utf-8') as f:
+            self.description = json.load(f)
+        self.metadata = pd.read_csv(os.path.join(dataset_dir, METADATA_FILE))
+        self._shards = {}
+
+    def __len__(self) -> int:
+        """Number of windows"""
+        return len(self.metadata)
+
+    def shard(self, index: int) -> np.ndarray:
+        """
+        Gets a memory-mapped shard
+
+        Args:
+            index: Shard number
+
+        Returns:
+            Read-only array [n_windows, window_length]
+        """
+        if index not in self._shards:
+            path = os.path.join(self.dataset_dir, self.description['shards'][index])
+            self._shards[index] = np.load(path, mmap_mode='r')
+        return self._shards[index]
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Gets one window and its metadata
+
+        Args:
+            index: Window number
+
+        Returns:
+            (waveform window, metadata row)
+        """
+        row = self.metadata.iloc[index]
+        return self.shard(int(row['shard']))[int(row['row'])], row.to_dict()
@@ -0,0 +1,74 @@
+"""
+Waveform Decimation Module
+Provides pixel-aware min/max envelopes for drawing long waveforms
+"""
+
+import math
+import numpy as np
+from typing import Tuple
+
+def minmax_envelope(data: np.ndarray,
+                    sampling_rate: float,
+                    t0: float,
+                    t1: float,
+                    n_columns: int,
+                    time_offset: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes a min/max envelope of the samples visible in [t0, t1]
+
+    Samples are grouped into about one bin per pixel column. Each bin contributes its
+    minimum and maximum sample, in the order they occur and at their true times, so
+    sharp onsets stay visible. Bins are aligned to a global grid so the envelope does
+    not jitter while panning. Times are computed from time_offset + index / sampling_rate
+    and are never materialized for the whole trace.
+
+    Args:
+        data: Waveform samples
+        sampling_rate: Sampling rate (Hz)
+        t0: Start of the visible range (s)
+        t1: End of the visible range (s)
+        n_columns: Number of pixel columns of the visible range
+        time_offset: Time of the first sample (s)
+
+    Returns:
+        (times, values) of the polyline to draw
+    """
+    n = len(data)
+    i0 = max(0, int(math.floor((t0 - time_offset) * sampling_rate)) - 1)
+    i1 = min(n, int(math.ceil((t1 - time_offset) * sampling_rate)) + 2)
+    if i1 <= i0:
+        return np.empty(0), np.empty(0, dtype=data.dtype)
+
+    n_columns = max(1, int(n_columns))
+    if i1 - i0 <= 2 * n_columns:
+        # Few enough samples to draw them all
+        index = np.arange(i0, i1)
+        return time_offset + index / sampling_rate, data[i0:i1]
+
+    bin_size = int(math.ceil((i1 - i0) / n_columns))
+    i0 = (i0 // bin_size) * bin_size
+    n_bins = int(math.ceil((i1 - i0) / bin_size))
+
+    # Full bins are reduced with one reshape; the last bin may be partial
+    n_full = min(n_bins, (n - i0) // bin_size)
+    blocks = data[i0:i0 + n_full * bin_size].reshape(n_full, bin_size)
+    first = np.empty(n_bins, dtype=np.int64)
+    second = np.empty(n_bins, dtype=np.int64)
+    arg_min = blocks.argmin(axis=1)
+    arg_max = blocks.argmax(axis=1)
+    offsets = i0 + np.arange(n_full, dtype=np.int64) * bin_size
+    first[:n_full] = offsets + np.minimum(arg_min, arg_max)
+    second[:n_full] = offsets + np.maximum(arg_min, arg_max)
+
+    if n_full < n_bins:
+        start = i0 + n_full * bin_size
+        tail = data[start:min(n, start + bin_size)]
+        tail_min = start + int(tail.argmin())
+        tail_max = start + int(tail.argmax())
+        first[n_full] = min(tail_min, tail_max)
+        second[n_full] = max(tail_min, tail_max)
+
+    index = np.empty(2 * n_bins, dtype=np.int64)
+    index[0::2] = first
+    index[1::2] = second
+    return time_offset + index / sampling_rate, data[index]
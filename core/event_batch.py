@@ -0,0 +1,179 @@
+"""
+Event-Grouped Batch Module
+Groups batch files by event ID so event-level resources are prepared once per event
+"""
+
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from obspy import UTCDateTime
+
+from config.constants import (
+    AUTO_PICK_STA_WINDOW,
+    AUTO_PICK_LTA_WINDOW,
+    AUTO_PICK_THRESHOLD
+)
+from core.file_manager import parse_file_info
+from core.waveform_processor import ProcessingPlan
+
+def group_files_by_event(files: List[str]) -> 'OrderedDict[str, List[str]]':
+    """
+    Groups files by the event ID in their names, keeping the order of first appearance
+
+    Args:
+        files: Waveform files (NET.STA.evid.ID.mseed)
+
+    Returns:
+        {event ID: [file, ...]}; files without an event ID are grouped under 'N/A'
+    """
+    groups = OrderedDict()
+    for file_path in files:
+        groups.setdefault(parse_file_info(file_path)['event_id'], []).append(file_path)
+    return groups
+
+class EnergyWorkspace:
+    """Reusable buffers for cumulative-energy STA/LTA
+
+    Buffers grow to the longest trace seen and are then reused, so picking many
+    traces of one event allocates once.
+    """
+
+    def __init__(self):
+        """Initializes an empty workspace"""
+        self.capacity = 0
+        self._square = self._cumulative = self._sta = self._lta = None
+
+    def arrays(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Views of the buffers for a trace of n samples
+
+        Returns:
+            (squared samples [n], cumulative energy [n + 1], STA [n], LTA [n])
+        """
+        if n > self.capacity:
+            self.capacity = n
+            self._square = np.empty(n)
+            self._cumulative = np.empty(n + 1)
+            self._sta = np.empty(n)
+            self._lta = np.empty(n)
+        return self._square[:n], self._cumulative[:n + 1], self._sta[:n], self._lta[:n]
+
+def _window_mean(cumulative: np.ndarray, window: int, out: np.ndarray) -> np.ndarray:
+    """
+    Mean energy of the `window` samples before each sample (of samples 0..i at the start)
+
+    Args:
+        cumulative: Cumulative energy with a leading 0
+        window: Window length (samples)
+        out: Output array of length len(cumulative) - 1
+    """
+    n = len(out)
+    head = min(window, n)
+    out[:head] = cumulative[1:head + 1] / np.arange(1, head + 1)
+    if n > window:
+        np.subtract(cumulative[window:n], cumulative[:n - window], out=out[window:])
+        out[window:] /= window
+    return out
+
+def sta_lta_trigger(data: np.ndarray, sampling_rate: float, workspace: Optional[EnergyWorkspace] = None,
+                    sta: float = AUTO_PICK_STA_WINDOW, lta: float = AUTO_PICK_LTA_WINDOW,
+                    threshold: float = AUTO_PICK_THRESHOLD, first: int = 0) -> Optional[int]:
+    """
+    First sample whose STA/LTA energy ratio exceeds the threshold
+
+    STA and LTA are window means from one cumulative sum of the squared samples,
+    so the cost does not depend on the window lengths.
+
+    Args:
+        data: Samples
+        sampling_rate: Sampling rate (Hz)
+        workspace: Buffers to reuse (allocated per call if None)
+        sta: STA window (s)
+        lta: LTA window (s)
+        threshold: Trigger threshold
+        first: First sample considered (earlier samples only feed the windows)
+
+    Returns:
+        Sample index, or None if the ratio never exceeds the threshold
+    """
+    n = len(data)
+    if n == 0:
+        return None
+    square, cumulative, sta_mean, lta_mean = (workspace or EnergyWorkspace()).arrays(n)
+    np.square(data, out=square)
+    cumulative[0] = 0.0
+    np.cumsum(square, out=cumulative[1:])
+    _window_mean(cumulative, max(int(sta * sampling_rate), 1), sta_mean)
+    _window_mean(cumulative, max(int(lta * sampling_rate), 1), lta_mean)
+    lta_mean += 1e-10  # Avoid division by zero
+    np.divide(sta_mean, lta_mean, out=sta_mean)
+    triggers = np.flatnonzero(sta_mean[first:] > threshold)
+    return int(triggers[0]) + first if len(triggers) else None
+
+class EventGroup:
+    """Files of one event and the resources shared by them"""
+
+    def __init__(self, event_id: str, files: List[str]):
+        """
+        Initializes the group
+
+        Args:
+            event_id: Event ID
+            files: Files of the event
+        """
+        self.event_id = event_id
+        self.files = files
+        self.windows: Dict[str, Optional[Tuple[UTCDateTime, UTCDateTime]]] = {}
+        self.plan = ProcessingPlan()
+        self.workspace = EnergyWorkspace()
+
+    def prepare(self, plan: ProcessingPlan, predictor=None, before: float = 0.0, after: float = 0.0):
+        """
+        Computes the event-level resources once
+
+        Args:
+            plan: Preprocessing plan shared by the traces of the event
+            predictor: ArrivalPredictor for read windows (None reads whole records)
+            before: Seconds read before the predicted arrival
+            after: Seconds read after the predicted arrival
+        """
+        self.plan = plan
+        if predictor is not None:
+            self.windows = predictor.windows(self.files, before, after)
+
+    def split(self, costs: Dict[str, float], parts: int) -> List['EventGroup']:
+        """
+        Splits the files into groups of similar cost sharing the prepared resources
+
+        Files are assigned most costly first to the cheapest group; each group keeps
+        the file order of the event.
+
+        Args:
+            costs: Estimated cost of each file
+            parts: Number of groups (at most one per file)
+
+        Returns:
+            The groups, or [self] if the event is not split
+        """
+        parts = min(parts, len(self.files))
+        if parts <= 1:
+            return [self]
+        members = [[] for _ in range(parts)]
+        loads = [0.0] * parts
+        for file_path in sorted(self.files, key=lambda f: costs.get(f, 0.0), reverse=True):
+            cheapest = loads.index(min(loads))
+            members[cheapest].append(file_path)
+            loads[cheapest] += costs.get(file_path, 0.0)
+        position = {file_path: i for i, file_path in enumerate(self.files)}
+        groups = []
+        for files in members:
+            group = EventGroup(self.event_id, sorted(files, key=position.get))
+            group.plan = self.plan
+            group.windows = {file_path: self.windows[file_path] for file_path in files if file_path in self.windows}
+            groups.append(group)
+        return groups
+
+    def __len__(self):
+        """Number of files"""
+        return len(self.files)
@@ -3,9 +3,29 @@ File Management
 """
 
 import os
+import re
+import struct
 import logging
-from obspy import read
+from functools import lru_cache
+from obspy import read, UTCDateTime
 from config.settings import Settings
+from core.waveform_processor import WaveformProcessor
+from core.mseed_index import MseedIndexCache
+
+EVENT_ID_PATTERN = re.compile(r'evid\.(\d+)')
+
+@lru_cache(maxsize=None)
+def parse_file_info(file_path):
+    """Parse network, station and event ID from a file name like NET.STA.evid.12345.mseed"""
+    file_name = os.path.basename(file_path)
+    parts = file_name.split('.')
+    evid_match = EVENT_ID_PATTERN.search(file_name)
+    return {
+        'file_name': file_name,
+        'network': parts[0] if len(parts) > 2 else '',
+        'station': parts[1] if len(parts) > 2 else '',
+        'event_id': evid_match.group(1) if evid_match else 'N/A'
+    }
 
 class FileManager:
     """File Management Class"""
@@ -13,15 +33,19 @@ class FileManager:
     def __init__(self):
         """Initialize File Manager"""
         self.settings = Settings()
+        self.processor = WaveformProcessor(self.settings)
+        self.mseed_indexes = MseedIndexCache(self.settings.get('storage', 'cache_dir', ''))
         self.files = []
         self.current_file = None
         self.current_trace = None
     
-    def load_file(self, file_path):
-        """Load file"""
+    def load_file(self, file_path, starttime=None, endtime=None):
+        """Load file
+        With starttime and endtime (UTCDateTime), only that window is read.
+        """
         try:
             # Read file
-            st = read(file_path)
+            st = self._read_stream(file_path, starttime, endtime)
             if len(st) > 0:
                 # Save file information
                 self.current_file = file_path
@@ -39,6 +63,61 @@ class FileManager:
             logging.error(f"Failed to load file: {str(e)}")
             raise
     
+    def set_current(self, file_path, trace):
+        """Make an already loaded (and preprocessed) trace the current file"""
+        self.current_file = file_path
+        self.current_trace = trace
+    
+    def read_trace(self, file_path, starttime=None, endtime=None, preprocess=True):
+        """Read and preprocess the first trace of a file without changing the current file
+        With starttime and endtime (UTCDateTime), only that window is read. With
+        preprocess=False the raw trace is returned (e.g. to preprocess many at once).
+        Safe to call from worker threads.
+        """
+        st = self._read_stream(file_path, starttime, endtime)
+        if len(st) == 0:
+            raise ValueError("File is empty")
+        trace = st[0]
+        if preprocess and self.settings.get('process', 'preprocess'):
+            self._preprocess(trace)
+        return trace
+    
+    def record_starttime(self, file_path):
+        """Start time of the first trace of a file, without decoding samples"""
+        if os.path.splitext(file_path)[1].lower() in ('.mseed', '.seed'):
+            try:
+                index = self.mseed_indexes.get(file_path)
+                if len(index):
+                    return UTCDateTime(float(index.starttimes[0]))
+            except (ValueError, struct.error):
+                pass
+        return read(file_path, headonly=True)[0].stats.starttime
+
+    def record_span(self, file_path):
+        """Start and end time of the first trace of a file, without decoding samples"""
+        if os.path.splitext(file_path)[1].lower() in ('.mseed', '.seed'):
+            try:
+                index = self.mseed_indexes.get(file_path)
+                if len(index):
+                    mask = index.trace_codes == index.trace_codes[0]
+                    return (UTCDateTime(float(index.starttimes[mask].min())),
+                            UTCDateTime(float(index.endtimes[mask].max())))
+            except (ValueError, struct.error):
+                pass
+        stats = read(file_path, headonly=True)[0].stats
+        return stats.starttime, stats.endtime
+
+    def _read_stream(self, file_path, starttime=None, endtime=None):
+        """Read a file, or only the records of a time window of a MiniSEED file"""
+        if starttime is None or endtime is None:
+            return read(file_path)
+        if os.path.splitext(file_path)[1].lower() in ('.mseed', '.seed'):
+            try:
+                return self.mseed_indexes.get(file_path).read(starttime, endtime)
+            except (ValueError, struct.error) as e:
+                logging.warning(f"Indexed read of {file_path} failed, reading the whole file: {str(e)}")
+        return read(file_path, starttime=starttime, endtime=endtime)
+    
     def scan_directory(self, dir_path):
         """Scan directory"""
         try:
@@ -80,29 +159,15 @@ class FileManager:
     def preprocess_trace(self):
         """Preprocess waveform"""
         if self.current_trace:
-            try:
-                # Detrend
-                self.current_trace.detrend('demean')
-                
-                # Resample
-                sampling_rate = self.settings.get('process', 'sampling_rate')
-                if sampling_rate:
-                    self.current_trace.resample(sampling_rate)
-                
-                # Filter
-                filter_type = self.settings.get('filter', 'type')
-                freq_range = self.settings.get('filter', 'freq_range')
-                if filter_type and freq_range:
-                    if filter_type == 'bandpass':
-                        self.current_trace.filter('bandpass', freqmin=freq_range[0], freqmax=freq_range[1])
-                    elif filter_type == 'highpass':
-                        self.current_trace.filter('highpass', freq=freq_range[0])
-                    elif filter_type == 'lowpass':
-                        self.current_trace.filter('lowpass', freq=freq_range[1])
-                
-            except Exception as e:
-                logging.error(f"Failed to preprocess waveform: {str(e)}")
-                raise
+            self._preprocess(self.current_trace)
+    
+    def _preprocess(self, trace):
+        """Run the preprocessing plan of the settings on a trace in place"""
+        try:
+            self.processor.process(trace)
+        except Exception as e:
+            logging.error(f"Failed to preprocess waveform: {str(e)}")
+            raise
     
     def export_data(self, file_path):
         """Export data"""
@@ -0,0 +1,296 @@
+"""
+MiniSEED Index Module
+Per-file index of record offsets and times, used to decode only the records of a time window
+"""
+
+import io
+import os
+import mmap
+import struct
+import hashlib
+import logging
+import calendar
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from obspy import read, Stream, UTCDateTime
+
+from config.constants import MSEED_INDEX_DIR, MSEED_INDEX_CACHE
+from core.waveform_pyramid import default_cache_dir
+
+FIXED_HEADER_SIZE = 48
+INDEX_VERSION = 1
+
+def _sampling_rate(factor: int, multiplier: int) -> float:
+    """Sampling rate from the SEED rate factor and multiplier"""
+    if factor == 0:
+        return 0.0
+    if factor > 0 and multiplier >= 0:
+        return float(factor * max(multiplier, 1))
+    if factor > 0:
+        return -factor / multiplier
+    if multiplier > 0:
+        return -multiplier / factor
+    return 1.0 / (factor * multiplier)
+
+def _parse_header(buffer, offset: int) -> Tuple[str, float, int, float, int]:
+    """
+    Parses the fixed header and blockettes 1000/1001 of one record
+
+    Args:
+        buffer: File contents (bytes or mmap)
+        offset: Byte offset of the record
+
+    Returns:
+        (trace ID, start timestamp, sample count, sampling rate, record length)
+    """
+    header = buffer[offset:offset + FIXED_HEADER_SIZE]
+    if len(header) < FIXED_HEADER_SIZE or header[6:7] not in (b'D', b'R', b'Q', b'M'):
+        raise ValueError(f"No MiniSEED record at byte {offset}")
+
+    # Byte order: the year must be plausible
+    byteorder = '>'
+    year, = struct.unpack_from('>H', header, 20)
+    if not 1900 <= year <= 2500:
+        byteorder = '<'
+    (year, julday, hour, minute, second, _, fraction, npts, rate_factor, rate_multiplier,
+     activity_flags, _, _, _, time_correction, _, blockette_offset) = struct.unpack_from(
+        byteorder + 'HHBBBBHHhhBBBBiHH', header, 20)
+
+    record_length = 0
+    microseconds = 0
+    seen = set()
+    while blockette_offset and blockette_offset not in seen:
+        seen.add(blockette_offset)
+        blockette_type, next_offset = struct.unpack_from(byteorder + 'HH', buffer, offset + blockette_offset)
+        if blockette_type == 1000:
+            record_length = 1 << buffer[offset + blockette_offset + 6]
+        elif blockette_type == 1001:
+            microseconds = struct.unpack_from('b', buffer, offset + blockette_offset + 5)[0]
+        blockette_offset = next_offset
+    if not record_length:
+        raise ValueError(f"Record at byte {offset} has no blockette 1000")
+
+    starttime = (calendar.timegm((year, 1, 1, 0, 0, 0)) + (julday - 1) * 86400 + hour * 3600 + minute * 60 + second
+                 + fraction * 1e-4 + microseconds * 1e-6)
+    if not activity_flags & 0x02:
+        starttime += time_correction * 1e-4  # Correction not applied yet
+
+    trace_id = '.'.join(part.decode('ascii', 'replace').strip() for part in
+                        (header[18:20], header[8:13], header[13:15], header[15:18]))
+    return trace_id, starttime, npts, _sampling_rate(rate_factor, rate_multiplier), record_length
+
+class MseedIndex:
+    """Index of the data records of one MiniSEED file
+
+    Each record has a byte offset, length, start/end timestamp (end is one sample
+    past the last sample) and trace ID. Records without samples are not indexed.
+    """
+
+    def __init__(self, file_path: str, offsets: np.ndarray, lengths: np.ndarray, starttimes: np.ndarray,
+                 endtimes: np.ndarray, trace_codes: np.ndarray, trace_ids: List[str]):
+        """
+        Initializes the index
+
+        Args:
+            file_path: Indexed file
+            offsets: Byte offset of each record
+            lengths: Byte length of each record
+            starttimes: Start timestamp of each record
+            endtimes: Timestamp one sample past the end of each record
+            trace_codes: Index into trace_ids of each record
+            trace_ids: NET.STA.LOC.CHA IDs in order of first appearance
+        """
+        self.file_path = file_path
+        self.offsets = offsets
+        self.lengths = lengths
+        self.starttimes = starttimes
+        self.endtimes = endtimes
+        self.trace_codes = trace_codes
+        self.trace_ids = trace_ids
+
+    @classmethod
+    def scan(cls, file_path: str) -> 'MseedIndex':
+        """
+        Builds the index from a scan of the record headers (no data is decoded)
+
+        Args:
+            file_path: MiniSEED file
+
+        Returns:
+            Index of the file
+        """
+        offsets, lengths, starttimes, endtimes, codes = [], [], [], [], []
+        trace_ids = {}
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                raise ValueError("File is empty")
+            # Only the pages holding headers are read from disk
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                offset = 0
+                while offset < size:
+                    trace_id, starttime, npts, sampling_rate, record_length = _parse_header(buffer, offset)
+                    if npts and sampling_rate:
+                        offsets.append(offset)
+                        lengths.append(record_length)
+                        starttimes.append(starttime)
+                        endtimes.append(starttime + npts / sampling_rate)
+                        codes.append(trace_ids.setdefault(trace_id, len(trace_ids)))
+                    offset += record_length
+        return cls(file_path, np.array(offsets, dtype=np.int64), np.array(lengths, dtype=np.int64),
+                   np.array(starttimes, dtype=np.float64), np.array(endtimes, dtype=np.float64),
+                   np.array(codes, dtype=np.int32), list(trace_ids))
+
+    def save(self, path: Path):
+        """Writes the index to an .npz file"""
+        temp_path = path.with_suffix('.tmp.npz')
+        np.savez(temp_path, version=INDEX_VERSION, offsets=self.offsets, lengths=self.lengths,
+                 starttimes=self.starttimes, endtimes=self.endtimes, trace_codes=self.trace_codes,
+                 trace_ids=np.array(self.trace_ids, dtype=str))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, file_path: str) -> Optional['MseedIndex']:
+        """Reads an index written by save(), or None if it is missing or outdated"""
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != INDEX_VERSION:
+                    return None
+                return cls(file_path, data['offsets'], data['lengths'], data['starttimes'], data['endtimes'],
+                           data['trace_codes'], [str(t) for t in data['trace_ids']])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __len__(self):
+        """Number of indexed records"""
+        return len(self.offsets)
+
+    def select(self, starttime: UTCDateTime, endtime: UTCDateTime, trace_id: Optional[str] = None) -> List[Tuple[int, int]]:
+        """
+        Byte ranges of the records overlapping [starttime, endtime]
+
+        Adjacent records are merged into one range.
+
+        Args:
+            starttime: Window start
+            endtime: Window end
+            trace_id: Trace ID (defaults to the first trace of the file)
+
+        Returns:
+            (offset, length) ranges in file order
+        """
+        if not len(self.offsets):
+            return []
+        code = self.trace_ids.index(trace_id) if trace_id is not None else 0
+        mask = ((self.trace_codes == code) & (self.endtimes > float(starttime))
+                & (self.starttimes <= float(endtime)))
+        ranges = []
+        for offset, length in zip(self.offsets[mask].tolist(), self.lengths[mask].tolist()):
+            if ranges and ranges[-1][0] + ranges[-1][1] == offset:
+                ranges[-1] = (ranges[-1][0], ranges[-1][1] + length)
+            else:
+                ranges.append((offset, length))
+        return ranges
+
+    def read(self, starttime: UTCDateTime, endtime: UTCDateTime, trace_id: Optional[str] = None) -> Stream:
+        """
+        Reads and decodes only the records overlapping [starttime, endtime]
+
+        Args:
+            starttime: Window start
+            endtime: Window end
+            trace_id: Trace ID (defaults to the first trace of the file)
+
+        Returns:
+            Stream trimmed to the window (empty if no record overlaps)
+        """
+        ranges = self.select(starttime, endtime, trace_id)
+        if not ranges:
+            return Stream()
+        chunks = []
+        with open(self.file_path, 'rb') as f:
+            for offset, length in ranges:
+                f.seek(offset)
+                chunks.append(f.read(length))
+        st = read(io.BytesIO(b''.join(chunks)), format='MSEED')
+        st.trim(starttime, endtime)
+        return st
+
+class MseedIndexCache:
+    """Indexes of recently used files, kept in memory and on disk
+
+    Entries are keyed by path, size and modification time, so a changed file is
+    scanned again. Safe to use from worker threads.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = MSEED_INDEX_CACHE):
+        """
+        Initializes the cache
+
+        Args:
+            cache_dir: Cache directory (defaults to ~/.p_wave_picker/cache); indexes go in a subdirectory
+            max_entries: Indexes kept in memory
+        """
+        base_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.index_dir = base_dir / MSEED_INDEX_DIR
+        self.max_entries = max_entries
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0  # Indexes found in memory or on disk
+        self.misses = 0  # Files scanned
+
+    def _version(self, file_path: str) -> Tuple[str, str]:
+        """(absolute path, version hash of the file)"""
+        abs_path = os.path.abspath(file_path)
+        stat = os.stat(abs_path)
+        version = f"{abs_path}:{stat.st_mtime_ns}:{stat.st_size}"
+        return abs_path, hashlib.sha1(version.encode('utf-8')).hexdigest()[:24]
+
+    def get(self, file_path: str) -> MseedIndex:
+        """
+        Gets the index of a file, scanning it if it is not cached
+
+        Args:
+            file_path: MiniSEED file
+
+        Returns:
+            Index of the file
+        """
+        abs_path, version = self._version(file_path)
+        with self._lock:
+            index = self._indexes.get(abs_path)
+            if index is not None and index[0] == version:
+                self._indexes.move_to_end(abs_path)
+                self.hits += 1
+                return index[1]
+
+        index_path = self.index_dir / f"{version}.npz"
+        index = MseedIndex.load(index_path, file_path)
+        scanned = index is None
+        if scanned:
+            index = MseedIndex.scan(file_path)
+            try:
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                index.save(index_path)
+            except OSError as e:
+                logging.warning(f"Failed to cache MiniSEED index of {file_path}: {str(e)}")
+
+        with self._lock:
+            if scanned:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self._indexes[abs_path] = (version, index)
+            self._indexes.move_to_end(abs_path)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def stats(self) -> Tuple[int, int]:
+        """(hits, misses) since the cache was created; a miss is a file that had to be scanned"""
+        with self._lock:
+            return self.hits, self.misses
@@ -0,0 +1,360 @@
+"""
+Pick Import Module
+Provides chunked, vectorized loading of existing pick catalogs into PickManager
+"""
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config.constants import PICK_QUALITY
+from core.file_manager import parse_file_info
+from core.pick_manager import Pick
+from core.pick_store import CREATED_AT_FORMAT
+
+# Columns written by PickManager.save_picks
+SAVED_LAYOUT = {
+    'required': ['File Path', 'Pick Time', 'Pick Quality'],
+    'optional': ['File Name', 'Event ID', 'Created At']
+}
+
+# Columns of station pick catalogs (examples/picks/*.csv)
+CATALOG_LAYOUT = {
+    'required': ['network', 'station', 'channel', 'pick_time', 'quality'],
+    'optional': ['location', 'offset', 'auto_picked']
+}
+
+# Accepted spellings of each quality level: letter, numeric level and description
+QUALITY_CODES = {}
+for _level, (_code, _description) in enumerate(PICK_QUALITY.items()):
+    for _alias in (_code, str(_level), f'{_level}.0', _description.upper()):
+        QUALITY_CODES[_alias] = _code
+
+class ImportReport:
+    """Result of a pick import"""
+
+    def __init__(self, source: str, layout: str, max_details: int = 1000):
+        """
+        Initializes the report
+
+        Args:
+            source: Imported file
+            layout: Detected layout ('saved', 'catalog' or 'json')
+            max_details: Maximum number of rejected rows kept with their reason
+        """
+        self.source = source
+        self.layout = layout
+        self.total_rows = 0
+        self.imported = 0
+        self.rejected_count = 0
+        self.rejected = []  # [(row_number, reason), ...]
+        self.max_details = max_details
+
+    def reject(self, row_numbers: np.ndarray, reason: str) -> None:
+        """
+        Records rejected rows
+
+        Args:
+            row_numbers: 1-based data row numbers
+            reason: Rejection reason
+        """
+        self.rejected_count += len(row_numbers)
+        room = self.max_details - len(self.rejected)
+        if room > 0:
+            self.rejected.extend((int(n), reason) for n in row_numbers[:room])
+
+    def summary(self) -> str:
+        """
+        Gets a one-line summary
+
+        Returns:
+            Summary text
+        """
+        return (f"{os.path.basename(self.source)}: imported {self.imported} of {self.total_rows} picks "
+                f"({self.layout} layout), rejected {self.rejected_count}")
+
+class PickImporter:
+    """Pick Importer Class"""
+
+    def __init__(self, pick_manager, file_manager=None, chunk_size: int = 200000):
+        """
+        Initializes the pick importer
+
+        Args:
+            pick_manager: PickManager receiving the picks
+            file_manager: FileManager whose scanned files catalog picks are attached to
+            chunk_size: Number of CSV rows parsed per chunk
+        """
+        self.pick_manager = pick_manager
+        self.file_manager = file_manager
+        self.chunk_size = chunk_size
+        self._files_by_station = None  # (network, station) -> scanned files
+        self._records = {}  # (network, station) -> (start timestamps, end timestamps, files), by start
+
+    def import_file(self, file_path: str) -> ImportReport:
+        """
+        Imports a pick file, detecting its layout
+
+        Args:
+            file_path: CSV or JSON pick file
+
+        Returns:
+            Import report
+        """
+        if file_path.endswith('.json'):
+            return self.import_json(file_path)
+        return self.import_csv(file_path)
+
+    def import_csv(self, file_path: str) -> ImportReport:
+        """
+        Imports a CSV pick file in chunks
+
+        Args:
+            file_path: CSV file in the saved or catalog layout
+
+        Returns:
+            Import report
+        """
+        header = pd.read_csv(file_path, nrows=0, encoding='utf-8').columns.str.strip().tolist()
+        layout = self._detect_layout(header)
+        report = ImportReport(file_path, layout)
+
+        reader = pd.read_csv(file_path, dtype=str, keep_default_na=False,
+                             chunksize=self.chunk_size, encoding='utf-8')
+        first_row = 1
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            row_numbers = np.arange(first_row, first_row + len(chunk))
+            first_row += len(chunk)
+            report.total_rows += len(chunk)
+
+            if layout == 'saved':
+                keys, times, qualities, created = self._parse_saved(chunk)
+                key_reason = 'missing file path'
+            else:
+                keys, times, qualities, created = self._parse_catalog(chunk)
+                key_reason = 'no scanned file of the station covers the pick time'
+
+            valid = self._validate(keys, times, qualities, row_numbers, report, key_reason)
+            report.imported += self._insert(keys[valid], times[valid], qualities[valid], created, valid)
+
+        logging.info(report.summary())
+        return report
+
+    def import_json(self, file_path: str) -> ImportReport:
+        """
+        Imports picks written by PickManager.save_picks in JSON format
+
+        Args:
+            file_path: JSON file
+
+        Returns:
+            Import report
+        """
+        report = ImportReport(file_path, 'json')
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        documents = data if isinstance(data, list) else [data]
+        for document in documents:
+            picks = pd.DataFrame(document.get('picks', []), columns=['time', 'quality', 'created_at'])
+            row_numbers = np.arange(report.total_rows + 1, report.total_rows + 1 + len(picks))
+            report.total_rows += len(picks)
+
+            source = document.get('file_path') or ''
+            keys = np.full(len(picks), source, dtype=object)
+            times = pd.to_numeric(picks['time'], errors='coerce').to_numpy(dtype=float)
+            qualities = self._map_quality(picks['quality'])
+            created = self._parse_created(picks['created_at'])
+
+            valid = self._validate(keys, times, qualities, row_numbers, report)
+            report.imported += self._insert(keys[valid], times[valid], qualities[valid], created, valid)
+
+        logging.info(report.summary())
+        return report
+
+    def _detect_layout(self, header: List[str]) -> str:
+        """
+        Detects the CSV layout from its header
+
+        Args:
+            header: Column names
+
+        Returns:
+            'saved' or 'catalog'
+        """
+        for name, layout in (('saved', SAVED_LAYOUT), ('catalog', CATALOG_LAYOUT)):
+            if all(column in header for column in layout['required']):
+                return name
+        raise ValueError(f"Unrecognized pick file columns: {', '.join(header)}")
+
+    def _parse_saved(self, chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[pd.Series]]:
+        """
+        Parses a chunk in the layout written by PickManager.save_picks
+
+        Args:
+            chunk: Raw string columns
+
+        Returns:
+            (file keys, relative times in seconds, quality codes, creation times)
+        """
+        keys = chunk['File Path'].str.strip().to_numpy(dtype=object)
+        times = pd.to_numeric(chunk['Pick Time'], errors='coerce').to_numpy(dtype=float)
+        qualities = self._map_quality(chunk['Pick Quality'])
+        created = self._parse_created(chunk['Created At']) if 'Created At' in chunk else None
+        return keys, times, qualities, created
+
+    def _parse_catalog(self, chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[pd.Series]]:
+        """
+        Parses a chunk of a station pick catalog
+        Each absolute pick time is attached to the scanned file of its network and
+        station whose record covers it (which also picks the right event) and
+        converted to seconds from the start of that record.
+
+        Args:
+            chunk: Raw string columns
+
+        Returns:
+            (file paths, times in seconds from the record start, quality codes, creation
+            times); the path is '' where no scanned file covers the pick
+        """
+        pick_times = pd.to_datetime(chunk['pick_time'], errors='coerce', utc=True)
+        absolute = (pick_times - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy(dtype=float)
+
+        keys = np.full(len(chunk), '', dtype=object)
+        times = absolute.copy()  # Replaced by record-relative times where a file covers the pick
+        stations = chunk.groupby([chunk['network'].str.strip(), chunk['station'].str.strip()], sort=False).indices
+        for (network, station), rows in stations.items():
+            if not network or not station:
+                continue
+            starts, ends, paths = self._station_records(network, station)
+            if not len(paths):
+                continue
+            pick_times = absolute[rows]
+            record = np.searchsorted(starts, pick_times, side='right') - 1
+            covered = (record >= 0) & (pick_times <= ends[np.maximum(record, 0)])
+            rows, record = rows[covered], record[covered]
+            keys[rows] = paths[record]
+            times[rows] = pick_times[covered] - starts[record]
+
+        qualities = self._map_quality(chunk['quality'])
+        return keys, times, qualities, None
+
+    def _station_records(self, network: str, station: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gets the record spans of the scanned files of a station, reading their headers once
+
+        Args:
+            network: Network code
+            station: Station code
+
+        Returns:
+            (start timestamps, end timestamps, file paths), ordered by start
+        """
+        if self._files_by_station is None:
+            self._files_by_station = {}
+            for file_path in (self.file_manager.get_files() if self.file_manager is not None else []):
+                info = parse_file_info(file_path)
+                self._files_by_station.setdefault((info['network'], info['station']), []).append(file_path)
+
+        records = self._records.get((network, station))
+        if records is None:
+            spans = []
+            for file_path in self._files_by_station.get((network, station), []):
+                try:
+                    start, end = self.file_manager.record_span(file_path)
+                except Exception as e:
+                    logging.warning(f"Failed to read the record span of {file_path}: {str(e)}")
+                    continue
+                spans.append((float(start.timestamp), float(end.timestamp), file_path))
+            spans.sort()
+            records = self._records[(network, station)] = (
+                np.array([span[0] for span in spans], dtype=float),
+                np.array([span[1] for span in spans], dtype=float),
+                np.array([span[2] for span in spans], dtype=object)
+            )
+        return records
+
+    def _map_quality(self, values: pd.Series) -> np.ndarray:
+        """
+        Maps quality letters, levels or descriptions to quality codes
+
+        Args:
+            values: Raw quality values
+
+        Returns:
+            Array of quality codes, '' where unknown
+        """
+        return values.astype(str).str.strip().str.upper().map(QUALITY_CODES).fillna('').to_numpy(dtype=object)
+
+    def _parse_created(self, values: pd.Series) -> pd.Series:
+        """
+        Parses creation timestamps
+
+        Args:
+            values: Raw timestamps
+
+        Returns:
+            Parsed timestamps (NaT where invalid)
+        """
+        return pd.to_datetime(values, errors='coerce', format=CREATED_AT_FORMAT)
+
+    def _validate(self, keys: np.ndarray, times: np.ndarray, qualities: np.ndarray,
+                  row_numbers: np.ndarray, report: ImportReport, key_reason: str = 'missing file path') -> np.ndarray:
+        """
+        Validates parsed columns and records rejected rows
+
+        Returns:
+            Boolean mask of valid rows
+        """
+        checks = (
+            (~np.isfinite(times), 'invalid pick time'),
+            (keys == '', key_reason),
+            (qualities == '', 'unknown pick quality')
+        )
+        valid = np.ones(len(keys), dtype=bool)
+        for failed, reason in checks:
+            failed = failed & valid
+            if failed.any():
+                report.reject(row_numbers[failed], reason)
+                valid &= ~failed
+        return valid
+
+    def _insert(self, keys: np.ndarray, times: np.ndarray, qualities: np.ndarray,
+                created: Optional[pd.Series], valid: np.ndarray) -> int:
+        """
+        Inserts valid rows into the pick manager in one bulk operation
+
+        Returns:
+            Number of inserted picks
+        """
+        if len(keys) == 0:
+            return 0
+
+        now = datetime.now()
+        if created is not None:
+            created_values = list(created[valid].fillna(pd.Timestamp(now)).dt.to_pydatetime())
+        else:
+            created_values = [now] * len(keys)
+
+        # Group rows by file key using a stable sort so picks keep their file order
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(keys)]))
+
+        time_list = times.tolist()
+        picks_by_file: Dict[str, List[Pick]] = {}
+        for start, end in zip(starts, ends):
+            picks_by_file[sorted_keys[start]] = [
+                Pick(time_list[i], qualities[i], created_at=created_values[i])
+                for i in order[start:end].tolist()
+            ]
+
+        self.pick_manager.add_picks(picks_by_file)
+        return len(keys)
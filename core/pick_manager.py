@@ -4,50 +4,198 @@ Pick Management
 
 import os
 import csv
+import json
 import logging
+import itertools
 from datetime import datetime
 from config.settings import Settings
 from config.constants import PICK_QUALITY
-import re # Import re module for regex operations
+from core.file_manager import parse_file_info
+from core.pick_store import PickStore, CREATED_AT_FORMAT
 
 class Pick:
     """Pick Class"""
     
-    def __init__(self, time, quality='A'):
+    __slots__ = ('id', 'time', 'quality', 'created_at')
+    
+    def __init__(self, time, quality='A', pick_id=None, created_at=None):
         """Initialize the pick"""
+        self.id = pick_id
         self.time = time
         self.quality = quality
-        self.created_at = datetime.now()
+        self.created_at = created_at or datetime.now()
+    
+    def __eq__(self, other):
+        """Picks with an ID are equal to any copy with the same ID"""
+        if not isinstance(other, Pick):
+            return NotImplemented
+        if self.id is None or other.id is None:
+            return self is other
+        return self.id == other.id
+    
+    def __hash__(self):
+        """Hash consistent with __eq__ (do not hash a pick before it has an ID)"""
+        return hash(self.id) if self.id is not None else id(self)
+    
+    def record(self, file_path):
+        """Compact (file_path, id, time, quality, created_at) tuple used by commands"""
+        return (file_path, self.id, self.time, self.quality, self.created_at)
 
 class PickManager:
     """Pick Management Class"""
     
-    def __init__(self):
-        """Initialize the pick manager"""
+    def __init__(self, store_path=None):
+        """Initialize the pick manager
+        If store_path (or the 'storage'/'pick_store' setting) is set, picks are written
+        through to a SQLite pick store and restored from it on startup.
+        """
         self.settings = Settings()
         self.picks_by_file = {}  # Stores picks for each file {file_path: [pick1, pick2, ...]}
+        self._picks_by_id = {}  # {pick ID: (file_path, pick)}
+        self.store = None
+        self._id_counter = itertools.count(1)
+        
+        if store_path is None:
+            store_path = self.settings.get('storage', 'pick_store', '')
+        if store_path:
+            self.attach_store(store_path)
+    
+    def attach_store(self, store_path):
+        """Attach a SQLite pick store
+        Picks of a previously attached store are already saved in it and are dropped
+        from memory. Picks made while no store was attached get new IDs the store does
+        not use yet and are written to it, so they never replace stored picks.
+        """
+        if self.store is not None:
+            if self.store.db_path == store_path:
+                return
+            self.store.close()
+            self.store = None
+            self.picks_by_file = {}
+            self._picks_by_id = {}
+        
+        self.store = PickStore(store_path)
+        self._id_counter = itertools.count(self.store.max_id() + 1)
+        
+        # Persist picks made before the store was attached, numbered after the stored picks
+        unsaved = {file_path: picks_list for file_path, picks_list in self.picks_by_file.items() if picks_list}
+        self._picks_by_id = {}
+        for file_path, picks_list in unsaved.items():
+            for pick in picks_list:
+                pick.id = next(self._id_counter)
+                self._picks_by_id[pick.id] = (file_path, pick)
+        if unsaved:
+            self.store.add_grouped(unsaved)
+        
+        # Restore picks from previous sessions
+        known_ids = set(self._picks_by_id)
+        for row in self.store.iter_rows():
+            if row['id'] in known_ids:
+                continue
+            pick = Pick(row['time'], row['quality'], pick_id=row['id'],
+                        created_at=datetime.strptime(row['created_at'], CREATED_AT_FORMAT))
+            self.picks_by_file.setdefault(row['file_path'], []).append(pick)
+            self._picks_by_id[pick.id] = (row['file_path'], pick)
+        logging.info(f"Pick store attached: {store_path}")
+    
+    def close(self):
+        """Close the pick store, if any"""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
     
     def add_pick(self, file_path, pick):
         """Add a pick"""
+        if pick.id is None:
+            pick.id = next(self._id_counter)
         if file_path not in self.picks_by_file:
             self.picks_by_file[file_path] = []
         self.picks_by_file[file_path].append(pick)
+        self._picks_by_id[pick.id] = (file_path, pick)
+        if self.store is not None:
+            self.store.add(file_path, pick)
+    
+    def add_picks(self, picks_by_file):
+        """Add many picks at once {file_path: [pick1, ...]}, written to the store in one transaction"""
+        for file_path, picks in picks_by_file.items():
+            for pick in picks:
+                if pick.id is None:
+                    pick.id = next(self._id_counter)
+                self._picks_by_id[pick.id] = (file_path, pick)
+            self.picks_by_file.setdefault(file_path, []).extend(picks)
+        if self.store is not None:
+            self.store.add_grouped(picks_by_file)
     
     def remove_pick(self, file_path, pick):
         """Remove a pick"""
         if file_path in self.picks_by_file and pick in self.picks_by_file[file_path]:
             self.picks_by_file[file_path].remove(pick)
+            self._picks_by_id.pop(pick.id, None)
+            if self.store is not None:
+                self.store.remove(pick.id)
     
     def remove_last_pick(self, file_path):
         """Remove the last pick"""
         if file_path in self.picks_by_file and self.picks_by_file[file_path]:
-            return self.picks_by_file[file_path].pop()
+            pick = self.picks_by_file[file_path].pop()
+            self._picks_by_id.pop(pick.id, None)
+            if self.store is not None:
+                self.store.remove(pick.id)
+            return pick
         return None
     
+    def get_pick_by_id(self, pick_id):
+        """Get the stored pick with an ID, or None"""
+        entry = self._picks_by_id.get(pick_id)
+        return entry[1] if entry else None
+    
+    def remove_picks(self, pick_ids):
+        """Remove many picks by ID, rebuilding each affected file's list once
+        
+        Returns:
+            Records (file_path, id, time, quality, created_at) of the removed picks
+        """
+        removed = []
+        by_file = {}
+        for pick_id in pick_ids:
+            entry = self._picks_by_id.pop(pick_id, None)
+            if entry is not None:
+                by_file.setdefault(entry[0], set()).add(pick_id)
+                removed.append(entry[1].record(entry[0]))
+        for file_path, ids in by_file.items():
+            self.picks_by_file[file_path] = [p for p in self.picks_by_file[file_path] if p.id not in ids]
+        if self.store is not None and removed:
+            self.store.remove_many([record[1] for record in removed])
+        return removed
+    
+    def restore_picks(self, records):
+        """Add picks from (file_path, id, time, quality, created_at) records, keeping their IDs"""
+        picks_by_file = {}
+        for file_path, pick_id, time, quality, created_at in records:
+            if pick_id in self._picks_by_id:
+                continue
+            picks_by_file.setdefault(file_path, []).append(Pick(time, quality, pick_id=pick_id, created_at=created_at))
+        if picks_by_file:
+            self.add_picks(picks_by_file)
+    
+    def update_qualities(self, qualities):
+        """Set the quality of many picks {pick ID: quality} in one store transaction"""
+        updates = []
+        for pick_id, quality in qualities.items():
+            entry = self._picks_by_id.get(pick_id)
+            if entry is not None:
+                entry[1].quality = quality
+                updates.append((pick_id, quality))
+        if self.store is not None and updates:
+            self.store.update_qualities(updates)
+    
     def update_pick_quality(self, file_path, pick, new_quality):
         """Update pick quality"""
         if file_path in self.picks_by_file and pick in self.picks_by_file[file_path]:
+            pick = self.get_pick_by_id(pick.id) or pick
             pick.quality = new_quality
+            if self.store is not None:
+                self.store.update_quality(pick.id, new_quality)
             logging.info(f"Updated pick quality for {file_path} to {new_quality}")
         else:
             logging.warning(f"Failed to update pick quality for pick: {pick.time} in {file_path}. Pick not found.")
@@ -82,9 +230,37 @@ class PickManager:
         """Check if there are any picks"""
         return any(self.picks_by_file.values())
     
+    def reserve_ids(self, max_id):
+        """Make sure new pick IDs are larger than max_id (e.g. after replaying a journal)"""
+        next_id = next(self._id_counter)
+        self._id_counter = itertools.count(max(next_id, max_id + 1))
+    
     def create_pick(self, time, quality='A'):
         """Create a pick instance"""
-        return Pick(time, quality)
+        return Pick(time, quality, pick_id=next(self._id_counter))
+    
+    def iter_pick_rows(self):
+        """Iterate over all picks as flat rows, streaming from the pick store when attached"""
+        if self.store is not None:
+            yield from self.store.iter_rows()
+            return
+        
+        for file_path, picks_list in self.picks_by_file.items():
+            if not picks_list:
+                continue # Skip if no picks for this file
+            info = parse_file_info(file_path)
+            for pick in picks_list:
+                yield {
+                    'id': pick.id,
+                    'file_path': file_path,
+                    'file_name': info['file_name'],
+                    'event_id': info['event_id'],
+                    'network': info['network'],
+                    'station': info['station'],
+                    'time': pick.time,
+                    'quality': pick.quality,
+                    'created_at': pick.created_at.strftime(CREATED_AT_FORMAT)
+                }
     
     def save_picks(self, current_file_path, output_file_path):
         """Save picks for the current file to a JSON file or all picks to CSV (depending on output_file_path extension)
@@ -107,7 +283,7 @@ class PickManager:
                     pick_data["picks"].append({
                         "time": pick.time,
                         "quality": pick.quality,
-                        "created_at": pick.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                        "created_at": pick.created_at.strftime(CREATED_AT_FORMAT)
                     })
 
                 with open(output_file_path, 'w', encoding='utf-8') as f:
@@ -127,23 +303,15 @@ class PickManager:
                     writer = csv.writer(f)
                     writer.writerow(['File Path', 'File Name', 'Event ID', 'Pick Time', 'Pick Quality', 'Created At'])
                     
-                    for file_path, picks_list in self.picks_by_file.items():
-                        if not picks_list:
-                            continue # Skip if no picks for this file
-
-                        file_name = os.path.basename(file_path)
-                        evid_match = re.search(r'evid\.(\d+)', file_name)
-                        event_id = evid_match.group(1) if evid_match else 'N/A'
-                        
-                        for pick in picks_list:
-                            writer.writerow([
-                                file_path,
-                                file_name,
-                                event_id,
-                                pick.time,
-                                pick.quality,
-                                pick.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                            ])
+                    for row in self.iter_pick_rows():
+                        writer.writerow([
+                            row['file_path'],
+                            row['file_name'],
+                            row['event_id'],
+                            row['time'],
+                            row['quality'],
+                            row['created_at']
+                        ])
                 logging.info(f"All picks successfully saved to file: {output_file_path}")
             except Exception as e:
                 logging.error(f"Failed to save all picks: {str(e)}")
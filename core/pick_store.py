@@ -0,0 +1,300 @@
+"""
+Pick Store Module
+Provides a SQLite-backed persistent store for picks
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from typing import Iterator, Optional, Dict, Any, List, Tuple
+
+from core.file_manager import parse_file_info
+
+# File metadata is stored once per file so pick rows stay small and cheap to index
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL UNIQUE,
+    file_name TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    network TEXT NOT NULL,
+    station TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS picks (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    time REAL NOT NULL,
+    quality TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_event ON files (event_id);
+CREATE INDEX IF NOT EXISTS idx_files_station ON files (station);
+CREATE INDEX IF NOT EXISTS idx_picks_file ON picks (file_id);
+CREATE INDEX IF NOT EXISTS idx_picks_quality ON picks (quality);
+"""
+
+# Stored in PRAGMA user_version; version 1 kept the file metadata on every pick row
+SCHEMA_VERSION = 2
+
+MIGRATE_V1 = """
+BEGIN;
+DROP INDEX IF EXISTS idx_picks_file;
+DROP INDEX IF EXISTS idx_picks_event;
+DROP INDEX IF EXISTS idx_picks_station;
+DROP INDEX IF EXISTS idx_picks_quality;
+ALTER TABLE picks RENAME TO picks_v1;
+""" + SCHEMA + """
+INSERT INTO files (file_path, file_name, event_id, network, station)
+    SELECT file_path, MIN(file_name), MIN(event_id), MIN(network), MIN(station)
+    FROM picks_v1 GROUP BY file_path ORDER BY MIN(id);
+INSERT INTO picks (id, file_id, time, quality, created_at)
+    SELECT p.id, f.id, p.time, p.quality, p.created_at
+    FROM picks_v1 p JOIN files f ON f.file_path = p.file_path;
+DROP TABLE picks_v1;
+COMMIT;
+"""
+
+CREATED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+class PickStore:
+    """SQLite Pick Store Class"""
+
+    def __init__(self, db_path: str, fetch_size: int = 1000):
+        """
+        Initializes the pick store
+
+        Args:
+            db_path: Path to the SQLite database file
+            fetch_size: Number of rows fetched per round trip when streaming
+        """
+        self.db_path = db_path
+        self.fetch_size = fetch_size
+
+        # Ensure database directory exists
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        # The connection is shared between the Tk thread and worker threads
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+        # Cache of file_path -> files.id
+        self._file_ids = dict(
+            (path, file_id) for file_id, path in self.conn.execute('SELECT id, file_path FROM files')
+        )
+
+    def _create_schema(self) -> None:
+        """
+        Creates the tables, migrating databases written with an older schema
+        """
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Pick store {self.db_path} has schema version {version}, "
+                             f"newer than the supported version {SCHEMA_VERSION}")
+
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(picks)')]
+        if 'file_path' in columns:
+            logging.info(f"Migrating pick store {self.db_path} to schema version {SCHEMA_VERSION}")
+            try:
+                self.conn.executescript(MIGRATE_V1)
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.conn.commit()
+
+    def _file_id(self, file_path: str) -> int:
+        """
+        Gets the ID of a file row, creating it if needed (caller holds the lock)
+
+        Args:
+            file_path: Waveform file path
+
+        Returns:
+            File ID
+        """
+        file_id = self._file_ids.get(file_path)
+        if file_id is None:
+            info = parse_file_info(file_path)
+            cursor = self.conn.execute(
+                'INSERT INTO files (file_path, file_name, event_id, network, station) VALUES (?, ?, ?, ?, ?)',
+                (file_path, info['file_name'], info['event_id'], info['network'], info['station'])
+            )
+            file_id = cursor.lastrowid
+            self._file_ids[file_path] = file_id
+        return file_id
+
+    def add(self, file_path: str, pick) -> None:
+        """
+        Writes a single pick
+
+        Args:
+            file_path: Waveform file the pick belongs to
+            pick: Pick instance (must carry an ID)
+        """
+        self.add_many(file_path, [pick])
+
+    def add_many(self, file_path: str, picks: List) -> None:
+        """
+        Writes several picks of one file in a single transaction
+
+        Args:
+            file_path: Waveform file the picks belong to
+            picks: List of pick instances
+        """
+        self.add_grouped({file_path: picks})
+
+    def add_grouped(self, picks_by_file: Dict[str, List]) -> None:
+        """
+        Writes picks of many files in a single transaction
+
+        Args:
+            picks_by_file: Dictionary {file_path: [pick1, pick2, ...]}
+        """
+        created_at_text = {}  # Bulk imports share few distinct creation times
+
+        def rows():
+            for file_path, picks in picks_by_file.items():
+                file_id = self._file_id(file_path)
+                for pick in picks:
+                    created_at = created_at_text.get(pick.created_at)
+                    if created_at is None:
+                        created_at = created_at_text[pick.created_at] = pick.created_at.strftime(CREATED_AT_FORMAT)
+                    yield (pick.id, file_id, float(pick.time), pick.quality, created_at)
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO picks (id, file_id, time, quality, created_at) VALUES (?, ?, ?, ?, ?)',
+                rows()
+            )
+
+    def remove(self, pick_id: int) -> None:
+        """
+        Deletes a pick
+
+        Args:
+            pick_id: ID of the pick
+        """
+        self.remove_many([pick_id])
+
+    def remove_many(self, pick_ids: List[int]) -> None:
+        """
+        Deletes several picks in a single transaction
+
+        Args:
+            pick_ids: IDs of the picks
+        """
+        with self._lock, self.conn:
+            self.conn.executemany('DELETE FROM picks WHERE id = ?', [(i,) for i in pick_ids])
+
+    def update_quality(self, pick_id: int, quality: str) -> None:
+        """
+        Updates the quality of a pick
+
+        Args:
+            pick_id: ID of the pick
+            quality: New quality level
+        """
+        self.update_qualities([(pick_id, quality)])
+
+    def update_qualities(self, updates: List[Tuple[int, str]]) -> None:
+        """
+        Updates the quality of several picks in a single transaction
+
+        Args:
+            updates: List of (pick ID, new quality) pairs
+        """
+        with self._lock, self.conn:
+            self.conn.executemany('UPDATE picks SET quality = ? WHERE id = ?',
+                                  [(quality, pick_id) for pick_id, quality in updates])
+
+    def iter_rows(self, file_path: Optional[str] = None,
+                  event_id: Optional[str] = None,
+                  station: Optional[str] = None,
+                  quality: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams stored picks, optionally filtered
+
+        Args:
+            file_path: Only picks of this file
+            event_id: Only picks of this event
+            station: Only picks of this station
+            quality: Only picks of this quality
+
+        Returns:
+            Iterator of pick rows as dictionaries
+        """
+        clauses = []
+        params = []
+        for column, value in (('f.file_path', file_path), ('f.event_id', event_id),
+                              ('f.station', station), ('p.quality', quality)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+
+        query = ('SELECT p.id AS id, f.file_path AS file_path, f.file_name AS file_name, '
+                 'f.event_id AS event_id, f.network AS network, f.station AS station, '
+                 'p.time AS time, p.quality AS quality, p.created_at AS created_at '
+                 'FROM picks p JOIN files f ON f.id = p.file_id')
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY p.file_id, p.id'
+
+        # Use a dedicated cursor so writes can interleave with a running export
+        with self._lock:
+            cursor = self.conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self.fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(columns, row))
+
+    def count(self) -> int:
+        """
+        Counts stored picks
+
+        Returns:
+            Number of picks
+        """
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM picks').fetchone()[0]
+
+    def max_id(self) -> int:
+        """
+        Gets the largest stored pick ID
+
+        Returns:
+            Largest ID, or 0 if the store is empty
+        """
+        with self._lock:
+            return self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM picks').fetchone()[0]
+
+    def clear(self) -> None:
+        """
+        Deletes all picks
+        """
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM picks')
+            self.conn.execute('DELETE FROM files')
+            self._file_ids.clear()
+
+    def close(self) -> None:
+        """
+        Closes the database connection
+        """
+        with self._lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"Failed to close pick store: {str(e)}")
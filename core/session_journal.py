@@ -0,0 +1,236 @@
+"""
+Session Journal Module
+Write-ahead log of manual pick commands, replayed to recover picks after a crash
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from config.constants import (
+    JOURNAL_FILE,
+    JOURNAL_SNAPSHOT_FILE,
+    JOURNAL_FSYNC_INTERVAL,
+    JOURNAL_COMPACT_ENTRIES
+)
+from core.pick_store import CREATED_AT_FORMAT
+
+JOURNAL_VERSION = 1
+
+class SessionJournal:
+    """Session Journal Class
+
+    Every executed, undone and redone command is appended as one JSON line holding
+    its effect on the picks (added records, removed IDs, quality changes). Effects
+    are idempotent, so replaying them on top of a pick store that already saw some
+    of them gives the same picks. Lines are fsynced in batches by a background
+    thread; when the log grows past compact_entries the current picks are written
+    to a snapshot and the log starts over.
+    """
+
+    def __init__(self, directory: str, pick_manager, fsync_interval: float = JOURNAL_FSYNC_INTERVAL,
+                 compact_entries: int = JOURNAL_COMPACT_ENTRIES):
+        """
+        Initializes the journal (call recover() before recording)
+
+        Args:
+            directory: Project directory holding the journal and its snapshot
+            pick_manager: PickManager the journal is replayed into and snapshotted from
+            fsync_interval: Seconds between fsyncs of appended entries
+            compact_entries: Number of log entries that triggers a snapshot
+        """
+        self.log_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, JOURNAL_SNAPSHOT_FILE)
+        self.pick_manager = pick_manager
+        self.fsync_interval = fsync_interval
+        self.compact_entries = compact_entries
+
+        self.sequence = 0  # Sequence number of the last entry
+        self.entries = 0  # Entries in the log since the last snapshot
+        self._file = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sync_thread = None
+
+    @staticmethod
+    def _encode_record(record):
+        """Record tuple -> JSON list"""
+        file_path, pick_id, time, quality, created_at = record
+        return [file_path, pick_id, time, quality, created_at.strftime(CREATED_AT_FORMAT)]
+
+    @staticmethod
+    def _decode_record(values):
+        """JSON list -> record tuple"""
+        file_path, pick_id, time, quality, created_at = values
+        return (file_path, pick_id, time, quality, datetime.fromisoformat(created_at))
+
+    def _apply(self, entry):
+        """
+        Applies the effect of a journal entry to the pick manager
+
+        Returns:
+            Largest pick ID in the entry
+        """
+        removed = entry.get('remove', [])
+        added = [self._decode_record(values) for values in entry.get('add', [])]
+        qualities = {int(pick_id): quality for pick_id, quality in entry.get('quality', {}).items()}
+        if removed:
+            self.pick_manager.remove_picks(removed)
+        if added:
+            self.pick_manager.restore_picks(added)
+        if qualities:
+            self.pick_manager.update_qualities(qualities)
+        return max([0] + removed + [record[1] for record in added] + list(qualities))
+
+    def recover(self) -> int:
+        """
+        Replays the snapshot and the log into the pick manager and opens the log for appending
+
+        A torn last line (crash during a write) is dropped.
+
+        Returns:
+            Number of replayed log entries
+        """
+        max_id = 0
+        snapshot_sequence = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                snapshot_sequence = snapshot['sequence']
+                max_id = self._apply({'add': snapshot['picks']})
+            except (OSError, ValueError, KeyError) as e:
+                logging.error(f"Failed to read journal snapshot {self.snapshot_path}: {str(e)}")
+
+        replayed = 0
+        valid_size = 0
+        self.sequence = snapshot_sequence
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Dropping torn journal entry in {self.log_path}")
+                        break
+                    valid_size += len(line)
+                    self.entries += 1
+                    if entry['seq'] <= snapshot_sequence:
+                        continue  # Already in the snapshot (crash during compaction)
+                    max_id = max(max_id, self._apply(entry))
+                    self.sequence = entry['seq']
+                    replayed += 1
+
+        self.pick_manager.reserve_ids(max_id)
+        self._open(valid_size)
+        if replayed:
+            logging.info(f"Replayed {replayed} journal entries from {self.log_path}")
+        return replayed
+
+    def _open(self, size: Optional[int] = None):
+        """Opens the log for appending (truncated to size) and starts the fsync thread"""
+        self._file = open(self.log_path, 'a+b')
+        if size is not None:
+            self._file.truncate(size)
+        if self._sync_thread is None:
+            self._stop.clear()
+            self._sync_thread = threading.Thread(target=self._sync_loop, name='journal-sync', daemon=True)
+            self._sync_thread.start()
+
+    def record(self, operation: str, command):
+        """
+        Appends the effect of an executed, undone or redone command
+
+        Args:
+            operation: 'execute', 'undo' or 'redo'
+            command: Command from core.command_history
+        """
+        changes = command.changes(undo=(operation == 'undo'))
+        if changes is None or self._file is None:
+            return
+        added, removed, qualities = changes
+        self.sequence += 1
+        entry = {'seq': self.sequence, 'op': operation, 'type': command.type}
+        if added:
+            entry['add'] = [self._encode_record(record) for record in added]
+        if removed:
+            entry['remove'] = list(removed)
+        if qualities:
+            entry['quality'] = {str(pick_id): quality for pick_id, quality in qualities.items()}
+
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            self._file.write(line)
+            self._dirty = True
+        self.entries += 1
+        if self.entries >= self.compact_entries:
+            self.compact()
+
+    def sync(self):
+        """Flushes appended entries and fsyncs them to disk"""
+        with self._lock:
+            if not self._dirty or self._file is None:
+                return
+            self._file.flush()
+            self._dirty = False
+            fd = self._file.fileno()
+        os.fsync(fd)
+
+    def _sync_loop(self):
+        """Fsyncs batches of entries until the journal is closed"""
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.sync()
+            except (OSError, ValueError) as e:
+                logging.error(f"Failed to sync journal: {str(e)}")
+
+    def compact(self):
+        """Writes the current picks to the snapshot and empties the log"""
+        picks = [self._encode_record(pick.record(file_path)) for file_path, pick in self.pick_manager.get_all_picks()]
+        snapshot = {'version': JOURNAL_VERSION, 'sequence': self.sequence, 'picks': picks}
+
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        # Entries up to self.sequence are covered by the snapshot from here on
+        with self._lock:
+            self._file.truncate(0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+        self.entries = 0
+        logging.info(f"Compacted journal into {self.snapshot_path} ({len(picks)} picks)")
+
+    def close(self):
+        """Fsyncs pending entries and closes the log after a clean shutdown
+
+        Only a crashed session leaves entries to replay. With a pick store every edit
+        is already saved, so the log and the snapshot are discarded; without one the
+        journal is the only copy of the picks, so they are compacted into the snapshot.
+        """
+        if self._sync_thread is not None:
+            self._stop.set()
+            self._sync_thread.join()
+            self._sync_thread = None
+        if self._file is not None:
+            self.sync()
+            if self.pick_manager.store is not None:
+                with self._lock:
+                    self._file.truncate(0)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                self.entries = 0
+                if os.path.exists(self.snapshot_path):
+                    os.remove(self.snapshot_path)
+            elif self.entries:
+                self.compact()
+            self._file.close()
+            self._file = None
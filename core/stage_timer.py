@@ -0,0 +1,145 @@
+"""
+Stage Timing Module
+Per-file wall-clock and CPU timers for the stages of a batch run, and histograms of their durations
+"""
+
+import math
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+
+from config.constants import STAGE_HISTOGRAM_RANGE, STAGE_HISTOGRAM_BINS_PER_DECADE
+
+# Shared context returned by disabled timers
+_NO_TIMING = nullcontext()
+
+class _Stage:
+    """Context that adds its duration to one stage of a timer"""
+
+    __slots__ = ('times', 'name', 'wall', 'cpu')
+
+    def __init__(self, times: Dict[str, Tuple[float, float]], name: str):
+        """Initializes the context"""
+        self.times = times
+        self.name = name
+
+    def __enter__(self):
+        """Start the monotonic wall-clock and thread CPU timers"""
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        """Add the elapsed time, also when the stage raised"""
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        previous_wall, previous_cpu = self.times.get(self.name, (0.0, 0.0))
+        self.times[self.name] = (previous_wall + wall, previous_cpu + cpu)
+        return False
+
+class StageTimer:
+    """Stage timings of one file
+
+    `with timer.stage('read'): ...` adds the wall-clock and CPU time of the block to
+    the stage. A disabled timer returns a shared no-op context and records nothing.
+    """
+
+    __slots__ = ('enabled', 'times')
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initializes the timer
+
+        Args:
+            enabled: Whether stages are timed
+        """
+        self.enabled = enabled
+        self.times: Dict[str, Tuple[float, float]] = {}  # {stage: (wall seconds, CPU seconds)}
+
+    def stage(self, name: str):
+        """Context timing one stage"""
+        if not self.enabled:
+            return _NO_TIMING
+        return _Stage(self.times, name)
+
+    def add(self, name: str, wall: float, cpu: float):
+        """Add time measured elsewhere, e.g. a share of a stage run for many files at once"""
+        if self.enabled:
+            previous_wall, previous_cpu = self.times.get(name, (0.0, 0.0))
+            self.times[name] = (previous_wall + wall, previous_cpu + cpu)
+
+class StageHistogram:
+    """Histogram of per-file stage durations on logarithmic bins
+
+    Bins span STAGE_HISTOGRAM_RANGE seconds with STAGE_HISTOGRAM_BINS_PER_DECADE bins per
+    decade; shorter and longer durations go to the first and last bin. Percentiles are
+    estimated as the upper edge of the bin they fall in.
+    """
+
+    def __init__(self):
+        """Initializes an empty histogram"""
+        low, high = STAGE_HISTOGRAM_RANGE
+        self._log_low = math.log10(low)
+        self._n_bins = int(round((math.log10(high) - self._log_low) * STAGE_HISTOGRAM_BINS_PER_DECADE))
+        self.counts = [0] * self._n_bins
+        self.total = 0
+        self.max = 0.0
+
+    def upper_edge(self, index: int) -> float:
+        """Upper edge of a bin (s)"""
+        return 10 ** (self._log_low + (index + 1) / STAGE_HISTOGRAM_BINS_PER_DECADE)
+
+    def add(self, seconds: float):
+        """Count one duration"""
+        index = int((math.log10(seconds) - self._log_low) * STAGE_HISTOGRAM_BINS_PER_DECADE) if seconds > 0 else 0
+        self.counts[min(max(index, 0), self._n_bins - 1)] += 1
+        self.total += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimated percentile
+
+        Args:
+            q: Percentile (0-100)
+
+        Returns:
+            Upper edge of the bin holding the percentile (at most the maximum), or None if empty
+        """
+        if not self.total:
+            return None
+        rank = max(q / 100.0 * self.total, 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.upper_edge(index), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, object]:
+        """p50/p95/max and the non-empty bins as [upper edge (s), count]"""
+        return {
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'max': self.max,
+            'bins': [[self.upper_edge(i), count] for i, count in enumerate(self.counts) if count]
+        }
+
+def format_stage_times(stage_times: Dict[str, Dict[str, object]]) -> List[str]:
+    """
+    One log line per stage of a summary's stage_times
+
+    Args:
+        stage_times: BatchSummary.to_dict()['stage_times']
+
+    Returns:
+        Lines like 'read: 120 files, wall 3.210 s (p50 0.021 s, p95 0.056 s), CPU 1.100 s'
+    """
+    lines = []
+    for stage, entry in stage_times.items():
+        line = f"{stage}: {entry['count']} files, wall {entry['wall']:.3f} s"
+        if entry.get('p50') is not None:
+            line += f" (p50 {entry['p50']:.3f} s, p95 {entry['p95']:.3f} s)"
+        lines.append(line + f", CPU {entry['cpu']:.3f} s")
+    return lines
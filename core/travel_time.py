@@ -0,0 +1,272 @@
+"""
+Travel Time Module
+Predicts P arrival times from a cached TauP travel-time grid, an event catalog and station coordinates
+"""
+
+import os
+import logging
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from obspy import UTCDateTime
+from obspy.geodetics import locations2degrees
+from obspy.taup import TauPyModel
+from obspy.taup.seismic_phase import SeismicPhase
+from obspy.taup.helper_classes import TauModelError
+from obspy.taup.utils import parse_phase_list
+
+from config.constants import (
+    TRAVEL_TIME_DIR,
+    TRAVEL_TIME_PHASES,
+    TRAVEL_TIME_DISTANCE_STEP,
+    TRAVEL_TIME_DEPTH_STEP,
+    TRAVEL_TIME_MAX_DEPTH
+)
+from core.file_manager import parse_file_info
+from core.waveform_pyramid import default_cache_dir
+
+# Columns of the event catalog and station list CSV files
+CATALOG_COLUMNS = ['event_id', 'time', 'latitude', 'longitude', 'depth']
+STATION_COLUMNS = ['network', 'station', 'latitude', 'longitude']
+
+def _first_arrivals(tau_model, phase_names, distances: np.ndarray) -> np.ndarray:
+    """
+    Earliest arrival of the phases at each distance for one source depth
+
+    Each phase's sampled travel-time curve (SeismicPhase.dist/time) is interpolated
+    linearly on every segment that brackets a distance, which covers triplications
+    without one TauP call per distance.
+
+    Args:
+        tau_model: Depth-corrected TauModel
+        phase_names: Phase names
+        distances: Distances (degrees)
+
+    Returns:
+        Travel times (s), inf where no phase arrives
+    """
+    x = np.radians(distances)
+    best = np.full(len(distances), np.inf)
+    for name in phase_names:
+        try:
+            phase = SeismicPhase(name, tau_model, 0.0)
+        except TauModelError:
+            continue
+        if phase.dist is None or len(phase.dist) < 2:
+            continue
+        dist, time = np.asarray(phase.dist), np.asarray(phase.time)
+        d0, d1 = dist[:-1, None], dist[1:, None]
+        t0, t1 = time[:-1, None], time[1:, None]
+        inside = (x >= np.minimum(d0, d1)) & (x <= np.maximum(d0, d1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.where(d1 != d0, (x - d0) / (d1 - d0), 0.0)
+        times = np.where(inside, t0 + fraction * (t1 - t0), np.inf)
+        best = np.minimum(best, times.min(axis=0))
+    return best
+
+class TravelTimeTable:
+    """First-arrival travel times on a distance × depth grid"""
+
+    def __init__(self, model: str, distances: np.ndarray, depths: np.ndarray, times: np.ndarray):
+        """
+        Initializes the table
+
+        Args:
+            model: TauP model name
+            distances: Grid distances (degrees, increasing)
+            depths: Grid source depths (km, increasing)
+            times: Travel times (s) of shape (len(distances), len(depths)), NaN where no arrival
+        """
+        self.model = model
+        self.distances = distances
+        self.depths = depths
+        self.times = times
+
+    @classmethod
+    def build(cls, model: str = 'iasp91', phases: Iterable[str] = TRAVEL_TIME_PHASES,
+              distance_step: float = TRAVEL_TIME_DISTANCE_STEP, depth_step: float = TRAVEL_TIME_DEPTH_STEP,
+              max_depth: float = TRAVEL_TIME_MAX_DEPTH) -> 'TravelTimeTable':
+        """
+        Computes the table from one of obspy's bundled TauP models
+
+        Args:
+            model: TauP model name
+            phases: Phase list (TauP names or groups such as 'ttp')
+            distance_step: Grid spacing in distance (degrees)
+            depth_step: Grid spacing in depth (km)
+            max_depth: Deepest source (km)
+
+        Returns:
+            Travel-time table
+        """
+        taup_model = TauPyModel(model)
+        phase_names = parse_phase_list(list(phases))
+        distances = np.arange(0.0, 180.0 + distance_step / 2, distance_step)
+        depths = np.arange(0.0, max_depth + depth_step / 2, depth_step)
+        times = np.empty((len(distances), len(depths)))
+        for j, depth in enumerate(depths):
+            tau_model = taup_model.model.depth_correct(depth).split_branch(0.0)
+            times[:, j] = _first_arrivals(tau_model, phase_names, distances)
+        times[np.isinf(times)] = np.nan
+        return cls(model, distances, depths, times)
+
+    @classmethod
+    def load_or_build(cls, model: str = 'iasp91', cache_dir: Optional[str] = None) -> 'TravelTimeTable':
+        """
+        Loads the table of a model from the cache, building and caching it on first use
+
+        Args:
+            model: TauP model name
+            cache_dir: Cache directory (defaults to ~/.p_wave_picker/cache)
+
+        Returns:
+            Travel-time table
+        """
+        grid = f"{model}:{','.join(TRAVEL_TIME_PHASES)}:{TRAVEL_TIME_DISTANCE_STEP}:{TRAVEL_TIME_DEPTH_STEP}:{TRAVEL_TIME_MAX_DEPTH}"
+        table_dir = (Path(cache_dir) if cache_dir else default_cache_dir()) / TRAVEL_TIME_DIR
+        path = table_dir / f"{model}_{hashlib.sha1(grid.encode('utf-8')).hexdigest()[:12]}.npz"
+        if path.exists():
+            try:
+                with np.load(path) as data:
+                    return cls(model, data['distances'], data['depths'], data['times'])
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Failed to read travel-time table {path}: {str(e)}")
+
+        table = cls.build(model)
+        try:
+            table_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix('.tmp.npz')
+            np.savez(temp_path, distances=table.distances, depths=table.depths, times=table.times)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"Failed to cache travel-time table: {str(e)}")
+        return table
+
+    def lookup(self, distances, depths) -> np.ndarray:
+        """
+        Bilinear interpolation of travel times
+
+        Args:
+            distances: Epicentral distances (degrees)
+            depths: Source depths (km), clipped to the grid
+
+        Returns:
+            Travel times (s), NaN where no arrival is predicted
+        """
+        distances = np.clip(np.asarray(distances, dtype=np.float64), self.distances[0], self.distances[-1])
+        depths = np.clip(np.asarray(depths, dtype=np.float64), self.depths[0], self.depths[-1])
+
+        i = np.clip(np.searchsorted(self.distances, distances, side='right') - 1, 0, len(self.distances) - 2)
+        j = np.clip(np.searchsorted(self.depths, depths, side='right') - 1, 0, len(self.depths) - 2)
+        u = (distances - self.distances[i]) / (self.distances[i + 1] - self.distances[i])
+        v = (depths - self.depths[j]) / (self.depths[j + 1] - self.depths[j])
+        t = self.times
+        return ((1 - u) * (1 - v) * t[i, j] + u * (1 - v) * t[i + 1, j]
+                + (1 - u) * v * t[i, j + 1] + u * v * t[i + 1, j + 1])
+
+class ArrivalPredictor:
+    """Predicted P arrivals of event files (NET.STA.evid.ID.mseed)"""
+
+    def __init__(self, table: TravelTimeTable, events: pd.DataFrame, stations: pd.DataFrame):
+        """
+        Initializes the predictor
+
+        Args:
+            table: Travel-time table
+            events: Catalog with CATALOG_COLUMNS
+            stations: Station list with STATION_COLUMNS
+        """
+        self.table = table
+        events = events.copy()
+        events['event_id'] = events['event_id'].astype(str)
+        events['origin'] = (pd.to_datetime(events['time'], utc=True)
+                            - pd.Timestamp('1970-01-01', tz='UTC')).dt.total_seconds()
+        self.events = events.drop_duplicates('event_id', keep='last').set_index('event_id')
+        stations = stations.copy()
+        stations['network'] = stations['network'].astype(str)
+        stations['station'] = stations['station'].astype(str)
+        self.stations = stations.drop_duplicates(['network', 'station'], keep='last').set_index(['network', 'station'])
+
+    @classmethod
+    def from_files(cls, catalog_path: str, stations_path: str, model: str = 'iasp91',
+                   cache_dir: Optional[str] = None) -> 'ArrivalPredictor':
+        """
+        Loads the event catalog and station list CSV files
+
+        Args:
+            catalog_path: CSV with CATALOG_COLUMNS (time in ISO format, depth in km)
+            stations_path: CSV with STATION_COLUMNS
+            model: TauP model name
+            cache_dir: Cache directory of the travel-time table
+
+        Returns:
+            Arrival predictor
+        """
+        events = pd.read_csv(catalog_path, usecols=CATALOG_COLUMNS, dtype={'event_id': str})
+        stations = pd.read_csv(stations_path, usecols=STATION_COLUMNS, dtype={'network': str, 'station': str})
+        return cls(TravelTimeTable.load_or_build(model, cache_dir), events, stations)
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional['ArrivalPredictor']:
+        """
+        Creates the predictor configured in the 'travel_time' settings
+
+        Returns:
+            Arrival predictor, or None if prediction is disabled or not configured
+        """
+        if not settings.get('travel_time', 'enabled', False):
+            return None
+        catalog_path = settings.get('travel_time', 'catalog', '')
+        stations_path = settings.get('travel_time', 'stations', '')
+        if not catalog_path or not stations_path:
+            logging.warning("Arrival prediction is enabled but no catalog or station list is set")
+            return None
+        try:
+            return cls.from_files(catalog_path, stations_path, settings.get('travel_time', 'model', 'iasp91'),
+                                  settings.get('storage', 'cache_dir', ''))
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to load arrival prediction inputs: {str(e)}")
+            return None
+
+    def predict(self, file_paths: Iterable[str]) -> Dict[str, Optional[UTCDateTime]]:
+        """
+        Predicts the P arrival of many files at once
+
+        Args:
+            file_paths: Event files
+
+        Returns:
+            {file_path: predicted arrival, or None if the event or station is unknown}
+        """
+        file_paths = list(file_paths)
+        infos = [parse_file_info(path) for path in file_paths]
+        events = self.events.reindex([info['event_id'] for info in infos])
+        stations = self.stations.reindex(pd.MultiIndex.from_tuples(
+            [(info['network'], info['station']) for info in infos], names=['network', 'station']))
+
+        distances = locations2degrees(events['latitude'].to_numpy(dtype=np.float64),
+                                      events['longitude'].to_numpy(dtype=np.float64),
+                                      stations['latitude'].to_numpy(dtype=np.float64),
+                                      stations['longitude'].to_numpy(dtype=np.float64))
+        arrivals = events['origin'].to_numpy(dtype=np.float64) + self.table.lookup(
+            distances, events['depth'].to_numpy(dtype=np.float64))
+        return {path: UTCDateTime(arrival) if np.isfinite(arrival) else None
+                for path, arrival in zip(file_paths, arrivals)}
+
+    def windows(self, file_paths: Iterable[str], before: float, after: float) -> Dict[str, Optional[Tuple[UTCDateTime, UTCDateTime]]]:
+        """
+        Time windows around the predicted arrivals
+
+        Args:
+            file_paths: Event files
+            before: Seconds before the prediction
+            after: Seconds after the prediction
+
+        Returns:
+            {file_path: (start, end), or None if no arrival is predicted}
+        """
+        return {path: (arrival - before, arrival + after) if arrival is not None else None
+                for path, arrival in self.predict(file_paths).items()}
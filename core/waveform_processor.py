@@ -1 +1,353 @@
- 
\ No newline at end of file
+"""
+Waveform Processor Module
+Compiles the preprocessing settings into a plan of stages and runs it on traces
+"""
+
+import json
+import hashlib
+import logging
+import warnings
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from obspy import Stream, Trace
+from scipy import signal
+
+from config.settings import Settings
+from config.constants import DEFAULT_SNR_WINDOW, DEFAULT_TAPER_PERCENTAGE, FILTER_CORNERS
+
+# Stages run in the order they are listed in a plan
+STAGE_TYPES = ('demean', 'detrend', 'taper', 'resample', 'filter', 'normalize', 'envelope')
+FILTER_TYPES = ('bandpass', 'highpass', 'lowpass')
+
+@lru_cache(maxsize=64)
+def filter_sos(filter_type: str, freqs: Tuple[float, ...], sampling_rate: float, corners: int = FILTER_CORNERS) -> np.ndarray:
+    """
+    Designs (once per sampling rate) the Butterworth filter obspy's Trace.filter would use
+
+    Args:
+        filter_type: 'bandpass', 'highpass' or 'lowpass'
+        freqs: (freqmin, freqmax) for bandpass, (freq,) otherwise
+        sampling_rate: Sampling rate of the filtered data
+        corners: Filter corners
+
+    Returns:
+        Second-order sections
+    """
+    nyquist = 0.5 * sampling_rate
+    if filter_type == 'bandpass':
+        low, high = freqs[0] / nyquist, freqs[1] / nyquist
+        if high - 1.0 > -1e-6:
+            warnings.warn(f"Selected high corner frequency ({freqs[1]}) of bandpass is at or above "
+                          f"Nyquist ({nyquist}). Applying a high-pass instead.")
+            return filter_sos('highpass', (freqs[0],), sampling_rate, corners)
+        if low > 1:
+            raise ValueError("Selected low corner frequency is above Nyquist.")
+        return signal.iirfilter(corners, [low, high], btype='band', ftype='butter', output='sos')
+    if filter_type == 'highpass':
+        f = freqs[0] / nyquist
+        if f > 1:
+            raise ValueError("Selected corner frequency is above Nyquist.")
+        return signal.iirfilter(corners, f, btype='highpass', ftype='butter', output='sos')
+    if filter_type == 'lowpass':
+        f = freqs[0] / nyquist
+        if f > 1:
+            f = 1.0
+            warnings.warn("Selected corner frequency is above Nyquist. Setting Nyquist as high corner.")
+        return signal.iirfilter(corners, f, btype='lowpass', ftype='butter', output='sos')
+    raise ValueError(f"Unknown filter type: {filter_type}")
+
+class ProcessingPlan:
+    """Ordered, hashable list of preprocessing stages
+
+    Each stage is (name, params) with JSON-serializable params. Plans are built with
+    from_settings() or add(), and key identifies the output of the plan for caches.
+    """
+
+    def __init__(self, stages: Optional[Iterable[Tuple[str, dict]]] = None):
+        """
+        Initializes the plan
+
+        Args:
+            stages: (name, params) stages
+        """
+        self.stages: List[Tuple[str, dict]] = []
+        for name, params in stages or ():
+            self.add(name, **params)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'ProcessingPlan':
+        """
+        Compiles the 'process' and 'filter' settings into a plan
+
+        Args:
+            settings: Settings instance
+
+        Returns:
+            Plan (empty if preprocessing is disabled)
+        """
+        plan = cls()
+        if not settings.get('process', 'preprocess'):
+            return plan
+
+        plan.add('demean')
+        taper = settings.get('process', 'taper', 0.0)
+        if taper:
+            plan.add('taper', max_percentage=taper)
+        sampling_rate = settings.get('process', 'sampling_rate')
+        if sampling_rate:
+            plan.add('resample', sampling_rate=float(sampling_rate))
+
+        filter_type = settings.get('filter', 'type')
+        freq_range = settings.get('filter', 'freq_range')
+        if filter_type and freq_range:
+            if filter_type == 'bandpass':
+                plan.add('filter', type='bandpass', freqs=[freq_range[0], freq_range[1]])
+            elif filter_type == 'highpass':
+                plan.add('filter', type='highpass', freqs=[freq_range[0]])
+            elif filter_type == 'lowpass':
+                plan.add('filter', type='lowpass', freqs=[freq_range[1]])
+
+        if settings.get('process', 'normalize', False):
+            plan.add('normalize')
+        if settings.get('process', 'envelope', False):
+            plan.add('envelope')
+        return plan
+
+    def add(self, name: str, **params) -> 'ProcessingPlan':
+        """
+        Appends a stage
+
+        Args:
+            name: Stage type (see STAGE_TYPES)
+            **params: Stage parameters
+
+        Returns:
+            The plan, for chaining
+        """
+        if name not in STAGE_TYPES:
+            raise ValueError(f"Unknown processing stage: {name}")
+        if name == 'filter' and params.get('type') not in FILTER_TYPES:
+            raise ValueError(f"Unknown filter type: {params.get('type')}")
+        self.stages.append((name, params))
+        return self
+
+    @property
+    def key(self) -> str:
+        """Hex digest identifying the plan"""
+        return hashlib.sha1(json.dumps(self.stages, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        """Number of stages"""
+        return len(self.stages)
+
+    def __eq__(self, other):
+        """Plans with the same stages are equal"""
+        return isinstance(other, ProcessingPlan) and self.stages == other.stages
+
+    def __repr__(self):
+        """Stage names"""
+        return f"ProcessingPlan({' -> '.join(name for name, _ in self.stages)})"
+
+class WaveformProcessor:
+    """Waveform Processor Class
+
+    Stages work on the float64 sample buffer of the trace in place where numpy/scipy
+    allow it: integer data is converted once, demean/taper/normalize never allocate
+    a second buffer, and filter designs are cached per sampling rate. Resampling and
+    filtering produce a new buffer that replaces the old one.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        """
+        Initializes the waveform processor
+
+        Args:
+            settings: Settings the default plan is compiled from
+        """
+        self.settings = settings or Settings()
+
+    def plan(self) -> ProcessingPlan:
+        """Compiles the current settings into a plan"""
+        return ProcessingPlan.from_settings(self.settings)
+
+    def process(self, trace: Trace, plan: Optional[ProcessingPlan] = None) -> Trace:
+        """
+        Runs a plan on a trace in place
+
+        Args:
+            trace: Trace to process
+            plan: Plan to run (defaults to the plan of the settings)
+
+        Returns:
+            The processed trace
+        """
+        if plan is None:
+            plan = self.plan()
+        if not plan.stages:
+            return trace
+        self._as_float(trace)
+        for name, params in plan.stages:
+            getattr(self, f'_{name}')(trace, **params)
+        return trace
+
+    def process_many(self, traces: List[Trace], plan: Optional[ProcessingPlan] = None) -> List[Trace]:
+        """
+        Runs the same plan on many traces
+
+        The plan is compiled once; the filter stage of traces with the same sampling
+        rate and length runs as one 2-D sosfilt call.
+
+        Args:
+            traces: Traces to process in place
+            plan: Plan to run (defaults to the plan of the settings)
+
+        Returns:
+            The processed traces
+        """
+        if plan is None:
+            plan = self.plan()
+        if not plan.stages:
+            return traces
+        for trace in traces:
+            self._as_float(trace)
+        for name, params in plan.stages:
+            if name == 'filter':
+                self._filter_many(traces, **params)
+            else:
+                stage = getattr(self, f'_{name}')
+                for trace in traces:
+                    stage(trace, **params)
+        return traces
+
+    def preprocess(self, st: Stream, plan: Optional[ProcessingPlan] = None) -> Stream:
+        """
+        Preprocesses waveform data.
+
+        Args:
+            st: The input waveform data stream.
+            plan: Plan to run (defaults to the plan of the settings)
+
+        Returns:
+            The processed waveform data stream.
+        """
+        try:
+            self.process_many(list(st), plan)
+            return st
+        except Exception as e:
+            logging.error(f"Failed to preprocess waveform: {str(e)}")
+            raise
+
+    def apply_filter(self, st: Stream, filter_type: str = 'bandpass', **kwargs) -> Stream:
+        """
+        Applies a filter to the waveform data.
+
+        Args:
+            st: The input waveform data stream.
+            filter_type: The type of filter.
+            **kwargs: Filter parameters (freqmin/freqmax for bandpass, freq otherwise).
+
+        Returns:
+            The filtered waveform data stream.
+        """
+        if filter_type == 'bandpass':
+            freqs = [kwargs['freqmin'], kwargs['freqmax']]
+        else:
+            freqs = [kwargs['freq']]
+        return self.preprocess(st, ProcessingPlan().add('filter', type=filter_type, freqs=freqs))
+
+    def calculate_snr(self, tr: Trace, window_length: Optional[int] = None) -> float:
+        """
+        Calculates the signal-to-noise ratio.
+
+        Args:
+            tr: The input waveform trace.
+            window_length: Number of leading noise samples (defaults to DEFAULT_SNR_WINDOW).
+
+        Returns:
+            The SNR value (dB).
+        """
+        if window_length is None:
+            window_length = DEFAULT_SNR_WINDOW
+        data = np.asarray(tr.data, dtype=np.float64)
+        signal_power = np.dot(data, data) / len(data)
+        noise = data[:window_length]
+        noise_power = np.dot(noise, noise) / len(noise)
+        return float(10 * np.log10(signal_power / noise_power))
+
+    @staticmethod
+    def _as_float(trace: Trace):
+        """Makes the sample buffer a writable, native float64 array (copies only if needed)"""
+        data = trace.data
+        if data.dtype != np.float64 or not data.dtype.isnative or not data.flags.writeable:
+            trace.data = data.astype(np.float64)
+
+    @staticmethod
+    def _demean(trace: Trace):
+        """Removes the mean"""
+        trace.data -= trace.data.mean()
+
+    @staticmethod
+    def _detrend(trace: Trace):
+        """Removes a least-squares line"""
+        data = trace.data
+        n = len(data)
+        if n < 2:
+            return
+        x = np.arange(n, dtype=np.float64)
+        x -= x.mean()
+        slope = np.dot(x, data) / np.dot(x, x)
+        data -= data.mean()
+        data -= slope * x
+
+    @staticmethod
+    def _taper(trace: Trace, max_percentage: float = DEFAULT_TAPER_PERCENTAGE):
+        """Applies a Hann taper to both ends (only the tapered samples are touched)"""
+        data = trace.data
+        n = min(int(len(data) * max_percentage), len(data) // 2)
+        if n < 1:
+            return
+        ramp = 0.5 * (1.0 - np.cos(np.pi * np.arange(n) / n))
+        data[:n] *= ramp
+        data[len(data) - n:] *= ramp[::-1]
+
+    @staticmethod
+    def _resample(trace: Trace, sampling_rate: float):
+        """Resamples with obspy (a trace already at the target rate is left alone)"""
+        if trace.stats.sampling_rate != sampling_rate:
+            trace.resample(sampling_rate)
+            WaveformProcessor._as_float(trace)
+
+    @staticmethod
+    def _filter(trace: Trace, type: str, freqs: List[float]):
+        """Applies a causal Butterworth filter"""
+        sos = filter_sos(type, tuple(freqs), float(trace.stats.sampling_rate))
+        trace.data = signal.sosfilt(sos, trace.data)
+
+    @staticmethod
+    def _filter_many(traces: List[Trace], type: str, freqs: List[float]):
+        """Filters traces grouped by sampling rate and length"""
+        groups = {}
+        for trace in traces:
+            groups.setdefault((float(trace.stats.sampling_rate), len(trace.data)), []).append(trace)
+        for (sampling_rate, _), group in groups.items():
+            sos = filter_sos(type, tuple(freqs), sampling_rate)
+            if len(group) == 1:
+                group[0].data = signal.sosfilt(sos, group[0].data)
+                continue
+            filtered = signal.sosfilt(sos, np.vstack([trace.data for trace in group]), axis=-1)
+            for trace, row in zip(group, filtered):
+                trace.data = row
+
+    @staticmethod
+    def _normalize(trace: Trace):
+        """Scales to a maximum absolute amplitude of 1"""
+        peak = np.abs(trace.data).max() if len(trace.data) else 0.0
+        if peak > 0:
+            trace.data /= peak
+
+    @staticmethod
+    def _envelope(trace: Trace):
+        """Replaces the samples by their envelope"""
+        trace.data = np.abs(signal.hilbert(trace.data))
@@ -0,0 +1,267 @@
+"""
+Waveform Pyramid Module
+Multi-resolution min/max summaries of long traces, cached on disk as memory-mapped arrays
+"""
+
+import os
+import json
+import math
+import shutil
+import hashlib
+import logging
+import threading
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from config.constants import CACHE_DIR_NAME, PYRAMID_FACTOR, PYRAMID_MIN_BINS, PYRAMID_MIN_SAMPLES
+from core.decimation import minmax_envelope
+from core.waveform_processor import ProcessingPlan
+
+META_FILE = 'pyramid.json'
+LEVEL_PATTERN = 'level_{:02d}.npy'
+
+def default_cache_dir() -> Path:
+    """Cache directory next to the user settings"""
+    return Path.home() / '.p_wave_picker' / CACHE_DIR_NAME
+
+def preprocessing_key(settings) -> str:
+    """
+    Hashes the preprocessing plan the settings compile to
+
+    Args:
+        settings: Settings instance
+
+    Returns:
+        Hex digest identifying the preprocessing
+    """
+    return ProcessingPlan.from_settings(settings).key
+
+def _reduce(mins: np.ndarray, maxs: np.ndarray, start: int, stop: int, group: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces [start, stop) of min/max arrays into groups of `group` entries (the last may be partial)
+    """
+    n_full = (stop - start) // group
+    full_end = start + n_full * group
+    out_min = mins[start:full_end].reshape(n_full, group).min(axis=1)
+    out_max = maxs[start:full_end].reshape(n_full, group).max(axis=1)
+    if full_end < stop:
+        out_min = np.append(out_min, mins[full_end:stop].min())
+        out_max = np.append(out_max, maxs[full_end:stop].max())
+    return out_min, out_max
+
+class WaveformPyramid:
+    """Min/max levels of one trace at bin sizes factor, factor**2, ..."""
+
+    def __init__(self, data: np.ndarray, sampling_rate: float, factor: int, levels: List[np.ndarray]):
+        """
+        Initializes the pyramid
+
+        Args:
+            data: Raw samples, used when zoomed in below the finest level
+            sampling_rate: Sampling rate (Hz)
+            factor: Bin size ratio between consecutive levels
+            levels: [n_bins, 2] arrays of (min, max), finest first
+        """
+        self.data = data
+        self.sampling_rate = sampling_rate
+        self.factor = factor
+        self.levels = levels
+
+    @classmethod
+    def build(cls, data: np.ndarray, sampling_rate: float, factor: int = PYRAMID_FACTOR,
+              min_bins: int = PYRAMID_MIN_BINS) -> 'WaveformPyramid':
+        """
+        Builds all levels in memory
+
+        Args:
+            data: Waveform samples
+            sampling_rate: Sampling rate (Hz)
+            factor: Bin size ratio between consecutive levels
+            min_bins: Coarsest level kept has at least this many bins
+
+        Returns:
+            Pyramid
+        """
+        levels = []
+        mins, maxs = data, data
+        while math.ceil(len(mins) / factor) >= min_bins:
+            mins, maxs = _reduce(mins, maxs, 0, len(mins), factor)
+            levels.append(np.column_stack((mins, maxs)).astype(np.float32))
+        return cls(data, sampling_rate, factor, levels)
+
+    def bin_size(self, level: int) -> int:
+        """Samples per bin of a level"""
+        return self.factor ** (level + 1)
+
+    def envelope(self, t0: float, t1: float, n_columns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the envelope of [t0, t1] from the coarsest level that still resolves one pixel
+
+        Args:
+            t0: Start of the visible range (s, relative to the first sample)
+            t1: End of the visible range (s)
+            n_columns: Number of pixel columns
+
+        Returns:
+            (times, values) of the polyline to draw
+        """
+        n_columns = max(1, int(n_columns))
+        samples_per_column = (t1 - t0) * self.sampling_rate / n_columns
+        level = -1
+        while level + 1 < len(self.levels) and self.bin_size(level + 1) <= samples_per_column:
+            level += 1
+        if level < 0:
+            return minmax_envelope(self.data, self.sampling_rate, t0, t1, n_columns)
+
+        bins = self.levels[level]
+        bin_size = self.bin_size(level)
+        i0 = max(0, int(math.floor(t0 * self.sampling_rate / bin_size)) - 1)
+        i1 = min(len(bins), int(math.ceil(t1 * self.sampling_rate / bin_size)) + 2)
+        if i1 <= i0:
+            return np.empty(0), np.empty(0, dtype=np.float32)
+
+        # Group bins per pixel column on a global grid so panning does not jitter
+        group = max(1, int(math.ceil((i1 - i0) / n_columns)))
+        i0 = (i0 // group) * group
+        mins, maxs = _reduce(bins[:, 0], bins[:, 1], i0, i1, group)
+
+        # Both extremes are drawn at the centre of their column
+        centres = (i0 + (np.arange(len(mins)) + 0.5) * group) * bin_size
+        times = np.repeat(np.minimum(centres, len(self.data) - 1) / self.sampling_rate, 2)
+        values = np.empty(2 * len(mins), dtype=np.float32)
+        values[0::2] = mins
+        values[1::2] = maxs
+        return times, values
+
+class PyramidCache:
+    """On-disk cache of waveform pyramids, built in a background thread"""
+
+    def __init__(self, cache_dir: Optional[str] = None, min_samples: int = PYRAMID_MIN_SAMPLES):
+        """
+        Initializes the cache
+
+        Args:
+            cache_dir: Cache directory (defaults to ~/.p_wave_picker/cache)
+            min_samples: Traces shorter than this are decimated from raw samples
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.min_samples = min_samples
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pyramid')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, file_path: str, key: str) -> Path:
+        """
+        Cache directory of one file, preprocessing and file version
+
+        The name starts with a hash of the path so older versions of the same file
+        can be found and removed.
+        """
+        path_hash = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+        stat = os.stat(file_path)
+        version = f"{stat.st_mtime_ns}:{stat.st_size}:{key}"
+        return self.cache_dir / f"{path_hash}_{hashlib.sha1(version.encode('utf-8')).hexdigest()[:16]}"
+
+    def load(self, file_path: str, trace, key: str) -> Optional[WaveformPyramid]:
+        """
+        Loads a cached pyramid
+
+        Args:
+            file_path: Source file of the trace
+            trace: Preprocessed trace the pyramid summarizes
+            key: Preprocessing key
+
+        Returns:
+            Memory-mapped pyramid, or None if not cached
+        """
+        try:
+            entry = self._entry_dir(file_path, key)
+            with open(entry / META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['npts'] != trace.stats.npts or meta['sampling_rate'] != trace.stats.sampling_rate:
+                return None
+            levels = [np.load(entry / LEVEL_PATTERN.format(i), mmap_mode='r') for i in range(meta['levels'])]
+            return WaveformPyramid(trace.data, trace.stats.sampling_rate, meta['factor'], levels)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, file_path: str, pyramid: WaveformPyramid, key: str) -> None:
+        """
+        Writes a pyramid and removes entries of older versions of the same file
+
+        Args:
+            file_path: Source file
+            pyramid: Pyramid to store
+            key: Preprocessing key
+        """
+        entry = self._entry_dir(file_path, key)
+        tmp = entry.with_name(entry.name + f'.tmp{threading.get_ident()}')
+        tmp.mkdir(parents=True, exist_ok=True)
+        for i, level in enumerate(pyramid.levels):
+            np.save(tmp / LEVEL_PATTERN.format(i), level)
+        meta = {
+            'file_path': os.path.abspath(file_path),
+            'npts': len(pyramid.data),
+            'sampling_rate': pyramid.sampling_rate,
+            'factor': pyramid.factor,
+            'levels': len(pyramid.levels)
+        }
+        with open(tmp / META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+
+        prefix = entry.name.split('_')[0] + '_'
+        for old in self.cache_dir.glob(prefix + '*'):
+            if old != tmp:
+                shutil.rmtree(old, ignore_errors=True)
+        os.replace(tmp, entry)
+
+    def get(self, file_path: str, trace, key: str,
+            callback: Optional[Callable[[str, WaveformPyramid], Any]] = None) -> Optional[WaveformPyramid]:
+        """
+        Gets the pyramid of a trace, building it in the background on a cache miss
+
+        Args:
+            file_path: Source file of the trace
+            trace: Preprocessed trace
+            key: Preprocessing key
+            callback: Called from the worker thread with (file_path, pyramid) once built
+
+        Returns:
+            The cached pyramid, or None if the trace is short or the pyramid is being built
+        """
+        if not file_path or trace.stats.npts < self.min_samples:
+            return None
+        pyramid = self.load(file_path, trace, key)
+        if pyramid is not None:
+            return pyramid
+
+        with self._lock:
+            if (file_path, key) in self._pending:
+                return None
+            self._pending.add((file_path, key))
+        self._executor.submit(self._build, file_path, trace, key, callback)
+        return None
+
+    def _build(self, file_path: str, trace, key: str, callback) -> None:
+        """Build and store a pyramid (runs in the worker thread)"""
+        try:
+            pyramid = WaveformPyramid.build(trace.data, trace.stats.sampling_rate)
+            self.store(file_path, pyramid, key)
+            pyramid = self.load(file_path, trace, key) or pyramid
+            if callback:
+                callback(file_path, pyramid)
+        except Exception as e:
+            logging.error(f"Failed to build waveform pyramid for {os.path.basename(file_path)}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard((file_path, key))
+
+    def clear(self) -> None:
+        """Remove all cached pyramids"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def close(self) -> None:
+        """Wait for pending builds and stop the worker thread"""
+        self._executor.shutdown(wait=True)
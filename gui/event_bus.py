@@ -0,0 +1,93 @@
+"""
+Worker-to-Tk Event Bus
+"""
+
+import queue
+import logging
+import itertools
+import tkinter as tk
+from collections import OrderedDict
+from config.constants import UI_REFRESH_INTERVAL_MS
+
+class EventBus:
+    """Queue that worker threads post UI events to, drained on the Tk thread
+    Tk is only touched from the main loop. Coalesced event types keep only their
+    latest event per key between two drains, so the UI refresh rate does not depend
+    on how fast workers report.
+    """
+
+    CALL = '__call__'
+
+    def __init__(self, root, interval_ms=UI_REFRESH_INTERVAL_MS):
+        """Initialize the bus"""
+        self.root = root
+        self.interval_ms = interval_ms
+        self.handlers = {}  # {event type: (handler, coalesce)}
+        self._queue = queue.SimpleQueue()
+        self._sequence = itertools.count()
+        self._after_id = None
+
+    def subscribe(self, event_type, handler, coalesce=False):
+        """Register the handler of an event type (one handler per type)"""
+        self.handlers[event_type] = (handler, coalesce)
+
+    def post(self, event_type, *args, key=None):
+        """Post an event from any thread
+        Coalesced events with the same type and key replace each other.
+        """
+        self._queue.put((event_type, key, args))
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk thread (never coalesced)"""
+        self._queue.put((self.CALL, None, (func,) + args))
+
+    def start(self):
+        """Start draining on the Tk main loop"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Stop draining"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        """Drain the queue and reschedule"""
+        self.drain()
+        try:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+        except tk.TclError:
+            self._after_id = None  # Window destroyed
+
+    def drain(self):
+        """Dispatch all queued events on the calling (Tk) thread
+
+        Returns:
+            Number of dispatched events
+        """
+        events = OrderedDict()
+        while True:
+            try:
+                event_type, key, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            coalesce = event_type in self.handlers and self.handlers[event_type][1]
+            slot = (event_type, key) if coalesce else (event_type, next(self._sequence))
+            events.pop(slot, None)  # A replaced event moves to the position of the latest one
+            events[slot] = args
+
+        for (event_type, _), args in events.items():
+            try:
+                if event_type == self.CALL:
+                    args[0](*args[1:])
+                elif event_type in self.handlers:
+                    self.handlers[event_type][0](*args)
+                else:
+                    logging.warning(f"No handler for UI event: {event_type}")
+            except Exception as e:
+                logging.error(f"UI event {event_type} failed: {str(e)}")
+        return len(events)
@@ -0,0 +1,109 @@
+"""
+File List Model
+"""
+
+from core.file_manager import parse_file_info
+from config.constants import FILE_STATUS
+
+class FileListModel:
+    """Sorted, filtered view over the project files
+    The Treeview only shows a window of this view; status changes are O(1).
+    """
+
+    SORT_KEYS = {
+        'name': lambda info, status: (info['file_name'],),
+        'station': lambda info, status: (info['station'], info['network'], info['file_name']),
+        'event': lambda info, status: (info['event_id'], info['station'], info['file_name']),
+        'status': lambda info, status: (status, info['file_name'])
+    }
+
+    def __init__(self):
+        """Initialize the model"""
+        self.paths = []
+        self.status = {}  # {file path: status}
+        self.view = []  # Paths passing the filters, in sort order
+        self._positions = {}  # {file path: position in view}
+        self.filters = {'status': '', 'station': '', 'event_id': ''}
+        self.sort_key = 'name'
+        self.reverse = False
+
+    def __len__(self):
+        """Number of rows in the view"""
+        return len(self.view)
+
+    def set_files(self, file_paths, status=FILE_STATUS['unprocessed']):
+        """Replace all files"""
+        self.paths = list(file_paths)
+        self.status = dict.fromkeys(self.paths, status)
+        self.refresh()
+
+    def add_file(self, file_path, status=FILE_STATUS['unprocessed']):
+        """Add one file if it is not listed yet"""
+        if file_path in self.status:
+            return
+        self.paths.append(file_path)
+        self.status[file_path] = status
+        self.refresh()
+
+    def set_status(self, file_path, status):
+        """Set the status of a file
+        The view is not re-sorted or re-filtered until the next refresh().
+
+        Returns:
+            Position of the file in the view, or None if it is not shown
+        """
+        if file_path not in self.status:
+            return None
+        self.status[file_path] = status
+        return self._positions.get(file_path)
+
+    def set_filter(self, status=None, station=None, event_id=None):
+        """Filter rows by status (exact), station and event ID (case-insensitive substrings)"""
+        for key, value in (('status', status), ('station', station), ('event_id', event_id)):
+            if value is not None:
+                self.filters[key] = value.strip()
+        self.refresh()
+
+    def set_sort(self, sort_key, reverse=False):
+        """Sort rows by 'name', 'station', 'event' or 'status'"""
+        if sort_key not in self.SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        self.sort_key = sort_key
+        self.reverse = reverse
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the view from the filters and sort order"""
+        status_filter = self.filters['status']
+        station_filter = self.filters['station'].upper()
+        event_filter = self.filters['event_id'].upper()
+
+        rows = []
+        for path in self.paths:
+            status = self.status[path]
+            if status_filter and status != status_filter:
+                continue
+            info = parse_file_info(path)
+            if station_filter and station_filter not in info['station'].upper():
+                continue
+            if event_filter and event_filter not in info['event_id'].upper():
+                continue
+            rows.append((path, info, status))
+
+        key = self.SORT_KEYS[self.sort_key]
+        rows.sort(key=lambda row: key(row[1], row[2]), reverse=self.reverse)
+        self.view = [row[0] for row in rows]
+        self._positions = {path: i for i, path in enumerate(self.view)}
+
+    def index_of(self, file_path):
+        """Position of a file in the view, or None"""
+        return self._positions.get(file_path)
+
+    def path_at(self, index):
+        """File at a view position"""
+        return self.view[index]
+
+    def rows(self, start, count):
+        """Rows [(path, file name, status), ...] of a window of the view"""
+        return [(path, parse_file_info(path)['file_name'], self.status[path])
+                for path in self.view[start:start + count]]
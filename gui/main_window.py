@@ -4,23 +4,32 @@ Main Window
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, font
 from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
 from gui.plot_widget import PlotWidget
 from gui.settings_dialog import SettingsDialog
 from gui.progress_dialog import ProgressDialog
-from core.file_manager import FileManager
+from gui.file_list_model import FileListModel
+from gui.event_bus import EventBus
+from core.file_manager import FileManager, parse_file_info
 from core.pick_manager import PickManager
 from core.batch_processor import BatchProcessor
-from core.command_history import CommandHistory, AddPickCommand, RemovePickCommand, UpdatePickCommand
+from core.pick_importer import PickImporter
+from core.command_history import CommandHistory, AddPickCommand, RemovePickCommand, UpdatePickCommand, BatchCommand
+from core.session_journal import SessionJournal
 from config.settings import Settings
 from config.constants import (
     FILE_TYPES,
     PICK_QUALITY,
     COLORS,
     DEFAULT_PARAMS,
-    DEFAULT_PICK_QUALITY
+    DEFAULT_PICK_QUALITY,
+    DEFAULT_HISTORY_DEPTH,
+    PICK_STORE_FILE,
+    FILE_STATUS,
+    FILE_LIST_ROW_HEIGHT
 )
 import matplotlib.pyplot as plt
 
@@ -40,11 +49,32 @@ class MainWindow(tk.Tk):
         # Initialize managers
         self.file_manager = FileManager()
         self.pick_manager = PickManager()
-        self.command_history = CommandHistory()
+        self.command_history = CommandHistory(self.settings.get('ui', 'history_depth', DEFAULT_HISTORY_DEPTH))
         self.batch_processor = BatchProcessor(self.file_manager, self.pick_manager)
         
         self.selected_pick = None # Initialize selected pick
-        self.is_loading_file = False  # Add flag to prevent duplicate loading
+        self.selected_pick_file = None # File of the selected pick (differs from the current file in the record section)
+        
+        # Files are read on a single worker; only the latest selection is shown
+        self.load_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='file-load')
+        self.load_generation = 0
+        self.load_future = None
+        self.loading_file = None  # File being loaded, None when the display is current
+        
+        # File list model; the Treeview only holds the rows of the visible window
+        self.file_list_model = FileListModel()
+        self.file_list_top = 0  # View position of the first displayed row
+        self.file_list_rows = 30  # Number of displayed rows, follows the widget height
+        self.selected_file = None
+        self._rendering_file_list = False
+        self.progress_dialog = None
+        
+        # Worker threads post UI updates here; they are applied on the Tk thread
+        self.event_bus = EventBus(self)
+        self.event_bus.subscribe('status', self.update_status, coalesce=True)
+        self.event_bus.subscribe('progress', self.update_progress, coalesce=True)
+        self.event_bus.subscribe('file_status', self.update_file_status, coalesce=True)
+        self.event_bus.subscribe('batch_progress', self.on_batch_progress, coalesce=True)
         
         # Create UI
         self.title("P-wave Phase Picking System")
@@ -59,6 +89,20 @@ class MainWindow(tk.Tk):
         
         # Center window
         self.center_window()
+        
+        # Start applying worker events
+        self.event_bus.start()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def on_close(self):
+        """Flush the session journal and pick store, then close the window"""
+        self.event_bus.stop()
+        self.load_executor.shutdown(wait=False, cancel_futures=True)
+        if self.command_history.journal is not None:
+            self.command_history.journal.close()
+            self.command_history.set_journal(None)
+        self.pick_manager.close()
+        self.destroy()
     
     def setup_fonts(self):
         """Set fonts"""
@@ -95,7 +139,7 @@ class MainWindow(tk.Tk):
         self.right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5)
         
         # Create plot area
-        self.plot_widget = PlotWidget(self.right_panel, self.file_manager, self.pick_manager)
+        self.plot_widget = PlotWidget(self.right_panel, self.file_manager, self.pick_manager, self.event_bus)
         self.plot_widget.pack(fill=tk.BOTH, expand=True)
         
         # Create toolbar
@@ -108,29 +152,63 @@ class MainWindow(tk.Tk):
         self.file_list_frame = ttk.LabelFrame(self.left_panel, text="File List")
         self.file_list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Create filter and sort controls
+        self.file_filter_frame = ttk.Frame(self.file_list_frame)
+        self.file_filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.status_filter_var = tk.StringVar(value="All")
+        self.station_filter_var = tk.StringVar()
+        self.event_filter_var = tk.StringVar()
+        self.sort_var = tk.StringVar(value="name")
+        ttk.Label(self.file_filter_frame, text="Status:").grid(row=0, column=0, sticky=tk.W)
+        status_filter = ttk.Combobox(self.file_filter_frame, textvariable=self.status_filter_var,
+                                     values=["All"] + list(FILE_STATUS.values()), state='readonly', width=11)
+        status_filter.grid(row=0, column=1, sticky=tk.EW)
+        status_filter.bind("<<ComboboxSelected>>", lambda e: self.apply_file_filter())
+        ttk.Label(self.file_filter_frame, text="Sort:").grid(row=0, column=2, sticky=tk.W, padx=(5, 0))
+        sort_box = ttk.Combobox(self.file_filter_frame, textvariable=self.sort_var,
+                                values=list(FileListModel.SORT_KEYS), state='readonly', width=7)
+        sort_box.grid(row=0, column=3, sticky=tk.EW)
+        sort_box.bind("<<ComboboxSelected>>", lambda e: self.apply_file_filter())
+        ttk.Label(self.file_filter_frame, text="Station:").grid(row=1, column=0, sticky=tk.W)
+        station_entry = ttk.Entry(self.file_filter_frame, textvariable=self.station_filter_var, width=10)
+        station_entry.grid(row=1, column=1, sticky=tk.EW)
+        ttk.Label(self.file_filter_frame, text="Event:").grid(row=1, column=2, sticky=tk.W, padx=(5, 0))
+        event_entry = ttk.Entry(self.file_filter_frame, textvariable=self.event_filter_var, width=8)
+        event_entry.grid(row=1, column=3, sticky=tk.EW)
+        for entry in (station_entry, event_entry):
+            entry.bind("<Return>", lambda e: self.apply_file_filter())
+        
+        # Create scrollbar; it scrolls the model window, not the Treeview
+        self.file_scrollbar = ttk.Scrollbar(
+            self.file_list_frame,
+            orient=tk.VERTICAL,
+            command=self.on_file_list_scroll
+        )
+        self.file_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
         # Create file list
         self.file_list = ttk.Treeview(
             self.file_list_frame,
             columns=("File Name", "Status"),
-            show="headings"
+            show="headings",
+            selectmode="browse"
         )
-        self.file_list.heading("File Name", text="File")
-        self.file_list.heading("Status", text="Stat.")
+        self.file_list.heading("File Name", text="File", command=lambda: self.sort_file_list('name'))
+        self.file_list.heading("Status", text="Stat.", command=lambda: self.sort_file_list('status'))
         self.file_list.column("File Name", width=150)
         self.file_list.column("Status", width=50)
         self.file_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Create scrollbar
-        self.file_scrollbar = ttk.Scrollbar(
-            self.file_list_frame,
-            orient=tk.VERTICAL,
-            command=self.file_list.yview
-        )
-        self.file_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.file_list.configure(yscrollcommand=self.file_scrollbar.set)
-        
-        # Bind selection event
+        # Bind selection, resize, wheel and keyboard navigation events
         self.file_list.bind("<<TreeviewSelect>>", self.on_file_select)
+        self.file_list.bind("<Configure>", self.on_file_list_resize)
+        self.file_list.bind("<MouseWheel>", lambda e: self.scroll_file_list(-1 if e.delta > 0 else 1, 'units'))
+        self.file_list.bind("<Button-4>", lambda e: self.scroll_file_list(-1, 'units'))
+        self.file_list.bind("<Button-5>", lambda e: self.scroll_file_list(1, 'units'))
+        self.file_list.bind("<Up>", lambda e: self.move_file_selection(-1))
+        self.file_list.bind("<Down>", lambda e: self.move_file_selection(1))
+        self.file_list.bind("<Prior>", lambda e: self.move_file_selection(-self.file_list_rows))
+        self.file_list.bind("<Next>", lambda e: self.move_file_selection(self.file_list_rows))
     
     def create_menu(self):
         """Create menu"""
@@ -145,8 +223,11 @@ class MainWindow(tk.Tk):
         self.file_menu.add_command(label="Open Directory", command=self.open_directory)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Save Picks", command=self.save_picks)
+        self.file_menu.add_command(label="Import Picks", command=self.import_picks)
         self.file_menu.add_command(label="Export Data", command=self.export_data)
         self.file_menu.add_separator()
+        self.file_menu.add_command(label="Batch Auto Pick", command=self.run_batch)
+        self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self.quit)
         
         # Edit menu
@@ -156,6 +237,7 @@ class MainWindow(tk.Tk):
         self.edit_menu.add_command(label="Redo", command=self.redo)
         self.edit_menu.add_separator()
         self.edit_menu.add_command(label="Delete Pick", command=self.remove_pick)
+        self.edit_menu.add_command(label="Delete All C-Quality Picks", command=lambda: self.remove_picks_by_quality('C'))
         
         # View menu
         self.view_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -163,6 +245,9 @@ class MainWindow(tk.Tk):
         self.view_menu.add_command(label="Reset View", command=self.reset_view)
         self.view_menu.add_command(label="Zoom In", command=self.zoom_in)
         self.view_menu.add_command(label="Zoom Out", command=self.zoom_out)
+        self.view_menu.add_separator()
+        self.view_menu.add_command(label="Record Section by Station", command=lambda: self.show_record_section('station'))
+        self.view_menu.add_command(label="Record Section by Pick Time", command=lambda: self.show_record_section('pick_time'))
         
         # Settings menu
         self.settings_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -279,9 +364,8 @@ class MainWindow(tk.Tk):
         )
         if file_path:
             # Add file to list and select it
-            self.update_file_list_with_new_file(file_path)
-            self.file_list.selection_set(file_path) # Selects the item with the full path as iid
-            self.file_list.focus(file_path) # Focuses on it as well
+            self.file_list_model.add_file(file_path)
+            self.select_file(file_path)
     
     def open_directory(self):
         """Open directory"""
@@ -298,18 +382,43 @@ class MainWindow(tk.Tk):
         thread.start()
 
     def _scan_directory_task(self, dir_path):
+        # Runs in a worker thread: only the scan happens here, all UI and pick work goes through the event bus
         try:
             self.file_manager.scan_directory(dir_path)
-            self.update_file_list()
-            self.update_status(f"Scanned {len(self.file_manager.get_files())} files.")
-            if self.file_manager.has_files():
-                # Automatically load the first file after scanning a directory
-                first_file = self.file_manager.get_files()[0]
-                self.file_list.selection_set(first_file) # Selects the item with the full path as iid
-                self.file_list.focus(first_file) # Focuses on it as well
+            self.event_bus.call(self._on_directory_scanned, dir_path)
         except Exception as e:
-            self.update_status(f"Error scanning directory: {str(e)}")
-            messagebox.showerror("Error", f"Failed to scan directory: {str(e)}")
+            self.event_bus.post('status', f"Error scanning directory: {str(e)}")
+            self.event_bus.call(messagebox.showerror, "Error", f"Failed to scan directory: {str(e)}")
+
+    def _on_directory_scanned(self, dir_path):
+        """Open the picks of the scanned directory and show its files (Tk thread, like all PickManager changes)"""
+        # Close the previous journal first: rescanning the same directory must not recover a log
+        # that still has buffered entries. Its commands refer to picks that are no longer loaded.
+        if self.command_history.journal is not None:
+            self.command_history.journal.close()
+            self.command_history.set_journal(None)
+        self.command_history.clear()
+        try:
+            # Keep picks of this directory in its own pick store
+            self.pick_manager.attach_store(os.path.join(dir_path, PICK_STORE_FILE))
+            # Recover manual picks journaled by a session that did not exit cleanly
+            journal = SessionJournal(dir_path, self.pick_manager)
+            replayed = journal.recover()
+        except Exception as e:
+            self.update_status(f"Error opening picks: {str(e)}")
+            messagebox.showerror("Error", f"Failed to open the picks of {dir_path}: {str(e)}")
+            return
+
+        self.command_history.set_journal(journal)
+        self.update_file_list()
+        message = f"Scanned {len(self.file_manager.get_files())} files."
+        if replayed:
+            message += f" Recovered {replayed} journaled pick edits."
+        self.update_status(message)
+        if self.file_manager.has_files():
+            # Automatically load the first file after scanning a directory
+            if len(self.file_list_model):
+                self.select_file(self.file_list_model.path_at(0))
 
     def save_picks(self):
         """Save picks"""
@@ -330,6 +439,23 @@ class MainWindow(tk.Tk):
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save picks: {str(e)}")
     
+    def import_picks(self):
+        """Import picks from a previously saved CSV/JSON file or a pick catalog"""
+        file_path = filedialog.askopenfilename(
+            title="Import Picks",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json")]
+        )
+        if file_path:
+            try:
+                report = PickImporter(self.pick_manager, self.file_manager).import_file(file_path)
+                self.update_plot()
+                self.update_status(report.summary())
+                if report.rejected_count:
+                    details = "\n".join(f"Row {row}: {reason}" for row, reason in report.rejected[:20])
+                    messagebox.showwarning("Import Picks", f"{report.rejected_count} rows were rejected:\n{details}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to import picks: {str(e)}")
+    
     def export_data(self):
         """Export data"""
         if not self.file_manager.get_current_trace():
@@ -348,68 +474,106 @@ class MainWindow(tk.Tk):
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export data: {str(e)}")
     
+    def run_batch(self, mode='auto'):
+        """Run automatic picking over all files in a background thread"""
+        files = self.file_manager.get_files()
+        if not files:
+            messagebox.showwarning("Warning", "Please open a directory first!")
+            return
+        
+        # Callbacks run in the batch thread and only post events
+        self.batch_processor.set_callbacks(status_callback=lambda message: self.event_bus.post('status', message))
+        success, message = self.batch_processor.process_batch(
+            files, mode,
+            callback=lambda progress, message: self.event_bus.post('batch_progress', progress, message),
+            file_callback=lambda file_path, success: self.event_bus.post(
+                'file_status', file_path, FILE_STATUS['processed'] if success else FILE_STATUS['unprocessed'], key=file_path),
+            done_callback=lambda summary: self.event_bus.call(self.on_batch_done, summary)
+        )
+        if not success:
+            messagebox.showwarning("Warning", message)
+            return
+        self.progress_dialog = ProgressDialog(self, "Batch Auto Pick", on_cancel=self.batch_processor.cancel_processing)
+    
+    def on_batch_progress(self, progress, message):
+        """Show batch progress (Tk thread)"""
+        self.progress_bar["value"] = progress
+        if self.progress_dialog is not None and self.progress_dialog.winfo_exists():
+            self.progress_dialog.update_progress(progress, message)
+    
+    def on_batch_done(self, summary):
+        """Close the progress dialog and show the batch summary (Tk thread)"""
+        if self.progress_dialog is not None and self.progress_dialog.winfo_exists():
+            self.progress_dialog.destroy()
+        self.progress_dialog = None
+        stats = summary.to_dict()
+        self.update_status(f"Batch finished: {stats['successful_files']}/{stats['total_files']} files, "
+                           f"{stats['total_picks']} picks")
+        self.update_plot()
+    
     def undo(self):
         """Undo operation"""
         success, message = self.command_history.undo()
         if success:
+            self._refresh_selected_pick()
             self.update_plot()
-            self.update_status(message)
-            # Update quality dropdown if the undo operation affected the selected pick
-            if self.selected_pick and not self.pick_manager.get_pick(self.selected_pick.time, self.selected_pick.quality, self.file_manager.get_current_file()):
-                self.selected_pick = None # The pick was removed by undo, deselect it
-                self.quality_var.set(DEFAULT_PICK_QUALITY)
-            elif self.selected_pick:
-                # If the pick itself was updated, ensure dropdown reflects new quality
-                pick_after_undo = self.pick_manager.find_nearest_pick(self.file_manager.get_current_file(), self.selected_pick.time, threshold=0.01)
-                if pick_after_undo: # Ensure pick still exists
-                    self.quality_var.set(pick_after_undo.quality)
-        else:
-            self.update_status(message)
+        self.update_status(message)
     
     def redo(self):
         """Redo operation"""
         success, message = self.command_history.redo()
         if success:
+            self._refresh_selected_pick()
             self.update_plot()
-            self.update_status(message)
-            # Update quality dropdown if the redo operation affected the selected pick
-            if self.selected_pick and not self.pick_manager.get_pick(self.selected_pick.time, self.selected_pick.quality, self.file_manager.get_current_file()):
-                # If a new pick was redone, select it (assuming it's the last one added)
-                current_file_path = self.file_manager.get_current_file()
-                picks_for_file = self.pick_manager.get_picks_for_file(current_file_path)
-                if picks_for_file:
-                    self.selected_pick = picks_for_file[-1] # Select the last pick (usually the one redone)
-                    self.quality_var.set(self.selected_pick.quality)
-                else:
-                    self.selected_pick = None
-                    self.quality_var.set(DEFAULT_PICK_QUALITY)
-            elif self.selected_pick:
-                # If the pick itself was updated, ensure dropdown reflects new quality
-                pick_after_redo = self.pick_manager.find_nearest_pick(self.file_manager.get_current_file(), self.selected_pick.time, threshold=0.01)
-                if pick_after_redo: # Ensure pick still exists
-                    self.quality_var.set(pick_after_redo.quality)
+        self.update_status(message)
+    
+    def _refresh_selected_pick(self):
+        """Re-resolve the selected pick after undo/redo replaced or removed it"""
+        if self.selected_pick is None:
+            return
+        self.selected_pick = self.pick_manager.get_pick_by_id(self.selected_pick.id)
+        if self.selected_pick is None:
+            self.selected_pick_file = None  # The pick was removed, deselect it
+            self.quality_var.set(DEFAULT_PICK_QUALITY)
         else:
-            self.update_status(message)
+            self.quality_var.set(self.selected_pick.quality)
     
     def remove_pick(self):
         """Remove selected pick"""
         if self.selected_pick:
-            current_file_path = self.file_manager.get_current_file()
+            current_file_path = self.selected_pick_file or self.file_manager.get_current_file()
             # Create remove command
             command = RemovePickCommand(self.pick_manager, current_file_path, self.selected_pick)
             # Execute command
             success, message = self.command_history.execute_command(command)
             if success:
                 self.selected_pick = None # Deselect the pick after removal
+                self.selected_pick_file = None
                 self.update_plot()
                 self.update_status(message)
                 self.quality_var.set(DEFAULT_PICK_QUALITY) # Reset quality dropdown to default
-                self.update_file_status(current_file_path, "Processed") # Update status to Processed
+                self.update_file_status(current_file_path, FILE_STATUS['processed']) # Update status to Processed
             else:
                 messagebox.showerror("Error", message)
         else:
             self.update_status("No pick selected to remove.")
     
+    def remove_picks_by_quality(self, quality):
+        """Remove every pick of a quality as one undoable command"""
+        pick_ids = [pick.id for _, pick in self.pick_manager.get_all_picks() if pick.quality == quality]
+        if not pick_ids:
+            self.update_status(f"No {quality}-quality picks to remove.")
+            return
+        if not messagebox.askyesno("Delete Picks", f"Delete {len(pick_ids)} {quality}-quality picks?"):
+            return
+        command = BatchCommand.remove_picks(self.pick_manager, pick_ids, f"Remove {quality}-quality picks")
+        success, message = self.command_history.execute_command(command)
+        if success:
+            self.selected_pick = None
+            self.selected_pick_file = None
+            self.update_plot()
+        self.update_status(message)
+    
     def reset_view(self):
         """Reset view"""
         self.plot_widget.reset_view()
@@ -422,6 +586,25 @@ class MainWindow(tk.Tk):
         """Zoom out"""
         self.plot_widget.zoom_out()
     
+    def show_record_section(self, sort_by='station'):
+        """Show all traces of the current file's event as a record section"""
+        current_file_path = self.file_manager.get_current_file()
+        if not current_file_path:
+            messagebox.showwarning("Warning", "Please load a file first!")
+            return
+        event_id = parse_file_info(current_file_path)['event_id']
+        if event_id == 'N/A':
+            messagebox.showwarning("Warning", "The current file name has no event ID.")
+            return
+        
+        event_files = [f for f in self.file_manager.get_files() if parse_file_info(f)['event_id'] == event_id]
+        if current_file_path not in event_files:
+            event_files.append(current_file_path)
+        self.selected_pick = None
+        self.selected_pick_file = None
+        self.plot_widget.plot_record_section(event_files, f"Event {event_id}", sort_by)
+        self.update_status(f"Record section of event {event_id}: {len(event_files)} traces")
+    
     def show_settings(self):
         """Show settings dialog"""
         dialog = SettingsDialog(self)
@@ -447,50 +630,80 @@ class MainWindow(tk.Tk):
         )
     
     def on_file_select(self, event):
-        """File selection event handler"""
-        if self.is_loading_file:  # Skip if already loading a file
+        """File selection event handler
+        The file is read on a worker thread. Each selection gets a new generation;
+        older loads that have not started are cancelled and finished ones are discarded.
+        """
+        if self._rendering_file_list:  # Skip selections made while re-rendering rows
             return
             
         selection = self.file_list.selection()
         if selection:
             # Get selected file's full path from iid
             file_path_to_load = selection[0]
-            print(f"DEBUG: Attempting to load file: {file_path_to_load}")
-            try:
-                self.is_loading_file = True  # Set loading flag
-                # Load file
-                self.file_manager.load_file(file_path_to_load)
-                # Show trace
-                self.show_trace()
-                # Update status
-                self.update_status("File loaded successfully")
-
-                # Update pick quality selector based on current file's picks
-                picks_for_file = self.pick_manager.get_picks_for_file(file_path_to_load)
-                if picks_for_file:
-                    # Set quality to the last pick's quality
-                    self.quality_var.set(picks_for_file[-1].quality)
-                else:
-                    # No picks for this file, reset to default
-                    self.quality_var.set(DEFAULT_PICK_QUALITY)
+            if file_path_to_load == self.loading_file:
+                return
+            self.selected_file = file_path_to_load
+            self.load_generation += 1
+            if self.load_future is not None:
+                self.load_future.cancel()
+            
+            # Show the file's header info right away
+            self.loading_file = file_path_to_load
+            self.selected_pick = None
+            self.selected_pick_file = None
+            self.plot_widget.show_placeholder(file_path_to_load)
+            self.update_status(f"Loading {os.path.basename(file_path_to_load)}...")
+            self.load_future = self.load_executor.submit(self._load_file_task, file_path_to_load, self.load_generation)
+    
+    def _load_file_task(self, file_path, generation):
+        """Read a file (worker thread)"""
+        if generation != self.load_generation:
+            return  # A newer selection was made before this load started
+        try:
+            trace = self.file_manager.read_trace(file_path)
+            self.event_bus.call(self._on_file_loaded, file_path, generation, trace, None)
+        except Exception as e:
+            self.event_bus.call(self._on_file_loaded, file_path, generation, None, str(e))
+    
+    def _on_file_loaded(self, file_path, generation, trace, error):
+        """Show a loaded file unless a newer selection superseded it (Tk thread)"""
+        if generation != self.load_generation:
+            return
+        self.loading_file = None
+        if error is not None:
+            self.update_status(f"Failed to load {os.path.basename(file_path)}")
+            messagebox.showerror("Error", f"Failed to load file: {error}")
+            return
+        
+        self.file_manager.set_current(file_path, trace)
+        # Show trace
+        self.show_trace()
+        # Update status
+        self.update_status("File loaded successfully")
 
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
-            finally:
-                self.is_loading_file = False  # Reset loading flag
+        # Update pick quality selector based on current file's picks
+        picks_for_file = self.pick_manager.get_picks_for_file(file_path)
+        if picks_for_file:
+            # Set quality to the last pick's quality
+            self.quality_var.set(picks_for_file[-1].quality)
+        else:
+            # No picks for this file, reset to default
+            self.quality_var.set(DEFAULT_PICK_QUALITY)
     
     def on_plot_click(self, event):
         """Plot area click event handler"""
-        # Ignore click if zoom or pan is active
-        if self.toolbar.mode in ['zoom rect', 'pan/zoom']:
+        # Ignore click if zoom or pan is active, or while the placeholder of a loading file is shown
+        if self.toolbar.mode in ['zoom rect', 'pan/zoom'] or self.loading_file:
             return
         if event.inaxes:
-            # Get clicked time and current file path
+            # Get clicked time and the file of the clicked trace (row in the record section)
             time = event.xdata
-            current_file_path = self.file_manager.get_current_file()
+            current_file_path = self.plot_widget.file_at(event.ydata) if self.plot_widget.section else self.file_manager.get_current_file()
 
             if not current_file_path:
-                messagebox.showwarning("Warning", "Please load a file first!")
+                if not self.plot_widget.section:
+                    messagebox.showwarning("Warning", "Please load a file first!")
                 return
 
             # Try to find an existing pick near the click
@@ -502,6 +715,7 @@ class MainWindow(tk.Tk):
             if nearest_pick:
                 # Select the existing pick
                 self.selected_pick = nearest_pick
+                self.selected_pick_file = current_file_path
                 self.quality_var.set(self.selected_pick.quality)
                 self.update_status(f"Pick selected with quality: {self.selected_pick.quality}")
                 self.update_plot() # Redraw to highlight selected pick
@@ -522,9 +736,10 @@ class MainWindow(tk.Tk):
                 if success:
                     self.update_plot()
                     self.update_status(message)
-                    self.update_file_status(current_file_path, "Processed") # Update status to Processed
+                    self.update_file_status(current_file_path, FILE_STATUS['processed']) # Update status to Processed
                     # After adding a new pick, automatically select it
-                    self.selected_pick = pick
+                    self.selected_pick = self.pick_manager.get_pick_by_id(pick.id) or pick
+                    self.selected_pick_file = current_file_path
                     self.quality_var.set(pick.quality) # Update dropdown to match new pick's quality
                     # Verify the pick was created with the correct quality
                     picks = self.pick_manager.get_picks_for_file(current_file_path)
@@ -538,8 +753,7 @@ class MainWindow(tk.Tk):
         trace = self.file_manager.get_current_trace()
         current_file_path = self.file_manager.get_current_file()
         if trace:
-            self.plot_widget.clear_picks() # Clear old picks
-            # Pass the selected pick for highlighting
+            # Pass the selected pick for highlighting; only pick lines are redrawn for the same trace
             self.plot_widget.plot_trace(trace, current_file_path, self.selected_pick)
             # Show existing picks for the current file
             # for pick in self.pick_manager.get_picks_for_file(current_file_path):
@@ -551,23 +765,98 @@ class MainWindow(tk.Tk):
     def update_plot(self):
         """Update plot"""
         # No need to clear picks here, show_trace will handle it
+        if self.plot_widget.section is not None:
+            # Record section: only the pick marks change
+            self.plot_widget.update_picks(self.selected_pick)
+            return
         self.show_trace()
     
     def update_file_list(self):
         """Update file list"""
-        # Clear list
-        for item in self.file_list.get_children():
-            self.file_list.delete(item)
-        
-        # Add files
-        for file in self.file_manager.get_files():
-            file_name_only = os.path.basename(file)
-            self.file_list.insert(
-                "",
-                tk.END,
-                iid=file,
-                values=(file_name_only, "Unprocessed")
-            )
+        self.file_list_model.set_files(self.file_manager.get_files())
+        self.file_list_top = 0
+        self.render_file_list()
+    
+    def render_file_list(self):
+        """Show the rows of the visible window of the file list model"""
+        total = len(self.file_list_model)
+        self.file_list_top = max(0, min(self.file_list_top, total - self.file_list_rows))
+        
+        self._rendering_file_list = True
+        try:
+            self.file_list.delete(*self.file_list.get_children())
+            for path, file_name, status in self.file_list_model.rows(self.file_list_top, self.file_list_rows):
+                self.file_list.insert("", tk.END, iid=path, values=(file_name, status))
+            if self.selected_file and self.file_list.exists(self.selected_file):
+                self.file_list.selection_set(self.selected_file)
+                self.file_list.focus(self.selected_file)
+        finally:
+            self._rendering_file_list = False
+        
+        if total:
+            self.file_scrollbar.set(self.file_list_top / total, min(1.0, (self.file_list_top + self.file_list_rows) / total))
+        else:
+            self.file_scrollbar.set(0.0, 1.0)
+    
+    def on_file_list_scroll(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.file_list_top = int(float(args[1]) * len(self.file_list_model))
+            self.render_file_list()
+        elif args[0] == 'scroll':
+            self.scroll_file_list(int(args[1]), args[2])
+    
+    def scroll_file_list(self, amount, what='units'):
+        """Scroll the visible window by rows or pages"""
+        step = self.file_list_rows if what == 'pages' else 3
+        self.file_list_top += amount * step
+        self.render_file_list()
+        return "break"
+    
+    def on_file_list_resize(self, event):
+        """Fit the number of displayed rows to the widget height"""
+        rows = max(1, (event.height - FILE_LIST_ROW_HEIGHT) // FILE_LIST_ROW_HEIGHT)
+        if rows != self.file_list_rows:
+            self.file_list_rows = rows
+            self.render_file_list()
+    
+    def move_file_selection(self, offset):
+        """Move the selection through the whole model, scrolling the window as needed"""
+        if not len(self.file_list_model):
+            return "break"
+        index = self.file_list_model.index_of(self.selected_file)
+        index = 0 if index is None else max(0, min(len(self.file_list_model) - 1, index + offset))
+        self.select_file(self.file_list_model.path_at(index))
+        return "break"
+    
+    def select_file(self, file_path):
+        """Scroll a file into the visible window and select it (loads the file)"""
+        index = self.file_list_model.index_of(file_path)
+        if index is None:
+            return
+        if not self.file_list_top <= index < self.file_list_top + self.file_list_rows:
+            self.file_list_top = max(0, index - self.file_list_rows // 2)
+            self.render_file_list()
+        self.file_list.selection_set(file_path)
+        self.file_list.focus(file_path)
+        self.file_list.see(file_path)
+    
+    def apply_file_filter(self):
+        """Apply the status/station/event filters and sort order of the file list"""
+        status = self.status_filter_var.get()
+        self.file_list_model.set_filter(status="" if status == "All" else status,
+                                        station=self.station_filter_var.get(),
+                                        event_id=self.event_filter_var.get())
+        self.file_list_model.set_sort(self.sort_var.get())
+        self.file_list_top = 0
+        self.render_file_list()
+    
+    def sort_file_list(self, sort_key):
+        """Sort by a column; clicking the same column again reverses the order"""
+        reverse = self.file_list_model.sort_key == sort_key and not self.file_list_model.reverse
+        self.sort_var.set(sort_key)
+        self.file_list_model.set_sort(sort_key, reverse)
+        self.render_file_list()
     
     def update_status(self, message):
         """Update status"""
@@ -581,21 +870,15 @@ class MainWindow(tk.Tk):
         self.update_status(status)
     
     def update_file_status(self, file_path, status):
-        """Update the status of a file in the file list treeview"""
-        print(f"DEBUG: update_file_status called for file_path: {file_path}, status: {status}")
-        for item_id in self.file_list.get_children():
-            current_item_file_path = item_id # item_id itself is the iid (full file path)
-            print(f"DEBUG: Checking item_id: {item_id}, iid (file_path): {current_item_file_path}")
-            if current_item_file_path == file_path:
-                file_name_only = os.path.basename(file_path)
-                self.file_list.item(item_id, values=(file_name_only, status))
-                print(f"DEBUG: Status updated for {file_name_only} to {status}")
-                break
+        """Update the status of a file in the model and, if displayed, in the treeview"""
+        self.file_list_model.set_status(file_path, status)
+        if self.file_list.exists(file_path):
+            self.file_list.set(file_path, "Status", status)
     
     def on_quality_change(self, event):
         """Handle quality combobox selection change"""
         if self.selected_pick:
-            current_file_path = self.file_manager.get_current_file()
+            current_file_path = self.selected_pick_file or self.file_manager.get_current_file()
             new_quality = self.quality_var.get()
             
             # Create update command
@@ -7,18 +7,30 @@ from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
 from config.settings import Settings
-from config.constants import COLORS
+from config.constants import COLORS, RECORD_SECTION_ROWS, PYRAMID_MIN_SAMPLES
+from core.decimation import minmax_envelope
+from core.waveform_pyramid import PyramidCache, preprocessing_key
+from core.file_manager import parse_file_info
+from gui.record_section import RecordSection
+from gui.event_bus import EventBus
 import logging
 import os
 
 class PlotWidget(ttk.Frame):
     """Plotting widget class"""
     
-    def __init__(self, parent, file_manager, pick_manager):
+    def __init__(self, parent, file_manager, pick_manager, event_bus=None):
         """Initialize the widget"""
         super().__init__(parent)
         
+        # Results of background threads are applied through the event bus
+        if event_bus is None:
+            event_bus = EventBus(self)
+            event_bus.start()
+        self.event_bus = event_bus
+        
         # Store managers instance
         self.file_manager = file_manager
         self.pick_manager = pick_manager # Store pick manager
@@ -26,14 +38,24 @@ class PlotWidget(ttk.Frame):
         # Initialize settings
         self.settings = Settings()
         
-        # Create plot area
-        self.create_widgets()
-        
         # Initialize variables
         self.trace = None
-        self.pick_line_artists = []
+        self.file_path = None
+        self.waveform_line = None  # Created once per file, reused for pick updates
+        self._decimated_view = None  # (xlim, pixel width) the waveform line was decimated for
+        self.pyramid = None  # Min/max pyramid of long traces, once built
+        self.pyramid_cache = PyramidCache(self.settings.get('storage', 'cache_dir', ''))
+        self.section = None  # RecordSection while the record-section mode is shown
+        self.section_lines = {}  # {file path: (Line2D, decimated view)} of visible rows
+        self.section_pick_lines = None
+        self.pick_line_artists = {}  # {pick key: Line2D}, drawn with blitting
+        self.selected_pick = None
+        self._background = None  # Cached axes background without pick lines
         self.zoom_level = 1.0
         self.pan_offset = 0.0
+        
+        # Create plot area
+        self.create_widgets()
     
     def create_widgets(self):
         """Create widgets"""
@@ -42,59 +64,305 @@ class PlotWidget(ttk.Frame):
         self.axes = self.figure.add_subplot(111)
         
         # Create canvas
-        self.canvas = FigureCanvasTkAgg(self.figure, self)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas = self._create_canvas()
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('resize_event', lambda event: self._update_waveform_line())
         
-        # Set grid
+        # Set grid, title and labels
+        self._setup_axes()
+        self.canvas.draw_idle()
+    
+    def _create_canvas(self):
+        """Create the Tk canvas hosting the figure"""
+        canvas = FigureCanvasTkAgg(self.figure, self)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        return canvas
+    
+    def _setup_axes(self, title_text="Waveform Display"):
+        """Set grid, title and labels"""
         self.axes.grid(True, alpha=0.3)
-        
-        # Set title and labels
-        self.axes.set_title("Waveform Display")
+        self.axes.set_title(title_text)
         self.axes.set_xlabel("Time (s)")
         self.axes.set_ylabel("Amplitude")
     
     def plot_trace(self, trace, file_path=None, selected_pick=None):
-        """Plot waveform"""
+        """Plot waveform
+        The waveform is only re-plotted when the trace or file changes; otherwise
+        only the pick lines are updated.
+        """
+        if trace is self.trace and file_path == self.file_path and self.waveform_line is not None:
+            self.update_picks(selected_pick)
+            return
+        
+        self._close_section()
+        
         # Save waveform data
         self.trace = trace
+        self.file_path = file_path
+        self.selected_pick = selected_pick
         
         # Clear figure
         self.axes.clear()
+        self.pick_line_artists = {}
+        self._background = None
         
-        # Plot waveform
-        self.axes.plot(trace.times(), trace.data, color=COLORS['waveform'])
-        
-        # Add logging for trace data range in plot_trace
-        logging.info(f"plot_trace: Trace data min: {trace.data.min()}, max: {trace.data.max()}, shape: {trace.data.shape}")
-        
-        # Clear all current pick lines
-        self.clear_pick_line_artists()
-
-        # Draw existing picks for the current file
+        # Long traces are drawn from a cached min/max pyramid, built in the background on first open
+        self.pyramid = None
         if file_path:
-            picks_for_file = self.pick_manager.get_picks_for_file(file_path)
-            for pick in picks_for_file:
-                line_color = COLORS['selected_pick'] if pick == selected_pick else COLORS[pick.quality]
-                self._draw_pick_line(pick, line_color)
-
-        # Set grid
-        self.axes.grid(True, alpha=0.3)
+            self.pyramid = self.pyramid_cache.get(file_path, trace, preprocessing_key(self.settings),
+                                                  self._on_pyramid_built)
         
-        # Set title and labels
+        # Plot the min/max envelope of the waveform; it is recomputed whenever the
+        # x-limits change (zoom, pan, navigation toolbar) or the canvas is resized
+        self.waveform_line, = self.axes.plot([], [], color=COLORS['waveform'])
+        self._decimated_view = None
+        self._update_waveform_line(self._trace_time_range())
+        self.axes.callbacks.connect('xlim_changed', lambda axes: self._update_waveform_line())
+        logging.debug(f"plot_trace: Trace shape: {trace.data.shape}")
+        
+        # Set grid, title and labels
         title_text = "Waveform Display"
         if file_path:
             file_name = os.path.basename(file_path)
             title_text += f": {file_name}"
-        self.axes.set_title(title_text)
-        self.axes.set_xlabel("Time (s)")
-        self.axes.set_ylabel("Amplitude")
+        self._setup_axes(title_text)
         
-        # Autoscale X and Y axes tightly after plotting
-        self.axes.autoscale_view(tight=True)
+        # Show the whole trace; Y follows the envelope, which keeps the extremes
+        self.axes.set_xlim(*self._trace_time_range())
+        self.axes.relim()
+        self.axes.autoscale_view(tight=True, scalex=False)
         
-        # Update canvas
-        self.canvas.draw()
+        # Draw existing picks for the current file
+        self._sync_pick_artists()
+        
+        # Update canvas (pick lines are drawn in _on_draw)
+        self.canvas.draw_idle()
+    
+    def _trace_time_range(self):
+        """Time of the first and last sample, relative to the trace start"""
+        stats = self.trace.stats
+        return 0.0, max(stats.npts - 1, 0) / stats.sampling_rate
+    
+    def _update_waveform_line(self, xlim=None):
+        """Recompute the waveform envelope for the visible x-range"""
+        if self.trace is None or self.waveform_line is None:
+            return
+        xlim = tuple(xlim if xlim is not None else self.axes.get_xlim())
+        n_columns = max(int(self.axes.bbox.width), 1)
+        if self._decimated_view == (xlim, n_columns):
+            return
+        self._decimated_view = (xlim, n_columns)
+        
+        times, values = self._envelope(self.trace, self.pyramid, xlim, n_columns)
+        self.waveform_line.set_data(times, values)
+    
+    def _envelope(self, trace, pyramid, xlim, n_columns):
+        """Min/max envelope of a trace for an x-range, from its pyramid when available"""
+        if pyramid is not None:
+            return pyramid.envelope(min(xlim), max(xlim), n_columns)
+        return minmax_envelope(trace.data, trace.stats.sampling_rate, min(xlim), max(xlim), n_columns)
+    
+    def _on_pyramid_built(self, file_path, pyramid):
+        """Called from the pyramid worker thread; hands the pyramid to the Tk thread"""
+        self.event_bus.call(self._use_pyramid, file_path, pyramid)
+    
+    def _use_pyramid(self, file_path, pyramid):
+        """Switch the displayed trace to its pyramid"""
+        if file_path != self.file_path or self.trace is None or len(pyramid.data) != self.trace.stats.npts:
+            return
+        pyramid.data = self.trace.data
+        self.pyramid = pyramid
+        self._decimated_view = None
+        self._update_waveform_line()
+        self.canvas.draw_idle()
+    
+    def show_placeholder(self, file_path):
+        """Show the header info of a file while it is being loaded"""
+        self._close_section()
+        self.trace = None
+        self.file_path = None
+        self.waveform_line = None
+        self.pyramid = None
+        self._decimated_view = None
+        self.pick_line_artists = {}
+        self._background = None
+        self.axes.clear()
+        
+        info = parse_file_info(file_path)
+        self._setup_axes(f"Waveform Display: {info['file_name']}")
+        lines = [f"Loading {info['network']}.{info['station']}" if info['station'] else "Loading..."]
+        if info['event_id'] != 'N/A':
+            lines.append(f"Event {info['event_id']}")
+        try:
+            lines.append(f"{os.path.getsize(file_path) / 1024:.0f} KB")
+        except OSError:
+            pass
+        self.axes.text(0.5, 0.5, "\n".join(lines), transform=self.axes.transAxes,
+                       ha='center', va='center', color=COLORS['text'], alpha=0.6)
+        self.canvas.draw_idle()
+    
+    def update_picks(self, selected_pick=None):
+        """Update pick lines and the selection highlight without redrawing the waveform"""
+        self.selected_pick = selected_pick
+        if self.section is not None:
+            self._sync_section_picks()
+            self.canvas.draw_idle()
+            return
+        self._sync_pick_artists()
+        self._blit()
+    
+    def plot_record_section(self, file_paths, title="Record Section", sort_by='station'):
+        """Plot the traces of an event stacked as a record section
+        Rows are sorted by station or by first pick time and loaded in the background
+        as they scroll into view. Each row is normalized and drawn as a min/max envelope.
+        """
+        self._close_section()
+        self.trace = None
+        self.file_path = None
+        self.waveform_line = None
+        self.pyramid = None
+        self._decimated_view = None
+        self.pick_line_artists = {}
+        self._background = None
+        self.axes.clear()
+        
+        self.section = RecordSection(file_paths, self._load_section_row)
+        self.section.sort(sort_by, self.pick_manager)
+        self._section_xlim = None  # Follows the longest loaded trace until the user zooms
+        
+        self._setup_axes(f"{title} ({len(self.section)} traces)")
+        self.axes.set_ylabel("Station")
+        self.axes.set_yticks(range(len(self.section)))
+        self.axes.set_yticklabels(self.section.labels())
+        self.axes.set_xlim(0.0, 60.0)
+        self.axes.set_ylim(min(len(self.section), RECORD_SECTION_ROWS) - 0.5, -0.5)
+        self.section_pick_lines = LineCollection([], linestyles='--', alpha=0.8)
+        self.axes.add_collection(self.section_pick_lines)
+        
+        self.axes.callbacks.connect('xlim_changed', lambda axes: self._update_section())
+        self.axes.callbacks.connect('ylim_changed', lambda axes: self._update_section())
+        self._update_section()
+        self.canvas.draw_idle()
+    
+    def _load_section_row(self, file_path):
+        """Read a record-section row (runs in a loader thread)"""
+        trace = self.file_manager.read_trace(file_path)
+        pyramid = None
+        if trace.stats.npts >= PYRAMID_MIN_SAMPLES:
+            pyramid = self.pyramid_cache.load(file_path, trace, preprocessing_key(self.settings))
+        peak = float(abs(trace.data).max()) if trace.stats.npts else 0.0
+        return {'trace': trace, 'pyramid': pyramid, 'scale': 0.45 / peak if peak > 0 else 0.0}
+    
+    def _on_section_row_loaded(self, file_path, row, error):
+        """Called from a loader thread; hands the row to the Tk thread"""
+        self.event_bus.call(self._add_section_row, self.section, file_path, row, error)
+    
+    def _add_section_row(self, section, file_path, row, error):
+        """Store a loaded row and redraw the visible rows"""
+        if section is not self.section:
+            return
+        if error is not None:
+            section.fail(file_path, error)
+            return
+        visible = {section.file_paths[i] for i in section.visible_rows(self.axes.get_ylim())}
+        section.add(file_path, row, keep=visible)
+        
+        # Fit the view to the longest trace unless the user has zoomed
+        stats = row['trace'].stats
+        duration = max(stats.npts - 1, 0) / stats.sampling_rate
+        if self._section_xlim is None or tuple(self.axes.get_xlim()) == self._section_xlim:
+            end = max(duration, self._section_xlim[1] if self._section_xlim else 0.0)
+            self._section_xlim = (0.0, end)
+            self.axes.set_xlim(*self._section_xlim)
+        else:
+            self._update_section()
+        self.canvas.draw_idle()
+    
+    def _update_section(self):
+        """Load and decimate the rows inside the viewport, dropping lines of rows outside it"""
+        if self.section is None:
+            return
+        xlim = tuple(self.axes.get_xlim())
+        n_columns = max(int(self.axes.bbox.width), 1)
+        rows = self.section.visible_rows(self.axes.get_ylim())
+        self.section.request(rows, self._on_section_row_loaded)
+        
+        visible = set()
+        for i in rows:
+            file_path = self.section.file_paths[i]
+            row = self.section.get(file_path)
+            if row is None:
+                continue
+            visible.add(file_path)
+            line, view = self.section_lines.get(file_path, (None, None))
+            if line is None:
+                line, = self.axes.plot([], [], color=COLORS['waveform'], linewidth=0.8)
+            if view != (xlim, n_columns, i):
+                times, values = self._envelope(row['trace'], row['pyramid'], xlim, n_columns)
+                line.set_data(times, i + values * row['scale'])
+            self.section_lines[file_path] = (line, (xlim, n_columns, i))
+        
+        for file_path in list(self.section_lines):
+            if file_path not in visible:
+                self.section_lines.pop(file_path)[0].remove()
+        self._sync_section_picks(rows)
+    
+    def _sync_section_picks(self, rows=None):
+        """Draw pick marks of the visible rows"""
+        if self.section is None:
+            return
+        if rows is None:
+            rows = self.section.visible_rows(self.axes.get_ylim())
+        segments, colors = [], []
+        for i in rows:
+            for pick in self.pick_manager.get_picks_for_file(self.section.file_paths[i]):
+                segments.append([(pick.time, i - 0.45), (pick.time, i + 0.45)])
+                colors.append(self._pick_color(pick))
+        self.section_pick_lines.set_segments(segments)
+        self.section_pick_lines.set_color(colors)
+    
+    def file_at(self, y):
+        """File of the record-section row at y, or the current file in single-trace mode"""
+        if self.section is not None:
+            return self.section.file_at(y)
+        return self.file_path
+    
+    def _close_section(self):
+        """Leave the record-section mode"""
+        if self.section is not None:
+            self.section.close()
+        self.section = None
+        self.section_lines = {}
+        self.section_pick_lines = None
+    
+    def _pick_key(self, pick):
+        """Stable key of a pick"""
+        return pick.id if getattr(pick, 'id', None) is not None else id(pick)
+    
+    def _pick_color(self, pick):
+        """Line color of a pick"""
+        if self.selected_pick is not None and self._pick_key(pick) == self._pick_key(self.selected_pick):
+            return COLORS['selected_pick']
+        return COLORS.get(pick.quality, COLORS['pick_line'])
+    
+    def _sync_pick_artists(self):
+        """Create, recolor and remove pick lines to match the picks of the current file"""
+        picks = self.pick_manager.get_picks_for_file(self.file_path) if self.file_path else []
+        current = {}
+        for pick in picks:
+            key = self._pick_key(pick)
+            line = self.pick_line_artists.pop(key, None)
+            if line is None:
+                line = self._draw_pick_line(pick, self._pick_color(pick))
+            else:
+                line.set_xdata([pick.time, pick.time])
+                line.set_color(self._pick_color(pick))
+            current[key] = line
+        
+        # Lines of picks that no longer exist
+        for line in self.pick_line_artists.values():
+            line.remove()
+        self.pick_line_artists = current
     
     def _draw_pick_line(self, pick, color, linestyle='--', alpha=0.8):
         """Helper to draw a single pick line"""
@@ -103,16 +371,39 @@ class PlotWidget(ttk.Frame):
                 x=pick.time,
                 color=color,
                 linestyle=linestyle,
-                alpha=alpha
+                alpha=alpha,
+                animated=True  # Excluded from full redraws, drawn by blitting
             )
-            self.pick_line_artists.append(line)
+            return line
+        return None
+    
+    def _on_draw(self, event):
+        """Cache the background after a full redraw and draw pick lines on top"""
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self._draw_pick_artists()
+    
+    def _draw_pick_artists(self):
+        """Draw the animated pick lines"""
+        for line in self.pick_line_artists.values():
+            if line is not None:
+                self.axes.draw_artist(line)
+    
+    def _blit(self):
+        """Redraw only the pick lines over the cached background"""
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_pick_artists()
+        self.canvas.blit(self.axes.bbox)
     
     def clear_pick_line_artists(self):
         """Clear all pick lines from the plot"""
-        for line in self.pick_line_artists:
-            line.remove()
-        self.pick_line_artists = []
-        self.canvas.draw()
+        for line in self.pick_line_artists.values():
+            if line is not None:
+                line.remove()
+        self.pick_line_artists = {}
+        self._blit()
     
     def clear_picks(self):
         """Clear all picks from the plot.
@@ -124,8 +415,10 @@ class PlotWidget(ttk.Frame):
         """Add a single pick to the plot and redraw. If is_selected is True, it will be drawn as a selected pick.
         """
         line_color = COLORS['selected_pick'] if is_selected else COLORS[pick.quality]
-        self._draw_pick_line(pick, line_color)
-        self.canvas.draw()
+        line = self._draw_pick_line(pick, line_color)
+        if line is not None:
+            self.pick_line_artists[self._pick_key(pick)] = line
+        self._blit()
     
     def zoom_in(self):
         """Zoom in"""
@@ -159,26 +452,32 @@ class PlotWidget(ttk.Frame):
         """Update view"""
         if self.trace is not None:
             # Calculate display range
-            times = self.trace.times()
-            center = (times[0] + times[-1]) / 2 + self.pan_offset
-            width = (times[-1] - times[0]) / self.zoom_level
+            start, end = self._trace_time_range()
+            center = (start + end) / 2 + self.pan_offset
+            width = (end - start) / self.zoom_level
             
-            # Set display range for X-axis
+            # Set display range for X-axis (re-decimates the waveform)
             self.axes.set_xlim(center - width/2, center + width/2)
             
-            # Recompute data limits and autoscale both X and Y axes
+            # Recompute data limits and autoscale the Y axis to the visible envelope
             self.axes.relim()
-            self.axes.autoscale_view(tight=True)
+            self.axes.autoscale_view(tight=True, scalex=False)
             
             # Update canvas
-            self.canvas.draw()
+            self.canvas.draw_idle()
     
     def clear(self):
         """Clear figure (data and all pick lines)"""
         self.trace = None
-        self.clear_pick_line_artists()
+        self.file_path = None
+        self.waveform_line = None
+        self._decimated_view = None
+        self.pyramid = None
+        self._close_section()
+        self.pick_line_artists = {}
+        self._background = None
         self.axes.clear()
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     def reset_view(self):
         """Reset view"""
@@ -9,9 +9,10 @@ from config.settings import Settings
 class ProgressDialog(tk.Toplevel):
     """Progress Dialog"""
     
-    def __init__(self, parent, title="Processing Progress"):
+    def __init__(self, parent, title="Processing Progress", on_cancel=None):
         """Initialize the dialog"""
         super().__init__(parent)
+        self.cancel_callback = on_cancel
         
         # Set window properties
         self.title(title)
@@ -57,14 +58,17 @@ class ProgressDialog(tk.Toplevel):
         self.cancel_button.pack(pady=10)
     
     def update_progress(self, value, status=None):
-        """Update progress"""
+        """Update progress
+        Must be called on the Tk thread; the main loop redraws the dialog.
+        """
         self.progress_var.set(value)
         if status:
             self.status_var.set(status)
-        self.update()
     
     def on_cancel(self):
         """Cancel button event"""
+        if self.cancel_callback:
+            self.cancel_callback()
         self.destroy()
     
     def center_window(self):
@@ -0,0 +1,124 @@
+"""
+Record Section Rows
+"""
+
+import math
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from core.file_manager import parse_file_info
+from config.constants import RECORD_SECTION_WORKERS, RECORD_SECTION_CACHE
+
+class RecordSection:
+    """Rows of a record section, loaded lazily on a thread pool"""
+
+    def __init__(self, file_paths, load_row, n_workers=RECORD_SECTION_WORKERS, max_loaded=RECORD_SECTION_CACHE):
+        """Initialize the rows
+        load_row(file_path) runs in a worker thread and returns the row data.
+        """
+        self.file_paths = list(file_paths)
+        self.load_row = load_row
+        self.max_loaded = max_loaded
+        self.rows = OrderedDict()  # {file path: row data}, least recently used first
+        self.errors = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='section')
+
+    def __len__(self):
+        """Number of rows"""
+        return len(self.file_paths)
+
+    def sort(self, sort_by='station', pick_manager=None):
+        """Sort rows by station name or by first pick time (rows without picks last)"""
+        def station_key(path):
+            info = parse_file_info(path)
+            return (info['station'], info['network'], info['file_name'])
+
+        if sort_by == 'pick_time' and pick_manager is not None:
+            def pick_key(path):
+                picks = pick_manager.get_picks_for_file(path)
+                first = min((pick.time for pick in picks), default=math.inf)
+                return (first, station_key(path))
+            self.file_paths.sort(key=pick_key)
+        else:
+            self.file_paths.sort(key=station_key)
+
+    def labels(self):
+        """Row labels (NET.STA)"""
+        labels = []
+        for path in self.file_paths:
+            info = parse_file_info(path)
+            labels.append(f"{info['network']}.{info['station']}" if info['station'] else info['file_name'])
+        return labels
+
+    def visible_rows(self, ylim):
+        """Row indices inside the y-range (rows are centred on integer y)"""
+        low, high = min(ylim), max(ylim)
+        first = max(0, int(math.floor(low - 0.5)) + 1)
+        last = min(len(self.file_paths) - 1, int(math.ceil(high + 0.5)) - 1)
+        return range(first, last + 1)
+
+    def file_at(self, y):
+        """File of the row nearest to y, or None"""
+        if y is None:
+            return None
+        row = int(round(y))
+        if 0 <= row < len(self.file_paths):
+            return self.file_paths[row]
+        return None
+
+    def get(self, file_path):
+        """Loaded row data, or None"""
+        row = self.rows.get(file_path)
+        if row is not None:
+            self.rows.move_to_end(file_path)
+        return row
+
+    def request(self, rows, callback):
+        """Load the given rows in the background
+        Loads of rows that scrolled out of view are cancelled if they have not started.
+        callback(file_path, row_data, error) is called from a worker thread; the caller
+        then hands the result to add() or fail(), which ends the pending load.
+        """
+        wanted = {self.file_paths[i] for i in rows}
+        with self._lock:
+            for path, future in list(self._futures.items()):
+                if path not in wanted and future.cancel():
+                    del self._futures[path]
+            for path in wanted:
+                if path in self.rows or path in self._futures or path in self.errors:
+                    continue
+                self._futures[path] = self._executor.submit(self._load, path, callback)
+
+    def _load(self, file_path, callback):
+        """Load one row (runs in a worker thread)"""
+        row, error = None, None
+        try:
+            row = self.load_row(file_path)
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Failed to load record section row {file_path}: {error}")
+        callback(file_path, row, error)
+
+    def fail(self, file_path, error):
+        """Record a row that could not be loaded; it is not requested again"""
+        self.errors[file_path] = error
+        with self._lock:
+            self._futures.pop(file_path, None)
+
+    def add(self, file_path, row, keep=()):
+        """Store a loaded row, evicting least recently used rows not in keep"""
+        with self._lock:
+            self._futures.pop(file_path, None)
+        self.rows[file_path] = row
+        for path in list(self.rows):
+            if len(self.rows) <= self.max_loaded:
+                break
+            if path not in keep:
+                del self.rows[path]
+
+    def close(self):
+        """Cancel pending loads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 from gui.main_window import MainWindow
 from config.settings import Settings
+from config.constants import LOG_FORMAT
 
 def setup_logging():
     """Setup logging"""
@@ -25,7 +26,7 @@ def setup_logging():
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format=LOG_FORMAT,
         handlers=[
             logging.FileHandler(log_file, encoding='utf-8'),
             logging.StreamHandler(sys.stdout)
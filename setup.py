@@ -30,6 +30,9 @@ setup(
         "pandas>=1.3.0",
         "scipy>=1.7.0",
     ],
+    extras_require={
+        'parquet': ['pyarrow>=8.0.0'],
+    },
     entry_points={
         'console_scripts': [
             'p_wave_picker=main:main',
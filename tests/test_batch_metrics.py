@@ -0,0 +1,175 @@
+"""
+Batch Metrics Tests
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.request
+from core.batch_metrics import BatchMetrics, MetricsExporter, resident_memory
+from core.data_exporter import BatchSummary
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.batch_processor import BatchProcessor
+from benchmarks.synthetic import write_event_files
+
+def parse(text):
+    """Samples of an exposition {'name{labels}': value}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+class TestBatchMetrics(unittest.TestCase):
+    """Batch Metrics Tests"""
+
+    def setUp(self):
+        """Metrics of a batch of four files, three of them done"""
+        self.summary = BatchSummary()
+        self.metrics = BatchMetrics()
+        self.metrics.start(self.summary, 4, workers=2)
+        for i in range(3):
+            self.metrics.dequeue()
+            self.summary.update({'file': f'f{i}', 'success': i != 2, 'picks': [{'time': 1.0}] if i != 2 else [],
+                                 'error': None if i != 2 else 'FileNotFoundError: f2',
+                                 'stage_times': {'read': (0.1, 0.05)}})
+
+    def test_render(self):
+        """Test counts, errors, stages and caches are exposed"""
+        self.metrics.add_cache('index', lambda: (3, 1))
+        self.metrics.add_cache('broken', lambda: 1 / 0)
+        with self.metrics.working():
+            text = self.metrics.render()
+        samples = parse(text)
+        self.assertIn('# TYPE p_wave_batch_files_processed_total counter', text)
+        self.assertEqual(samples['p_wave_batch_running'], 1)
+        self.assertEqual(samples['p_wave_batch_files_processed_total'], 3)
+        self.assertEqual(samples['p_wave_batch_files_failed_total'], 1)
+        self.assertEqual(samples['p_wave_batch_picks_total'], 2)
+        self.assertEqual(samples['p_wave_batch_queue_depth'], 1)
+        self.assertEqual(samples['p_wave_batch_workers_busy'], 1)
+        self.assertEqual(samples['p_wave_batch_errors_total{type="FileNotFoundError"}'], 1)
+        self.assertAlmostEqual(samples['p_wave_batch_stage_seconds_total{stage="read"}'], 0.3)
+        self.assertEqual(samples['p_wave_batch_cache_hit_ratio{cache="index"}'], 0.75)
+        self.assertNotIn('p_wave_batch_cache_hits_total{cache="broken"}', samples)
+        if resident_memory() is not None:
+            self.assertGreater(samples['process_resident_memory_bytes'], 0)
+
+    def test_finish(self):
+        """Test a finished batch reports its overall rates and an empty queue"""
+        with self.metrics.working():
+            pass
+        self.metrics.finish()
+        values = self.metrics.snapshot()
+        self.assertFalse(values['running'])
+        self.assertEqual(values['queue_depth'], 0)
+        self.assertEqual(values['workers_busy'], 0)
+        self.assertAlmostEqual(values['files_per_second'], 3 / values['elapsed_seconds'])
+        self.assertLessEqual(values['worker_utilisation'], 1.0)
+        self.assertEqual(values, dict(self.metrics.snapshot(), resident_memory_bytes=values['resident_memory_bytes']))
+
+class TestMetricsExporter(unittest.TestCase):
+    """Metrics Exporter Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.metrics = BatchMetrics()
+        self.metrics.start(BatchSummary(), 10)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_file(self):
+        """Test the file is written while running and rewritten when stopped"""
+        path = os.path.join(self.temp_dir, 'batch.prom')
+        exporter = MetricsExporter(self.metrics, file_path=path, interval=0.01)
+        exporter.start()
+        self.metrics.dequeue(4)
+        self.metrics.finish()
+        exporter.stop()
+        with open(path, 'r', encoding='utf-8') as f:
+            samples = parse(f.read())
+        self.assertEqual(samples['p_wave_batch_running'], 0)
+        self.assertEqual(samples['p_wave_batch_files'], 10)
+        self.assertEqual(os.listdir(self.temp_dir), ['batch.prom'])
+
+    def test_http(self):
+        """Test the endpoint serves /metrics on a free local port"""
+        exporter = MetricsExporter(self.metrics, port=0)
+        exporter.start()
+        try:
+            self.assertNotEqual(exporter.port, 0)
+            with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/metrics', timeout=10) as response:
+                self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+                samples = parse(response.read().decode('utf-8'))
+            self.assertEqual(samples['p_wave_batch_queue_depth'], 10)
+        finally:
+            exporter.stop()
+
+    def test_from_settings(self):
+        """Test no exporter is made unless a file or a port is set"""
+        processor = BatchProcessor(FileManager(), None)
+        processor.settings.settings['metrics'] = {'file': '', 'port': 0}
+        self.assertIsNone(MetricsExporter.from_settings(self.metrics, processor.settings))
+        processor.settings.settings['metrics'] = {'file': 'batch.prom', 'port': 0}
+        exporter = MetricsExporter.from_settings(self.metrics, processor.settings)
+        self.assertEqual(exporter.file_path, 'batch.prom')
+        self.assertIsNone(exporter.port)
+
+class TestBatchProcessorMetrics(unittest.TestCase):
+    """Metrics Published by Batch Runs"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)  # The progress file is written to the working directory
+        self.files, _ = write_event_files(self.temp_dir, 2, 2, 3000)
+        self.processor = BatchProcessor(FileManager(), PickManager(store_path=''))
+        self.metrics_path = os.path.join(self.temp_dir, 'batch.prom')
+        self.processor.settings.settings['metrics'] = {'file': self.metrics_path, 'port': 0, 'interval': 0.05}
+        self.processor.settings.settings.setdefault('travel_time', {})['enabled'] = False
+        self.processor.file_manager.settings.settings['process']['preprocess'] = False
+
+    def tearDown(self):
+        """Cleanup after test"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def run_batch(self, group_by_event):
+        """Run a batch and read the final metrics file"""
+        done = threading.Event()
+        self.processor.settings.settings['process']['preprocess'] = False
+        success, _ = self.processor.process_batch(self.files, mode='auto', done_callback=lambda summary: done.set(),
+                                                  group_by_event=group_by_event)
+        self.assertTrue(success)
+        self.assertTrue(done.wait(60))
+        with open(self.metrics_path, 'r', encoding='utf-8') as f:
+            return parse(f.read())
+
+    def test_file_batch(self):
+        """Test a file-by-file batch ends with every file counted"""
+        samples = self.run_batch(False)
+        self.assertEqual(samples['p_wave_batch_running'], 0)
+        self.assertEqual(samples['p_wave_batch_files_processed_total'], 4)
+        self.assertEqual(samples['p_wave_batch_picks_total'], 4)
+        self.assertEqual(samples['p_wave_batch_queue_depth'], 0)
+        self.assertGreater(samples['p_wave_batch_worker_busy_seconds_total'], 0)
+        self.assertIn('p_wave_batch_cache_hits_total{cache="mseed_index"}', samples)
+
+    def test_event_batch(self):
+        """Test an event-grouped batch reports its workers"""
+        self.processor.settings.settings['process']['batch_workers'] = 2
+        samples = self.run_batch(True)
+        self.assertEqual(samples['p_wave_batch_files_processed_total'], 4)
+        self.assertEqual(samples['p_wave_batch_workers'], 2)
+        self.assertEqual(samples['p_wave_batch_workers_busy'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1 +1,120 @@
- 
\ No newline at end of file
+"""
+Batch Processor Tests
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from obspy import UTCDateTime
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.batch_processor import BatchProcessor
+from benchmarks.synthetic import SYNTHETIC_STARTTIME, make_trace, write_event_files
+
+class TestBatchProcessor(unittest.TestCase):
+    """Batch Processor Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)  # The progress file is written to the working directory
+        self.files, self.onsets = write_event_files(self.temp_dir, 2, 3, 6000)
+        self.pick_manager = PickManager(store_path='')
+        self.processor = BatchProcessor(FileManager(), self.pick_manager)
+        self.processor.settings.settings['process']['group_by_event'] = False
+        self.processor.settings.settings.setdefault('travel_time', {})['enabled'] = False
+        self.processor.file_manager.settings.settings['process']['preprocess'] = False
+
+    def tearDown(self):
+        """Cleanup after test"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def run_batch(self, files, mode='auto'):
+        """Run a batch and wait for its summary"""
+        done = threading.Event()
+        summaries = []
+        success, message = self.processor.process_batch(
+            files, mode=mode, done_callback=lambda summary: (summaries.append(summary), done.set()))
+        self.assertTrue(success, message)
+        self.assertTrue(done.wait(60))
+        return summaries[0]
+
+    def test_auto_pick(self):
+        """Test the STA/LTA picker finds the synthetic onset"""
+        trace, onset = make_trace(20000, onset=123.45)
+        trace.data = trace.data.astype(np.float64)
+        pick = self.processor._auto_pick(trace)
+        self.assertIsInstance(pick, UTCDateTime)
+        self.assertAlmostEqual(pick - SYNTHETIC_STARTTIME, onset, delta=0.2)
+
+        trace.data[:] = 1.0
+        self.assertIsNone(self.processor._auto_pick(trace))
+
+    def test_auto_batch(self):
+        """Test every file is picked near its onset and counted in the summary"""
+        missing = os.path.join(self.temp_dir, 'XX.MISS.evid.1.mseed')
+        summary = self.run_batch(self.files + [missing])
+        self.assertEqual(summary.total_files, 7)
+        self.assertEqual(summary.successful_files, 6)
+        self.assertEqual(summary.total_picks, 6)
+        for path, onset in zip(self.files, self.onsets):
+            picks = self.pick_manager.get_picks_for_file(path)
+            self.assertEqual(len(picks), 1)
+            self.assertIsInstance(picks[0].time, float)  # Seconds from the record start, like manual picks
+            self.assertAlmostEqual(picks[0].time, onset, delta=0.5)
+        self.assertFalse(self.processor.processing)
+
+    def test_costly_files_first(self):
+        """Test file-by-file batches take the file with the largest footprint first"""
+        large = os.path.join(self.temp_dir, 'XX.BIG.evid.9.mseed')
+        make_trace(60000)[0].write(large, format='MSEED')
+        done = threading.Event()
+        order = []
+        self.processor.process_batch(self.files + [large], mode='auto',
+                                     file_callback=lambda path, ok: order.append(path),
+                                     done_callback=lambda summary: done.set())
+        self.assertTrue(done.wait(60))
+        self.assertEqual(order[0], large)
+        self.assertEqual(sorted(order[1:]), sorted(self.files))
+
+    def test_stage_times(self):
+        """Test every stage of a picked file is timed, and nothing when timing is disabled"""
+        self.processor.file_manager.settings.settings['process']['preprocess'] = True
+        summary = self.run_batch(self.files[:2])
+        stage_times = summary.to_dict()['stage_times']
+        self.assertEqual(list(stage_times), ['read', 'preprocess', 'pick', 'quality', 'persist'])
+        self.assertEqual(stage_times['read']['count'], 2)
+        self.assertIn(self.pick_manager.get_picks_for_file(self.files[0])[0].quality, ('A', 'B', 'C'))
+
+        self.processor.settings.settings['process']['stage_timing'] = False
+        self.assertEqual(self.run_batch(self.files[:2]).to_dict()['stage_times'], {})
+
+    def test_manual_batch(self):
+        """Test manual mode loads files without picking"""
+        summary = self.run_batch(self.files, mode='manual')
+        self.assertEqual(summary.successful_files, len(self.files))
+        self.assertFalse(self.pick_manager.has_picks())
+
+    def test_rejects_concurrent_batch(self):
+        """Test a second batch is refused while one is running"""
+        self.processor.processing = True
+        success, _ = self.processor.process_batch(self.files)
+        self.assertFalse(success)
+
+    def test_cancel(self):
+        """Test cancelling from the file callback stops the batch"""
+        done = threading.Event()
+        summaries = []
+        self.processor.process_batch(
+            self.files, mode='auto', file_callback=lambda path, ok: self.processor.cancel_processing(),
+            done_callback=lambda summary: (summaries.append(summary), done.set()))
+        self.assertTrue(done.wait(60))
+        self.assertEqual(summaries[0].total_files, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Batch Scheduler Tests
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from core.batch_scheduler import FileFootprint, MemoryBudget, estimate_footprint, schedule_events
+from core.event_batch import EventGroup
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.batch_processor import BatchProcessor
+from core.stage_timer import StageTimer
+from benchmarks.synthetic import SYNTHETIC_STARTTIME, make_trace, write_event_files
+
+class TestFootprint(unittest.TestCase):
+    """Memory Footprint Estimate Tests"""
+
+    def setUp(self):
+        """Write one long record"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_manager = FileManager()
+        self.path = os.path.join(self.temp_dir, 'XX.SYN.evid.1.mseed')
+        make_trace(200000)[0].write(self.path, format='MSEED')
+
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_estimate(self):
+        """Test MiniSEED files are estimated from their samples and windows"""
+        footprint = estimate_footprint(self.file_manager, self.path, min_size=0)
+        self.assertEqual(footprint.npts, 200000)
+        self.assertEqual(footprint.sampling_rate, 100.0)
+        self.assertEqual(footprint.nbytes, 200000 * footprint.bytes_per_sample)
+        self.assertTrue(footprint.chunkable)
+
+        window = (SYNTHETIC_STARTTIME + 100, SYNTHETIC_STARTTIME + 200)
+        self.assertEqual(estimate_footprint(self.file_manager, self.path, window, min_size=0).npts, 10000)
+
+    def test_fallbacks(self):
+        """Test small files are estimated from their size and missing files cost nothing"""
+        footprint = estimate_footprint(self.file_manager, self.path)
+        self.assertEqual(footprint.nbytes, os.path.getsize(self.path) * 16)
+        self.assertFalse(footprint.chunkable)
+        self.assertEqual(estimate_footprint(self.file_manager, self.path + '.missing').nbytes, 0)
+
+class TestMemoryBudget(unittest.TestCase):
+    """Memory Budget Tests"""
+
+    def test_admission(self):
+        """Test work waits for the budget and oversized work runs alone"""
+        budget = MemoryBudget(100, baseline=0)
+        admitted = threading.Event()
+
+        def second():
+            with budget.admit(50):
+                admitted.set()
+
+        with budget.admit(80):
+            thread = threading.Thread(target=second)
+            thread.start()
+            time.sleep(0.05)
+            self.assertFalse(admitted.is_set())
+        self.assertTrue(admitted.wait(10))
+        thread.join()
+
+        with budget.admit(1000):
+            self.assertEqual(budget.active, 1)
+        self.assertEqual((budget.active, budget.in_use, budget.in_flight), (0, 0.0, 0))
+        self.assertEqual(budget.peak_in_use, 1000)
+
+    def test_observe(self):
+        """Test the scale moves towards the measured ratio within its bounds"""
+        budget = MemoryBudget(1000, baseline=100, min_observed=10)
+        budget.observe(rss=1000)
+        self.assertEqual(budget.scale, 1.0)  # Nothing in flight
+        with budget.admit(100):
+            budget.observe(rss=400)
+            self.assertAlmostEqual(budget.scale, 1.6)
+            budget.observe(rss=10**9)
+            self.assertAlmostEqual(budget.scale, 1.6 + 0.3 * 2.4)
+        self.assertAlmostEqual(budget.cost(100), 100 * budget.scale)
+
+    def test_oversized(self):
+        """Test only indexed files above the budget share are chunked"""
+        budget = MemoryBudget(10 * 1024 * 1024, baseline=0)
+        large = FileFootprint('a.mseed', 8 * 1024 * 1024, 200000, 100.0, 44, True)
+        self.assertTrue(budget.oversized(large))
+        self.assertFalse(budget.oversized(FileFootprint('a.sac', 8 * 1024 * 1024)))
+        self.assertLess(budget.chunk_bytes(large), large.nbytes)
+        self.assertGreaterEqual(budget.chunk_seconds(large), 40.0)
+
+class TestScheduleEvents(unittest.TestCase):
+    """Longest-First Scheduling Tests"""
+
+    def setUp(self):
+        """Three events listed with the costliest one in the middle"""
+        self.groups = [EventGroup('1', ['a1', 'a2', 'a3']), EventGroup('2', ['b1']), EventGroup('3', ['c1'])]
+        self.groups[0].windows = {'a2': ('start', 'end')}
+        self.costs = {'a1': 1.0, 'a2': 1.0, 'a3': 1.0, 'b1': 10.0, 'c1': 2.0}
+
+    def test_order(self):
+        """Test costly events are split and the work runs most costly first"""
+        tasks = schedule_events(self.groups, self.costs, workers=2)
+        self.assertEqual([task.files for task in tasks], [['b1'], ['a1', 'a3'], ['c1'], ['a2']])
+        self.assertEqual(tasks[1].event_id, '1')
+        self.assertIs(tasks[1].plan, self.groups[0].plan)
+        self.assertEqual(tasks[3].windows, {'a2': ('start', 'end')})
+
+    def test_no_split(self):
+        """Test events cheaper than the task target are kept whole"""
+        tasks = schedule_events(self.groups, self.costs, workers=1, tasks_per_worker=1)
+        self.assertEqual([task.event_id for task in tasks], ['2', '1', '3'])
+        self.assertIs(tasks[1], self.groups[0])
+
+class TestChunkedPicking(unittest.TestCase):
+    """Chunked Picking of Oversized Files"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)  # The progress file is written to the working directory
+        self.pick_manager = PickManager(store_path='')
+        self.processor = BatchProcessor(FileManager(), self.pick_manager)
+        self.processor.settings.settings.setdefault('travel_time', {})['enabled'] = False
+        self.processor.file_manager.settings.settings['process']['preprocess'] = False
+
+    def tearDown(self):
+        """Cleanup after test"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_whole_record(self):
+        """Test the chunked trigger equals the trigger on the whole record, also just after a chunk edge"""
+        for onset in (1234.56, 601.0):
+            trace, _ = make_trace(200000, onset=onset)
+            path = os.path.join(self.temp_dir, f'XX.SYN.evid.{int(onset)}.mseed')
+            trace.write(path, format='MSEED')
+            expected = self.processor._auto_pick(self.processor.file_manager.read_trace(path, preprocess=False))
+            pick_time, quality = self.processor._pick_chunked(path, 100.0, StageTimer())
+            self.assertEqual(pick_time, expected)
+            self.assertIn(quality, ('A', 'B', 'C'))
+
+    def run_batch(self, files, group_by_event):
+        """Run an auto batch under an 8 MB budget"""
+        self.processor.settings.settings['process']['memory_budget_mb'] = 8
+        self.processor.settings.settings['process']['preprocess'] = False
+        done = threading.Event()
+        summaries = []
+        success, _ = self.processor.process_batch(
+            files, mode='auto', done_callback=lambda summary: (summaries.append(summary), done.set()),
+            group_by_event=group_by_event)
+        self.assertTrue(success)
+        self.assertTrue(done.wait(120))
+        return summaries[0]
+
+    def test_oversized_batch(self):
+        """Test files over the budget are picked in chunks in both batch modes"""
+        files, onsets = write_event_files(self.temp_dir, 1, 2, 1000000)
+        self.assertGreater(os.path.getsize(files[0]), 1024 * 1024)
+
+        summary = self.run_batch(files, False)
+        self.assertEqual(summary.total_picks, 2)
+        for path, onset in zip(files, onsets):
+            self.assertAlmostEqual(self.pick_manager.get_picks_for_file(path)[0].time, onset, delta=0.5)
+        self.assertLessEqual(self.processor.memory_budget.peak_in_use, 8 * 1024 * 1024)
+
+        self.pick_manager = self.processor.pick_manager = PickManager(store_path='')
+        summary = self.run_batch(files, True)
+        self.assertEqual(summary.total_picks, 2)
+        for path, onset in zip(files, onsets):
+            self.assertAlmostEqual(self.pick_manager.get_picks_for_file(path)[0].time, onset, delta=0.5)
+
+if __name__ == '__main__':
+    unittest.main()
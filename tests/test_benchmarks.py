@@ -0,0 +1,72 @@
+"""
+Benchmark Suite Tests
+"""
+
+import os
+import tempfile
+import unittest
+from benchmarks.suite import BENCHMARKS, compare, load_results, run_benchmarks, save_results
+from benchmarks.synthetic import make_trace
+from benchmarks.gui import OPERATIONS, run_gui_benchmarks
+
+def results(**medians):
+    """Results with the given median times and a pick error of 0.1 s"""
+    return {'results': {key: {'median': median, 'pick_error': 0.1} for key, median in medians.items()}}
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Benchmark Suite Tests"""
+
+    def test_synthetic_onset(self):
+        """Test the onset is on a sample and the signal starts there"""
+        trace, onset = make_trace(1000, onset=4.567)
+        self.assertAlmostEqual(onset, 4.57)
+        start = int(onset * trace.stats.sampling_rate)
+        self.assertGreater(abs(trace.data[start:start + 100]).max(), 5 * abs(trace.data[:start]).max())
+
+    def test_registry(self):
+        """Test every benchmark has sizes and slow loops are capped"""
+        names = {bench.name: bench for bench in BENCHMARKS}
+        for name in ('auto_picker.pick_sta_lta', 'file_manager.load_file', 'pick_manager.add_picks',
+                     'data_exporter.export_picks_csv', 'batch_processor.process_batch'):
+            self.assertIn(name, names)
+        self.assertEqual(max(names['auto_picker.pick_sta_lta'].sizes), 10**7)
+        self.assertEqual(max(names['auto_picker.pick_ar_aic'].sizes), 10**4)
+
+    def test_run_and_save(self):
+        """Test a small run records times and pick errors"""
+        output = run_benchmarks('pick_sta_lta', max_size=10**4, repeat=2)
+        entry = output['results']['auto_picker.pick_sta_lta[10000]']
+        self.assertEqual(entry['runs'], 2)
+        self.assertLessEqual(entry['min'], entry['median'])
+        self.assertLess(entry['pick_error'], 0.5)
+        self.assertNotIn('auto_picker.pick_sta_lta[100000]', output['results'])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'results.json')
+            save_results(output, path)
+            self.assertEqual(load_results(path)['results'].keys(), output['results'].keys())
+
+    def test_compare(self):
+        """Test slowdowns beyond the tolerance and worse picks are flagged"""
+        baseline = results(a=0.010, b=0.010, c=0.0001, d=0.010)
+        current = results(a=0.011, b=0.020, c=0.0009, e=1.0)
+        current['results']['d'] = {'median': 0.010, 'pick_error': None}
+        regressions = compare(current, baseline, tolerance=0.25)
+        self.assertEqual([(r['key'], r['kind']) for r in regressions], [('b', 'time'), ('d', 'pick_error')])
+        self.assertAlmostEqual(regressions[0]['ratio'], 2.0)
+        self.assertEqual(compare(baseline, baseline), [])
+
+class TestGuiBenchmarks(unittest.TestCase):
+    """Headless PlotWidget Benchmark Tests"""
+
+    def test_frame_times(self):
+        """Test every operation is timed without a display"""
+        output = run_gui_benchmarks(sizes=[10**4], pick_counts=[1, 20], frames=3)
+        self.assertEqual(len(output['results']), 2 * len(OPERATIONS))
+        entry = output['results']['plot_widget.select_pick[10000x20]']
+        self.assertEqual(entry['frames'], 3)
+        self.assertLessEqual(entry['p50'], entry['p95'])
+        self.assertEqual(entry['median'], entry['p50'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,8 +8,12 @@ from core.command_history import (
     AddPickCommand,
     RemovePickCommand,
     UpdatePickCommand,
+    BatchCommand,
     CommandHistory
 )
+from core.pick_manager import PickManager
+
+FILE_PATH = '/data/XX.STA.evid.1.mseed'
 
 class TestCommand(unittest.TestCase):
     """Base Command Class Tests"""
@@ -37,165 +41,147 @@ class TestCommand(unittest.TestCase):
         command.undo()
         self.assertFalse(command.executed)
 
-class TestAddPickCommand(unittest.TestCase):
-    """Add Pick Command Tests"""
+class TestPickCommands(unittest.TestCase):
+    """Add/Remove/Update Pick Command Tests"""
     
     def setUp(self):
         """Setup before test"""
-        self.pick_manager = type('PickManager', (), {
-            'add_pick': lambda file, time, quality: None,
-            'remove_pick': lambda file, time: None
-        })()
+        self.pick_manager = PickManager(store_path='')
+        self.history = CommandHistory()
     
     def test_add_pick_command(self):
-        """Test add pick command"""
-        # Create command
-        command = AddPickCommand(
-            self.pick_manager,
-            'test.mseed',
-            0.5,
-            'A'
-        )
-        
-        # Execute command
-        command.execute()
-        
-        # Undo command
-        command.undo()
-
-class TestRemovePickCommand(unittest.TestCase):
-    """Remove Pick Command Tests"""
-    
-    def setUp(self):
-        """Setup before test"""
-        self.pick_manager = type('PickManager', (), {
-            'add_pick': lambda file, time, quality: None,
-            'remove_pick': lambda file, time: None
-        })()
+        """Test adding a pick with undo/redo"""
+        pick = self.pick_manager.create_pick(1.5, 'B')
+        success, _ = self.history.execute_command(AddPickCommand(self.pick_manager, FILE_PATH, pick))
+        self.assertTrue(success)
+        self.assertEqual(self.pick_manager.get_pick_by_id(pick.id).quality, 'B')
+        
+        self.assertTrue(self.history.undo()[0])
+        self.assertIsNone(self.pick_manager.get_pick_by_id(pick.id))
+        self.assertTrue(self.history.redo()[0])
+        self.assertEqual(self.pick_manager.get_picks_for_file(FILE_PATH), [pick])
     
     def test_remove_pick_command(self):
-        """Test remove pick command"""
-        # Create command
-        command = RemovePickCommand(
-            self.pick_manager,
-            'test.mseed',
-            0.5,
-            'A'
-        )
-        
-        # Execute command
-        command.execute()
+        """Test removing a pick restores its latest quality on undo"""
+        pick = self.pick_manager.create_pick(2.0)
+        self.pick_manager.add_pick(FILE_PATH, pick)
+        self.pick_manager.update_qualities({pick.id: 'C'})
         
-        # Undo command
-        command.undo()
+        self.history.execute_command(RemovePickCommand(self.pick_manager, FILE_PATH, pick))
+        self.assertFalse(self.pick_manager.has_picks())
+        self.history.undo()
+        self.assertEqual(self.pick_manager.get_pick_by_id(pick.id).quality, 'C')
+    
+    def test_update_pick_command(self):
+        """Test changing pick quality with undo/redo"""
+        pick = self.pick_manager.create_pick(3.0, 'A')
+        self.pick_manager.add_pick(FILE_PATH, pick)
+        self.history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, pick, 'B'))
+        self.assertEqual(self.pick_manager.get_pick_by_id(pick.id).quality, 'B')
+        self.history.undo()
+        self.assertEqual(self.pick_manager.get_pick_by_id(pick.id).quality, 'A')
+        self.history.redo()
+        self.assertEqual(self.pick_manager.get_pick_by_id(pick.id).quality, 'B')
 
-class TestUpdatePickCommand(unittest.TestCase):
-    """Update Pick Command Tests"""
+class TestCommandHistory(unittest.TestCase):
+    """Command History Tests"""
     
     def setUp(self):
         """Setup before test"""
-        self.pick_manager = type('PickManager', (), {
-            'update_pick': lambda file, old_time, new_time, quality: None
-        })()
+        self.pick_manager = PickManager(store_path='')
+        self.pick = self.pick_manager.create_pick(1.0, 'A')
+        self.pick_manager.add_pick(FILE_PATH, self.pick)
     
-    def test_update_pick_command(self):
-        """Test update pick command"""
-        # Create command
-        command = UpdatePickCommand(
-            self.pick_manager,
-            'test.mseed',
-            0.5,
-            0.6,
-            'A'
-        )
-        
-        # Execute command
-        command.execute()
-        
-        # Undo command
-        command.undo()
+    def test_merge_quality_changes(self):
+        """Test consecutive quality changes of one pick are undone in one step"""
+        history = CommandHistory()
+        for quality in ('B', 'C', 'B'):
+            history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, self.pick, quality))
+        self.assertEqual(len(history.undo_stack), 1)
+        history.undo()
+        self.assertEqual(self.pick_manager.get_pick_by_id(self.pick.id).quality, 'A')
+        self.assertFalse(history.can_undo())
+    
+    def test_merge_back_to_start_is_dropped(self):
+        """Test quality changes ending on the original quality leave no command"""
+        history = CommandHistory()
+        history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, self.pick, 'C'))
+        history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, self.pick, 'A'))
+        self.assertFalse(history.can_undo())
+        history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, self.pick, 'A'))
+        self.assertFalse(history.can_undo())
+    
+    def test_bounded_depth(self):
+        """Test only the newest max_depth commands are kept"""
+        history = CommandHistory(max_depth=10)
+        for i in range(25):
+            pick = self.pick_manager.create_pick(10.0 + i)
+            history.execute_command(AddPickCommand(self.pick_manager, FILE_PATH, pick))
+        self.assertEqual(len(history.undo_stack), 10)
+        while history.can_undo():
+            history.undo()
+        self.assertEqual(len(self.pick_manager.get_picks_for_file(FILE_PATH)), 16)
+        self.assertEqual(len(history.redo_stack), 10)
+    
+    def test_new_command_clears_redo(self):
+        """Test executing a command after undo clears the redo stack"""
+        history = CommandHistory()
+        history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, self.pick, 'B'))
+        history.undo()
+        history.execute_command(RemovePickCommand(self.pick_manager, FILE_PATH, self.pick))
+        self.assertFalse(history.can_redo())
+        self.assertEqual(history.redo(), (False, "No commands to redo"))
 
-class TestCommandHistory(unittest.TestCase):
-    """Command History Tests"""
+class TestBatchCommand(unittest.TestCase):
+    """Batch Command Tests"""
     
     def setUp(self):
         """Setup before test"""
+        self.pick_manager = PickManager(store_path='')
         self.history = CommandHistory()
+        picks = {}
+        for i in range(50000):
+            quality = 'ABC'[i % 3]
+            picks.setdefault(f'/data/XX.S{i % 100:03d}.evid.{i // 100}.mseed', []).append(
+                self.pick_manager.create_pick(i * 0.01, quality))
+        self.history.execute_command(BatchCommand.add_picks(self.pick_manager, picks))
     
-    def test_execute_command(self):
-        """Test execute command"""
-        # Create test command
-        class TestCommand(Command):
-            def __init__(self):
-                self.executed = False
-                self.undone = False
-            
-            def execute(self):
-                self.executed = True
-            
-            def undo(self):
-                self.undone = True
-        
-        # Execute command
-        command = TestCommand()
-        self.history.execute(command)
-        
-        # Verify result
-        self.assertTrue(command.executed)
-        self.assertFalse(command.undone)
+    def test_add_picks(self):
+        """Test a batch add is one undoable command"""
+        self.assertEqual(len(self.pick_manager.get_all_picks()), 50000)
+        self.history.undo()
+        self.assertFalse(self.pick_manager.has_picks())
+        self.history.redo()
+        self.assertEqual(len(self.pick_manager.get_all_picks()), 50000)
     
-    def test_undo_command(self):
-        """Test undo command"""
-        # Create test command
-        class TestCommand(Command):
-            def __init__(self):
-                self.executed = False
-                self.undone = False
-            
-            def execute(self):
-                self.executed = True
-            
-            def undo(self):
-                self.undone = True
-        
-        # Execute command
-        command = TestCommand()
-        self.history.execute(command)
+    def test_remove_by_quality(self):
+        """Test removing every C-quality pick and undoing it"""
+        ids = [pick.id for _, pick in self.pick_manager.get_all_picks() if pick.quality == 'C']
+        success, _ = self.history.execute_command(BatchCommand.remove_picks(self.pick_manager, ids))
+        self.assertTrue(success)
+        remaining = self.pick_manager.get_all_picks()
+        self.assertEqual(len(remaining), 50000 - len(ids))
+        self.assertTrue(all(pick.quality != 'C' for _, pick in remaining))
         
-        # Undo command
         self.history.undo()
-        
-        # Verify result
-        self.assertTrue(command.executed)
-        self.assertTrue(command.undone)
+        self.assertEqual(len(self.pick_manager.get_all_picks()), 50000)
+        self.assertEqual(self.pick_manager.get_pick_by_id(ids[0]).quality, 'C')
     
-    def test_redo_command(self):
-        """Test redo command"""
-        # Create test command
-        class TestCommand(Command):
-            def __init__(self):
-                self.executed = False
-                self.undone = False
-            
-            def execute(self):
-                self.executed = True
-            
-            def undo(self):
-                self.undone = True
-        
-        # Execute command
-        command = TestCommand()
-        self.history.execute(command)
-        
-        # Undo command
+    def test_set_quality(self):
+        """Test setting quality in bulk skips unchanged picks"""
+        before = {pick.id: pick.quality for _, pick in self.pick_manager.get_all_picks()}
+        ids = list(before)
+        command = BatchCommand.set_quality(self.pick_manager, ids, 'A')
+        self.assertEqual(len(command), len([i for i in range(50000) if i % 3]))
+        self.history.execute_command(command)
+        self.assertTrue(all(pick.quality == 'A' for _, pick in self.pick_manager.get_all_picks()))
         self.history.undo()
-        
-        # Redo command
-        self.history.redo()
-        
-        # Verify result
-        self.assertTrue(command.executed)
-        self.assertTrue(command.undone)
+        self.assertEqual({pick.id: pick.quality for _, pick in self.pick_manager.get_all_picks()}, before)
+    
+    def test_empty_batch_not_recorded(self):
+        """Test an empty batch leaves no undo entry"""
+        self.history.execute_command(BatchCommand.remove_picks(self.pick_manager, []))
+        self.assertEqual(len(self.history.undo_stack), 1)
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Data Exporter Tests
+"""
+
+import os
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+from obspy import UTCDateTime
+from core.data_exporter import DataExporter, BatchSummary, pa
+
+def make_picks(count):
+    """Create test picking results"""
+    return [
+        {
+            'file': f'XX.S{i % 3}.evid.1.mseed',
+            'network': 'XX',
+            'station': f'S{i % 3}',
+            'channel': 'HHZ',
+            'pick_time': UTCDateTime(2023, 1, 1) + i,
+            'quality': i % 3,
+            'snr': 10.0 + i,
+            'method': 'sta_lta',
+            'param_hash': 'abc123'
+        }
+        for i in range(count)
+    ]
+
+class TestStreamingExport(unittest.TestCase):
+    """Streaming Export Tests"""
+    
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.exporter = DataExporter()
+    
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_csv_from_generator(self):
+        """Test CSV export consumes a generator without touching its items"""
+        picks = make_picks(5)
+        output_file = os.path.join(self.temp_dir, 'picks.csv')
+        
+        self.assertTrue(self.exporter.stream_picks((p for p in picks), output_file))
+        self.assertEqual(picks[1]['quality'], 1)
+        
+        with open(output_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1]['quality'], 'Good')
+        self.assertEqual(rows[0]['pick_time'], '2023-01-01T00:00:00.000000Z')
+    
+    def test_gzip_ndjson(self):
+        """Test gzip-compressed newline-delimited JSON"""
+        output_file = os.path.join(self.temp_dir, 'picks.ndjson.gz')
+        
+        self.assertTrue(self.exporter.stream_picks(iter(make_picks(3)), output_file, format='ndjson'))
+        with gzip.open(output_file, 'rt', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([r['station'] for r in rows], ['S0', 'S1', 'S2'])
+    
+    def test_export_csv_does_not_mutate(self):
+        """Test the list-based CSV export leaves caller dictionaries intact"""
+        picks = [{'filename': 'a.mseed', 'quality': 0}]
+        output_file = os.path.join(self.temp_dir, 'a.csv')
+        self.assertTrue(self.exporter.export_picks(picks, output_file))
+        self.assertEqual(picks[0]['quality'], 0)
+        
+        with open(output_file, newline='') as f:
+            self.assertEqual(next(csv.DictReader(f))['pick_quality'], 'Excellent')
+
+class TestBatchSummary(unittest.TestCase):
+    """Batch Summary Tests"""
+    
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.results = [
+            {'file': '/d/a.mseed', 'success': True, 'picks': make_picks(3), 'error': None,
+             'duration': 0.5, 'stage_times': {'read': (0.2, 0.1), 'pick': (0.3, 0.3)}},
+            {'file': '/d/b.mseed', 'success': False, 'picks': [], 'error': 'ValueError: File is empty',
+             'processing_time': '2025-06-15T21:38:15'},
+            {'file': '/d/c.mseed', 'success': False, 'picks': [], 'error': 'Read failed', 'error_type': 'IOError'}
+        ]
+    
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_running_totals(self):
+        """Test counts, histogram, timings and failure classes"""
+        summary = BatchSummary()
+        for result in self.results:
+            summary.update(result)
+        data = summary.to_dict()
+        
+        self.assertEqual((data['total_files'], data['successful_files'], data['failed_files']), (3, 1, 2))
+        self.assertEqual(data['quality_distribution'], {0: 1, 1: 1, 2: 1})
+        self.assertEqual(data['failures_by_error'], {'ValueError': 1, 'IOError': 1})
+        self.assertAlmostEqual(data['processing_time'], 0.5)
+        self.assertAlmostEqual(data['stage_times']['pick']['cpu'], 0.3)
+    
+    def test_consolidated_export(self):
+        """Test batch export from a generator into one consolidated file"""
+        output_dir = os.path.join(self.temp_dir, 'out')
+        exporter = DataExporter()
+        
+        self.assertTrue(exporter.export_batch_results(iter(self.results), output_dir, 'json', consolidate=True))
+        self.assertEqual(sorted(os.listdir(output_dir)), ['picks.ndjson', 'summary.json'])
+        with open(os.path.join(output_dir, 'summary.json')) as f:
+            self.assertEqual(json.load(f)['total_picks'], 3)
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestParquetExport(unittest.TestCase):
+    """Parquet Export Tests"""
+    
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.exporter = DataExporter()
+    
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_picks_round_trip(self):
+        """Test picks are written in row groups and filtered on read"""
+        import pyarrow.parquet as pq
+        output_file = os.path.join(self.temp_dir, 'picks.parquet')
+        
+        self.assertTrue(self.exporter.export_picks_parquet(iter(make_picks(10)), output_file, row_group_size=4))
+        self.assertEqual(pq.ParquetFile(output_file).metadata.num_row_groups, 3)
+        
+        df = self.exporter.read_parquet(output_file, filters=[('station', '=', 'S1')])
+        self.assertEqual(len(df), 3)
+        self.assertEqual(set(df['quality']), {'B'})
+        self.assertEqual(df['pick_time'].iloc[0].year, 2023)
+    
+    def test_batch_results(self):
+        """Test batch results are split into result and pick tables"""
+        results = [
+            {'file': 'a.mseed', 'success': True, 'picks': make_picks(2), 'error': None, 'processing_time': 1.5},
+            {'file': 'b.mseed', 'success': False, 'picks': [], 'error': 'Read error',
+             'processing_time': '2025-06-15T21:38:15'}
+        ]
+        output_dir = os.path.join(self.temp_dir, 'batch')
+        
+        self.assertTrue(self.exporter.export_batch_results(results, output_dir, format='parquet'))
+        summary = self.exporter.read_parquet_summary(os.path.join(output_dir, 'results.parquet'))
+        self.assertEqual(summary['total_files'], 2)
+        self.assertEqual(summary['total_picks'], 2)
+        
+        df = self.exporter.read_parquet(os.path.join(output_dir, 'results.parquet'))
+        self.assertEqual(list(df['success']), [True, False])
+        self.assertTrue(df['processing_time'].isna().iloc[1])
+        self.assertEqual(len(self.exporter.read_parquet(os.path.join(output_dir, 'picks.parquet'))), 2)
+
+if __name__ == '__main__':
+    unittest.main()
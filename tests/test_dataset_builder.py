@@ -0,0 +1,59 @@
+"""
+Dataset Builder Tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from core.pick_manager import PickManager
+from core.dataset_builder import DatasetBuilder, TrainingDataset
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_data')
+
+class TestDatasetBuilder(unittest.TestCase):
+    """Dataset Builder Tests"""
+    
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = PickManager(store_path='')
+        self.bhpc = os.path.join(DATA_DIR, '3J.BHPC.evid.17544.mseed')
+        self.kmi = os.path.join(DATA_DIR, 'IC.KMI.evid.21647.mseed')
+        self.manager.add_pick(self.bhpc, self.manager.create_pick(19.5, 'A'))
+        self.manager.add_pick(self.bhpc, self.manager.create_pick(1.0, 'C'))  # Window starts before the trace
+        self.manager.add_pick(self.kmi, self.manager.create_pick(17.5, 'B'))
+        self.manager.add_pick('/missing/XX.NONE.evid.1.mseed', self.manager.create_pick(1.0, 'A'))
+    
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_build_and_read(self):
+        """Test windows are sharded and read back through memory maps"""
+        builder = DatasetBuilder(window_before=2.0, window_after=3.0, sampling_rate=100.0, shard_size=2)
+        description = builder.build(self.manager.iter_pick_rows(), self.temp_dir)
+        
+        self.assertEqual(description['n_windows'], 3)
+        self.assertEqual(description['window_length'], 500)
+        self.assertEqual(len(description['shards']), 2)
+        self.assertEqual(len(description['failed_files']), 1)
+        
+        dataset = TrainingDataset(self.temp_dir)
+        self.assertEqual(len(dataset), 3)
+        waveform, meta = dataset[1]
+        self.assertIsInstance(dataset.shard(0), np.memmap)
+        self.assertTrue(meta['trace_id'].startswith('3J.BHPC.'))
+        self.assertEqual(meta['pick_sample'], 200)
+        self.assertTrue(np.all(waveform[:100] == 0))  # Zero padding before trace start
+        self.assertEqual(dataset[2][1]['quality'], 'B')
+    
+    def test_process_pool(self):
+        """Test extraction on a process pool"""
+        builder = DatasetBuilder(window_before=1.0, window_after=1.0, sampling_rate=20.0, n_workers=2)
+        description = builder.build(self.manager.iter_pick_rows(), self.temp_dir)
+        self.assertEqual(description['n_windows'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Waveform Decimation Tests
+"""
+
+import unittest
+import numpy as np
+from core.decimation import minmax_envelope
+
+class TestMinMaxEnvelope(unittest.TestCase):
+    """Min/Max Envelope Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.data = np.random.default_rng(0).normal(size=100003).astype(np.float32)
+        self.fs = 100.0
+
+    def test_keeps_extremes(self):
+        """Test the envelope keeps the extreme samples at their true times"""
+        self.data[51234] = 50.0
+        self.data[70001] = -50.0
+        times, values = minmax_envelope(self.data, self.fs, 0.0, 1000.0, 800)
+
+        self.assertLessEqual(len(times), 2 * 801)
+        self.assertEqual(values.max(), 50.0)
+        self.assertAlmostEqual(times[values.argmax()], 512.34)
+        self.assertAlmostEqual(times[values.argmin()], 700.01)
+        self.assertTrue(np.all(np.diff(times) >= 0))
+
+    def test_zoomed_range_returns_raw_samples(self):
+        """Test narrow ranges are drawn sample by sample"""
+        times, values = minmax_envelope(self.data, self.fs, 10.0, 12.0, 800, time_offset=1.0)
+        first = int(round((times[0] - 1.0) * self.fs))
+        np.testing.assert_array_equal(values, self.data[first:first + len(values)])
+        self.assertLessEqual(times[0], 10.0)
+        self.assertGreaterEqual(times[-1], 12.0)
+
+    def test_outside_range(self):
+        """Test ranges outside the trace are empty"""
+        times, values = minmax_envelope(self.data, self.fs, 2000.0, 3000.0, 800)
+        self.assertEqual(len(times), 0)
+        self.assertEqual(len(values), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Event-Grouped Batch Tests
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from obspy import Trace, UTCDateTime
+from config.constants import PROGRESS_FILE
+from core.event_batch import EnergyWorkspace, group_files_by_event, sta_lta_trigger
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.batch_processor import BatchProcessor
+
+def reference_trigger(data, sampling_rate, sta=0.5, lta=5.0, threshold=3.0):
+    """The per-sample loop the batch picker used before"""
+    sta_window, lta_window = int(sta * sampling_rate), int(lta * sampling_rate)
+    sta_mean, lta_mean = np.zeros_like(data), np.zeros_like(data)
+    for i in range(len(data)):
+        sta_mean[i] = np.mean(data[:i + 1] ** 2) if i < sta_window else np.mean(data[i - sta_window:i] ** 2)
+        lta_mean[i] = np.mean(data[:i + 1] ** 2) if i < lta_window else np.mean(data[i - lta_window:i] ** 2)
+    triggers = np.where(sta_mean / (lta_mean + 1e-10) > threshold)[0]
+    return int(triggers[0]) if len(triggers) else None
+
+class TestStaLtaTrigger(unittest.TestCase):
+    """Cumulative-Energy STA/LTA Tests"""
+
+    def test_matches_reference(self):
+        """Test the trigger sample equals the per-sample loop"""
+        rng = np.random.default_rng(1)
+        for onset in (1200, 2500):
+            data = rng.normal(0, 1, 3000)
+            data[onset:] *= 8
+            self.assertEqual(sta_lta_trigger(data, 100.0), reference_trigger(data, 100.0))
+        quiet = np.ones(2000)
+        self.assertIsNone(sta_lta_trigger(quiet, 100.0))
+        self.assertIsNone(sta_lta_trigger(np.array([]), 100.0))
+
+    def test_workspace_reuse(self):
+        """Test buffers are allocated for the longest trace and reused"""
+        workspace = EnergyWorkspace()
+        rng = np.random.default_rng(2)
+        data = rng.normal(0, 1, 4000)
+        data[3000:] *= 10
+        expected = sta_lta_trigger(data, 100.0)
+        sta_lta_trigger(data, 100.0, workspace)
+        buffer = workspace.arrays(4000)[0]
+        self.assertEqual(sta_lta_trigger(data[:3500], 100.0, workspace), expected)
+        self.assertEqual(sta_lta_trigger(data, 100.0, workspace), expected)
+        self.assertIs(workspace.arrays(100)[0].base, buffer.base)
+
+class TestEventBatch(unittest.TestCase):
+    """Event-Grouped Batch Processing Tests"""
+
+    def setUp(self):
+        """Write two events of three stations each"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir)  # The progress file is written to the working directory
+        rng = np.random.default_rng(3)
+        self.files = []
+        self.starttime = UTCDateTime(2020, 1, 1)
+        for event_id in ('10', '20'):
+            for station in ('AAA', 'BBB', 'CCC'):
+                data = rng.normal(0, 100, 6000)
+                data[3000:] *= 20  # Arrival at 30 s
+                trace = Trace(data=data.astype(np.int32), header={
+                    'network': 'XX', 'station': station, 'channel': 'HHZ',
+                    'sampling_rate': 100.0, 'starttime': self.starttime})
+                path = os.path.join(self.temp_dir, f'XX.{station}.evid.{event_id}.mseed')
+                trace.write(path, format='MSEED')
+                self.files.append(path)
+        self.files.append(os.path.join(self.temp_dir, 'XX.DDD.evid.20.mseed'))  # Missing file
+
+        self.pick_manager = PickManager(store_path='')
+        self.processor = BatchProcessor(FileManager(), self.pick_manager)
+        self.processor.settings.settings['process']['preprocess'] = False
+        self.processor.settings.settings['process']['batch_workers'] = 2
+        self.processor.settings.settings.setdefault('travel_time', {})['enabled'] = False
+
+    def tearDown(self):
+        """Cleanup after test"""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def run_batch(self, resume=False, group_by_event=True):
+        """Run an auto batch (event-grouped by default) and wait for it"""
+        done = threading.Event()
+        summaries, files_done = [], []
+        success, _ = self.processor.process_batch(
+            self.files, mode='auto', file_callback=lambda path, ok: files_done.append((path, ok)),
+            done_callback=lambda summary: (summaries.append(summary), done.set()),
+            group_by_event=group_by_event, resume=resume)
+        self.assertTrue(success)
+        self.assertTrue(done.wait(60))
+        return summaries[0], files_done
+
+    def test_group_files_by_event(self):
+        """Test files are grouped in order of first appearance"""
+        groups = group_files_by_event(['/d/A.X.evid.2.mseed', '/d/A.Y.evid.1.mseed',
+                                       '/d/B.X.evid.2.mseed', '/d/waveform.mseed'])
+        self.assertEqual(list(groups), ['2', '1', 'N/A'])
+        self.assertEqual(groups['2'], ['/d/A.X.evid.2.mseed', '/d/B.X.evid.2.mseed'])
+
+    def test_event_batch(self):
+        """Test picks are relative to the record start and every event is checkpointed"""
+        summary, files_done = self.run_batch()
+        self.assertEqual(summary.total_files, 7)
+        self.assertEqual(summary.successful_files, 6)
+        self.assertEqual(sorted(path for path, ok in files_done if not ok), [self.files[-1]])
+        for path in self.files[:-1]:
+            picks = self.pick_manager.get_picks_for_file(path)
+            self.assertEqual(len(picks), 1)
+            self.assertAlmostEqual(picks[0].time, 30.0, delta=0.5)
+
+        stage_times = summary.to_dict()['stage_times']
+        self.assertEqual(stage_times['read']['count'], 7)
+        self.assertEqual(stage_times['persist']['count'], 6)
+
+        with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
+            progress = json.load(f)
+        self.assertEqual(progress['completed_events'], ['10', '20'])
+        self.assertEqual(progress['total_events'], 2)
+
+    def test_same_pick_convention(self):
+        """Test both batch modes store the same record-relative pick times"""
+        self.processor.file_manager.settings.settings['process']['preprocess'] = False  # File mode reads this setting
+        self.run_batch()
+        event_picks = {path: self.pick_manager.get_picks_for_file(path)[0].time for path in self.files[:-1]}
+
+        self.pick_manager = self.processor.pick_manager = PickManager(store_path='')
+        self.run_batch(group_by_event=False)
+        file_picks = {path: self.pick_manager.get_picks_for_file(path)[0].time for path in self.files[:-1]}
+        for path, time in file_picks.items():
+            self.assertIsInstance(time, float)
+            self.assertAlmostEqual(time, event_picks[path], places=6)
+
+    def test_resume(self):
+        """Test completed events are skipped on resume"""
+        with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'completed_events': ['10']}, f)
+        summary, _ = self.run_batch(resume=True)
+        self.assertEqual(summary.total_files, 4)
+        self.assertFalse(self.pick_manager.get_picks_for_file(self.files[0]))
+        self.assertTrue(self.pick_manager.get_picks_for_file(self.files[3]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Event Bus Tests
+"""
+
+import threading
+import unittest
+from gui.event_bus import EventBus
+
+class FakeRoot:
+    """Records after() calls instead of running a Tk main loop"""
+
+    def __init__(self):
+        """Initialize the fake root"""
+        self.scheduled = []
+
+    def after(self, ms, func):
+        """Schedule a callback"""
+        self.scheduled.append((ms, func))
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        """Cancel a callback"""
+
+class TestEventBus(unittest.TestCase):
+    """Event Bus Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.root = FakeRoot()
+        self.bus = EventBus(self.root, interval_ms=10)
+        self.calls = []
+        self.bus.subscribe('status', lambda message: self.calls.append(('status', message)), coalesce=True)
+        self.bus.subscribe('file_status', lambda path, status: self.calls.append((path, status)), coalesce=True)
+        self.bus.subscribe('log', lambda message: self.calls.append(('log', message)))
+
+    def test_coalescing(self):
+        """Test coalesced events keep only the latest one per key"""
+        for i in range(1000):
+            self.bus.post('status', f"file {i}")
+            self.bus.post('file_status', f"/data/{i % 3}.mseed", i, key=f"/data/{i % 3}.mseed")
+        self.bus.post('log', 'a')
+        self.bus.post('log', 'b')
+
+        self.assertEqual(self.bus.drain(), 6)
+        self.assertIn(('status', 'file 999'), self.calls)
+        self.assertIn(('/data/0.mseed', 999), self.calls)
+        self.assertEqual([c for c in self.calls if c[0] == 'log'], [('log', 'a'), ('log', 'b')])
+        self.assertEqual(self.bus.drain(), 0)
+
+    def test_posts_from_threads(self):
+        """Test events posted from worker threads are dispatched on the draining thread"""
+        results = []
+        record = lambda i: results.append((i, threading.get_ident()))
+        threads = [threading.Thread(target=self.bus.call, args=(record, i)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.bus.drain()
+        self.assertEqual(sorted(i for i, _ in results), list(range(8)))
+        self.assertTrue(all(ident == threading.get_ident() for _, ident in results))
+
+    def test_tick_reschedules(self):
+        """Test the bus drains on a fixed after() cadence"""
+        self.bus.start()
+        self.assertEqual(self.root.scheduled[-1][0], 10)
+        self.bus.post('status', 'ready')
+        self.root.scheduled[-1][1]()
+        self.assertEqual(self.calls, [('status', 'ready')])
+        self.assertEqual(len(self.root.scheduled), 2)
+
+    def test_handler_errors_are_contained(self):
+        """Test a failing handler does not stop later events"""
+        self.bus.call(lambda: 1 / 0)
+        self.bus.post('log', 'after')
+        self.bus.drain()
+        self.assertEqual(self.calls, [('log', 'after')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+File List Model Tests
+"""
+
+import unittest
+from gui.file_list_model import FileListModel
+from config.constants import FILE_STATUS
+
+class TestFileListModel(unittest.TestCase):
+    """File List Model Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.files = [f'/data/XX.ST{i % 7:02d}.evid.{1000 + i // 7}.mseed' for i in range(100)]
+        self.model = FileListModel()
+        self.model.set_files(self.files)
+
+    def test_window(self):
+        """Test rows are read as a window of the sorted view"""
+        self.assertEqual(len(self.model), 100)
+        rows = self.model.rows(10, 5)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0][2], FILE_STATUS['unprocessed'])
+        self.assertEqual([r[0] for r in rows], sorted(self.files)[10:15])
+        self.assertEqual(self.model.index_of(rows[0][0]), 10)
+
+    def test_status_update(self):
+        """Test status updates return the view position without re-sorting"""
+        path = self.model.path_at(42)
+        self.assertEqual(self.model.set_status(path, FILE_STATUS['processed']), 42)
+        self.assertEqual(self.model.rows(42, 1)[0][2], FILE_STATUS['processed'])
+        self.assertIsNone(self.model.set_status('/data/unknown.mseed', FILE_STATUS['processed']))
+
+        self.model.set_filter(status=FILE_STATUS['processed'])
+        self.assertEqual(self.model.view, [path])
+
+    def test_filter_and_sort(self):
+        """Test station/event filters and sort keys"""
+        self.model.set_filter(station='st03')
+        self.assertTrue(all('ST03' in p for p in self.model.view))
+        self.model.set_filter(station='', event_id='1003')
+        self.assertEqual(len(self.model), 7)
+
+        self.model.set_filter(event_id='')
+        self.model.set_sort('station', reverse=True)
+        self.assertIn('ST06', self.model.path_at(0))
+        self.assertIsNone(self.model.index_of('/data/unknown.mseed'))
+        with self.assertRaises(ValueError):
+            self.model.set_sort('size')
+
+    def test_add_file(self):
+        """Test adding a single file"""
+        self.model.add_file('/data/AA.ZZZ.evid.1.mseed')
+        self.model.add_file('/data/AA.ZZZ.evid.1.mseed')
+        self.assertEqual(len(self.model), 101)
+        self.assertEqual(self.model.path_at(0), '/data/AA.ZZZ.evid.1.mseed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+File Manager Tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from obspy import read, Trace, UTCDateTime
+from core.file_manager import FileManager, parse_file_info
+from core.mseed_index import MseedIndex, MseedIndexCache
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_data')
+
+class TestFileManager(unittest.TestCase):
+    """File Manager Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.file_manager = FileManager()
+        self.file_path = os.path.join(EXAMPLE_DIR, 'IC.KMI.evid.21647.mseed')
+
+    def test_parse_file_info(self):
+        """Test network, station and event ID from the file name"""
+        info = parse_file_info(self.file_path)
+        self.assertEqual(info['network'], 'IC')
+        self.assertEqual(info['station'], 'KMI')
+        self.assertEqual(info['event_id'], '21647')
+        self.assertEqual(parse_file_info('/data/waveform.mseed')['event_id'], 'N/A')
+
+    def test_read_trace_keeps_current_file(self):
+        """Test read_trace does not change the current file"""
+        trace = self.file_manager.read_trace(self.file_path)
+        self.assertGreater(trace.stats.npts, 0)
+        self.assertIsNone(self.file_manager.get_current_file())
+
+        self.file_manager.set_current(self.file_path, trace)
+        self.assertEqual(self.file_manager.get_current_file(), self.file_path)
+        self.assertIs(self.file_manager.get_current_trace(), trace)
+
+    def test_read_missing_file(self):
+        """Test reading a missing file raises"""
+        with self.assertRaises(Exception):
+            self.file_manager.read_trace(os.path.join(EXAMPLE_DIR, 'missing.mseed'))
+
+class TestWindowedRead(unittest.TestCase):
+    """Time-Windowed MiniSEED Read Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'XX.LONG.evid.1.mseed')
+        rng = np.random.default_rng(0)
+        data = np.cumsum(rng.integers(-50, 50, 360000)).astype(np.int32)
+        self.starttime = UTCDateTime(2020, 1, 1)
+        trace = Trace(data=data, header={'network': 'XX', 'station': 'LONG', 'channel': 'HHZ',
+                                         'sampling_rate': 100.0, 'starttime': self.starttime})
+        trace.write(self.file_path, format='MSEED', encoding='STEIM2', reclen=512)
+        self.file_manager = FileManager()
+        self.file_manager.mseed_indexes = MseedIndexCache(self.temp_dir)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_index_matches_records(self):
+        """Test the header scan covers the trace"""
+        index = MseedIndex.scan(self.file_path)
+        trace = read(self.file_path)[0]
+        self.assertEqual(index.trace_ids, ['XX.LONG..HHZ'])
+        self.assertAlmostEqual(index.starttimes[0], trace.stats.starttime.timestamp, places=6)
+        self.assertAlmostEqual(index.endtimes[-1], trace.stats.endtime.timestamp + trace.stats.delta, places=6)
+        self.assertTrue(np.all(index.offsets[1:] > index.offsets[:-1]))
+
+    def test_window_matches_full_read(self):
+        """Test a windowed read returns the same samples as trimming a full read"""
+        t0, t1 = self.starttime + 1234.56, self.starttime + 1294.56
+        ranges = self.file_manager.mseed_indexes.get(self.file_path).select(t0, t1)
+        self.assertLess(sum(length for _, length in ranges), os.path.getsize(self.file_path) / 20)
+
+        self.file_manager.settings.settings['process']['preprocess'] = False
+        trace = self.file_manager.read_trace(self.file_path, t0, t1)
+        expected = read(self.file_path)[0].trim(t0, t1)
+        self.assertEqual(trace.stats.starttime, expected.stats.starttime)
+        np.testing.assert_array_equal(trace.data, expected.data)
+
+        with self.assertRaises(ValueError):
+            self.file_manager.read_trace(self.file_path, self.starttime - 100, self.starttime - 50)
+
+    def test_index_cache(self):
+        """Test indexes are reused until the file changes"""
+        cache = self.file_manager.mseed_indexes
+        index = cache.get(self.file_path)
+        self.assertIs(cache.get(self.file_path), index)
+        self.assertEqual(len(MseedIndexCache(self.temp_dir).get(self.file_path)), len(index))
+
+        read(self.file_path)[0].slice(self.starttime, self.starttime + 60).write(self.file_path, format='MSEED', reclen=512)
+        os.utime(self.file_path, ns=(0, 0))
+        self.assertLess(len(cache.get(self.file_path)), len(index))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,277 @@
+"""
+Pick Manager Tests
+"""
+
+import os
+import csv
+import shutil
+import tempfile
+import sqlite3
+import unittest
+import numpy as np
+from obspy import Trace, UTCDateTime
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.pick_store import PickStore, SCHEMA_VERSION
+from core.pick_importer import PickImporter
+
+class TestPickManager(unittest.TestCase):
+    """Pick Manager Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.temp_dir, 'picks.db')
+        self.file_path = '/data/3J.BHPC.evid.17544.mseed'
+
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_in_memory_picks(self):
+        """Test picks without a store"""
+        manager = PickManager(store_path='')
+        pick = manager.create_pick(1.5, 'B')
+        manager.add_pick(self.file_path, pick)
+
+        self.assertTrue(manager.has_picks())
+        self.assertIs(manager.find_nearest_pick(self.file_path, 1.55), pick)
+
+        manager.remove_pick(self.file_path, pick)
+        self.assertFalse(manager.has_picks())
+
+    def test_write_through(self):
+        """Test add/update/remove are written to the store"""
+        manager = PickManager(store_path=self.store_path)
+        pick = manager.create_pick(2.0, 'A')
+        manager.add_pick(self.file_path, pick)
+        manager.update_pick_quality(self.file_path, pick, 'C')
+
+        rows = list(manager.store.iter_rows(event_id='17544'))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['station'], 'BHPC')
+        self.assertEqual(rows[0]['quality'], 'C')
+
+        manager.remove_pick(self.file_path, pick)
+        self.assertEqual(manager.store.count(), 0)
+        manager.close()
+
+    def test_restore_from_store(self):
+        """Test picks survive a restart"""
+        manager = PickManager(store_path=self.store_path)
+        manager.add_pick(self.file_path, manager.create_pick(3.0, 'B'))
+        manager.close()
+
+        restored = PickManager(store_path=self.store_path)
+        picks = restored.get_picks_for_file(self.file_path)
+        self.assertEqual(len(picks), 1)
+        self.assertEqual(picks[0].quality, 'B')
+
+        # New picks must not collide with restored IDs
+        new_pick = restored.create_pick(4.0)
+        self.assertGreater(new_pick.id, picks[0].id)
+        restored.close()
+
+    def test_attach_store_keeps_memory_picks(self):
+        """Test picks made before attaching a store are persisted"""
+        manager = PickManager(store_path='')
+        manager.add_pick(self.file_path, manager.create_pick(1.0))
+        manager.attach_store(self.store_path)
+
+        self.assertEqual(manager.store.count(), 1)
+        self.assertEqual(len(manager.get_picks_for_file(self.file_path)), 1)
+        manager.close()
+
+    def test_attach_other_store(self):
+        """Test switching directories neither replaces nor copies stored picks"""
+        other_dir = os.path.join(self.temp_dir, 'other')
+        os.makedirs(other_dir)
+        other_path = os.path.join(other_dir, 'picks.db')
+        other_file = '/other/IC.KMI.evid.21647.mseed'
+        other = PickManager(store_path=other_path)
+        other.add_pick(other_file, other.create_pick(5.0))
+        other.close()
+
+        manager = PickManager(store_path='')
+        early = manager.create_pick(1.0)
+        manager.add_pick(self.file_path, early)
+        manager.attach_store(other_path)
+        self.assertGreater(early.id, 1)  # Renumbered after the stored pick
+        self.assertEqual(manager.store.count(), 2)
+
+        manager.attach_store(self.store_path)
+        manager.add_pick(self.file_path, manager.create_pick(2.0))
+        manager.attach_store(other_path)
+
+        self.assertEqual(sorted(row['time'] for row in manager.store.iter_rows()), [1.0, 5.0])
+        self.assertEqual(manager.get_picks_for_file(other_file)[0].time, 5.0)
+        self.assertEqual([pick.time for pick in manager.get_picks_for_file(self.file_path)], [1.0])
+        manager.close()
+
+    def test_save_picks_csv(self):
+        """Test CSV export streams from the store"""
+        manager = PickManager(store_path=self.store_path)
+        manager.add_pick(self.file_path, manager.create_pick(5.0, 'A'))
+        manager.add_pick('/data/IC.KMI.evid.21647.mseed', manager.create_pick(6.0, 'C'))
+
+        output_file = os.path.join(self.temp_dir, 'picks.csv')
+        manager.save_picks(self.file_path, output_file)
+
+        with open(output_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r['Event ID'] for r in rows], ['17544', '21647'])
+        self.assertEqual(rows[1]['Pick Quality'], 'C')
+        manager.close()
+
+    def test_save_picks_json(self):
+        """Test JSON export of the current file"""
+        manager = PickManager(store_path='')
+        manager.add_pick(self.file_path, manager.create_pick(5.0, 'A'))
+
+        output_file = os.path.join(self.temp_dir, 'picks.json')
+        manager.save_picks(self.file_path, output_file)
+        self.assertTrue(os.path.exists(output_file))
+
+class TestPickStore(unittest.TestCase):
+    """Pick Store Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = PickStore(os.path.join(self.temp_dir, 'picks.db'), fetch_size=2)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_streaming_filters(self):
+        """Test streaming rows across several fetches with filters"""
+        manager = PickManager(store_path='')
+        picks = [manager.create_pick(float(i), 'A' if i % 2 else 'B') for i in range(5)]
+        self.store.add_many('/data/XF.H1090.evid.38307.mseed', picks)
+
+        self.assertEqual(len(list(self.store.iter_rows())), 5)
+        self.assertEqual(len(list(self.store.iter_rows(quality='A'))), 2)
+        self.assertEqual(len(list(self.store.iter_rows(station='H1090', quality='B'))), 3)
+
+    def test_migrate_flat_schema(self):
+        """Test a store with the flat picks table of schema version 1 is migrated"""
+        db_path = os.path.join(self.temp_dir, 'old.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            "CREATE TABLE picks (id INTEGER PRIMARY KEY, file_path TEXT NOT NULL, file_name TEXT NOT NULL, "
+            "event_id TEXT NOT NULL, network TEXT NOT NULL, station TEXT NOT NULL, time REAL NOT NULL, "
+            "quality TEXT NOT NULL, created_at TEXT NOT NULL);"
+            "CREATE INDEX idx_picks_file ON picks (file_path);"
+            "INSERT INTO picks VALUES (3, '/d/XX.A.evid.1.mseed', 'XX.A.evid.1.mseed', '1', 'XX', 'A', 1.5, 'A', "
+            "'2025-06-15 21:38:15');"
+            "INSERT INTO picks VALUES (7, '/d/XX.A.evid.1.mseed', 'XX.A.evid.1.mseed', '1', 'XX', 'A', 2.5, 'C', "
+            "'2025-06-15 21:38:16');")
+        conn.commit()
+        conn.close()
+
+        store = PickStore(db_path)
+        rows = list(store.iter_rows(station='A'))
+        self.assertEqual([(row['id'], row['time'], row['quality']) for row in rows], [(3, 1.5, 'A'), (7, 2.5, 'C')])
+        self.assertEqual(store.conn.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION)
+        manager = PickManager(store_path='')
+        store.add('/d/XX.B.evid.1.mseed', manager.create_pick(4.0))
+        self.assertEqual(store.count(), 3)
+        store.close()
+
+class TestPickImporter(unittest.TestCase):
+    """Pick Importer Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = PickManager(store_path='')
+        self.importer = PickImporter(self.manager, chunk_size=2)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip_saved_layout(self):
+        """Test picks saved to CSV are imported back"""
+        file_path = '/data/3J.BHPC.evid.17544.mseed'
+        for i, quality in enumerate('ABCA'):
+            self.manager.add_pick(file_path, self.manager.create_pick(float(i), quality))
+        output_file = os.path.join(self.temp_dir, 'picks.csv')
+        self.manager.save_picks(file_path, output_file)
+
+        restored = PickManager(store_path='')
+        report = PickImporter(restored, chunk_size=3).import_file(output_file)
+        self.assertEqual(report.layout, 'saved')
+        self.assertEqual(report.imported, 4)
+        self.assertEqual([p.quality for p in restored.get_picks_for_file(file_path)], list('ABCA'))
+
+    def test_catalog_layout(self):
+        """Test catalog picks are attached to the scanned record covering them, in record-relative seconds"""
+        file_manager = FileManager()
+        for name, start in (('XX.STA1.evid.1.mseed', '2023-01-01T00:00:00'),
+                            ('XX.STA2.evid.1.mseed', '2023-01-01T00:00:02'),
+                            ('XX.STA1.evid.2.mseed', '2023-01-02T00:00:00')):
+            path = os.path.join(self.temp_dir, name)
+            Trace(np.zeros(6000, dtype=np.int32), header={'network': 'XX', 'station': name.split('.')[1],
+                                                          'sampling_rate': 100.0,
+                                                          'starttime': UTCDateTime(start)}).write(path, format='MSEED')
+            file_manager.files.append(path)
+
+        catalog = os.path.join(self.temp_dir, 'event_picks.csv')
+        with open(catalog, 'w', encoding='utf-8') as f:
+            f.write("station,network,location,channel,pick_time,quality,offset,auto_picked\n"
+                    "STA1,XX,00,HHZ,2023-01-01T00:00:05.123,0,0.123,False\n"
+                    "STA2,XX,00,HHZ,2023-01-01T00:00:06.456,2,0.456,True\n"
+                    "STA1,XX,00,HHZ,2023-01-02T00:00:07.5,1,0.5,False\n"
+                    "STA3,XX,00,HHZ,2023-01-01T00:00:05.0,1,0.0,False\n")
+
+        report = PickImporter(self.manager, file_manager, chunk_size=3).import_file(catalog)
+        self.assertEqual(report.layout, 'catalog')
+        self.assertEqual((report.imported, report.rejected_count), (3, 1))
+        self.assertEqual(report.rejected[0][0], 4)
+
+        picks = self.manager.get_picks_for_file(os.path.join(self.temp_dir, 'XX.STA2.evid.1.mseed'))
+        self.assertEqual(picks[0].quality, 'C')
+        self.assertAlmostEqual(picks[0].time, 4.456, places=3)
+        picks = self.manager.get_picks_for_file(os.path.join(self.temp_dir, 'XX.STA1.evid.2.mseed'))
+        self.assertAlmostEqual(picks[0].time, 7.5, places=3)
+
+    def test_rejected_rows(self):
+        """Test invalid rows are reported and skipped"""
+        path = os.path.join(self.temp_dir, 'bad.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("File Path,File Name,Event ID,Pick Time,Pick Quality,Created At\n"
+                    "/d/a.mseed,a.mseed,N/A,1.0,A,2025-06-15 21:38:15\n"
+                    "/d/a.mseed,a.mseed,N/A,abc,A,2025-06-15 21:38:15\n"
+                    "/d/a.mseed,a.mseed,N/A,2.0,Z,2025-06-15 21:38:15\n"
+                    ",a.mseed,N/A,3.0,B,\n")
+
+        report = self.importer.import_file(path)
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.rejected_count, 3)
+        self.assertEqual(sorted(row for row, _ in report.rejected), [2, 3, 4])
+
+    def test_unknown_columns(self):
+        """Test files without a known layout are refused"""
+        path = os.path.join(self.temp_dir, 'unknown.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("a,b\n1,2\n")
+        with self.assertRaises(ValueError):
+            self.importer.import_file(path)
+
+    def test_json(self):
+        """Test JSON written by save_picks"""
+        file_path = '/data/IC.KMI.evid.21647.mseed'
+        self.manager.add_pick(file_path, self.manager.create_pick(1.25, 'B'))
+        output_file = os.path.join(self.temp_dir, 'picks.json')
+        self.manager.save_picks(file_path, output_file)
+
+        restored = PickManager(store_path='')
+        report = PickImporter(restored).import_file(output_file)
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(restored.get_picks_for_file(file_path)[0].time, 1.25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Record Section Tests
+"""
+
+import threading
+import unittest
+from core.pick_manager import PickManager
+from gui.record_section import RecordSection
+
+class TestRecordSection(unittest.TestCase):
+    """Record Section Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.files = [f'/data/XX.S{i:02d}.evid.1.mseed' for i in (3, 1, 2, 0)]
+        self.loaded = []
+        self.section = RecordSection(self.files, self.load_row, n_workers=2, max_loaded=2)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        self.section.close()
+
+    def load_row(self, file_path):
+        """Fake row loader"""
+        self.loaded.append(file_path)
+        if 'S02' in file_path:
+            raise IOError("unreadable")
+        return {'file': file_path}
+
+    def test_sort(self):
+        """Test sorting by station and by first pick time"""
+        self.section.sort('station')
+        self.assertEqual(self.section.labels(), ['XX.S00', 'XX.S01', 'XX.S02', 'XX.S03'])
+
+        pick_manager = PickManager(store_path='')
+        pick_manager.add_pick(self.files[0], pick_manager.create_pick(1.0))
+        self.section.sort('pick_time', pick_manager)
+        self.assertEqual(self.section.file_paths[0], self.files[0])
+        self.assertEqual(self.section.file_at(1.3), '/data/XX.S00.evid.1.mseed')
+        self.assertIsNone(self.section.file_at(7))
+
+    def test_visible_rows(self):
+        """Test rows inside an inverted y-range"""
+        self.assertEqual(list(self.section.visible_rows((2.5, -0.5))), [0, 1, 2])
+        self.assertEqual(list(self.section.visible_rows((10.5, 2.6))), [3])
+
+    def test_request_loads_each_row_once(self):
+        """Test rows are loaded once and failures are not retried"""
+        results = []
+        done = threading.Event()
+
+        def callback(file_path, row, error):
+            results.append((file_path, row, error))
+            if len(results) == 4:
+                done.set()
+
+        self.section.request(range(4), callback)
+        self.section.request(range(4), callback)
+        self.assertTrue(done.wait(5))
+        for file_path, row, error in results:
+            if error:
+                self.section.fail(file_path, error)
+            else:
+                self.section.add(file_path, row, keep={self.files[0]})
+
+        self.section.request(range(4), callback)
+        self.assertEqual(sorted(self.loaded), sorted(self.files))
+        self.assertIn(self.files[2], self.section.errors)
+        # Only two rows are kept, and the protected row is one of them
+        self.assertEqual(len(self.section.rows), 2)
+        self.assertIsNotNone(self.section.get(self.files[0]))
+
+if __name__ == '__main__':
+    unittest.main()
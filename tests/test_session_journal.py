@@ -0,0 +1,148 @@
+"""
+Session Journal Tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from core.pick_manager import PickManager
+from core.session_journal import SessionJournal
+from core.command_history import (
+    CommandHistory,
+    AddPickCommand,
+    RemovePickCommand,
+    UpdatePickCommand,
+    BatchCommand
+)
+
+FILE_PATH = '/data/XX.STA.evid.1.mseed'
+
+class TestSessionJournal(unittest.TestCase):
+    """Session Journal Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.pick_manager, self.journal, self.history = self.start_session()
+
+    def tearDown(self):
+        """Cleanup after test"""
+        self.journal.close()
+        shutil.rmtree(self.temp_dir)
+
+    def start_session(self, compact_entries=1000):
+        """Start a session on the project directory, recovering the journal"""
+        pick_manager = PickManager(store_path='')
+        journal = SessionJournal(self.temp_dir, pick_manager, fsync_interval=60, compact_entries=compact_entries)
+        journal.recover()
+        return pick_manager, journal, CommandHistory(journal=journal)
+
+    def crash_and_recover(self, compact_entries=1000):
+        """Simulate a crash after the last fsync and start a new session"""
+        self.journal.sync()
+        self.journal._stop.set()  # Abandon the journal without a clean close
+        self.journal._file.close()
+        self.pick_manager, self.journal, self.history = self.start_session(compact_entries)
+        return self.pick_manager
+
+    def picks(self, pick_manager):
+        """Picks as comparable tuples"""
+        return sorted((f, p.id, p.time, p.quality) for f, p in pick_manager.get_all_picks())
+
+    def add(self, time, quality='A'):
+        """Add a pick through the command history"""
+        pick = self.pick_manager.create_pick(time, quality)
+        self.history.execute_command(AddPickCommand(self.pick_manager, FILE_PATH, pick))
+        return pick
+
+    def test_recover_commands(self):
+        """Test executed, undone and redone commands are recovered"""
+        first = self.add(1.0)
+        second = self.add(2.0)
+        self.history.execute_command(UpdatePickCommand(self.pick_manager, FILE_PATH, first, 'C'))
+        self.history.execute_command(RemovePickCommand(self.pick_manager, FILE_PATH, second))
+        self.history.undo()
+        self.history.redo()
+        self.history.undo()
+        expected = self.picks(self.pick_manager)
+
+        recovered = self.crash_and_recover()
+        self.assertEqual(self.picks(recovered), expected)
+        self.assertEqual(recovered.get_pick_by_id(first.id).quality, 'C')
+
+        # New picks do not reuse recovered IDs
+        self.assertGreater(recovered.create_pick(3.0).id, second.id)
+
+    def test_batch_command(self):
+        """Test batch commands are journaled as one entry"""
+        picks = [self.pick_manager.create_pick(i * 0.1, 'ABC'[i % 3]) for i in range(300)]
+        self.history.execute_command(BatchCommand.add_picks(self.pick_manager, {FILE_PATH: picks}))
+        c_ids = [pick.id for pick in picks if pick.quality == 'C']
+        self.history.execute_command(BatchCommand.remove_picks(self.pick_manager, c_ids))
+        self.assertEqual(self.journal.entries, 2)
+
+        recovered = self.crash_and_recover()
+        self.assertEqual(len(recovered.get_all_picks()), 200)
+        self.history.execute_command(BatchCommand.set_quality(recovered, [picks[0].id], 'B'))
+        self.assertEqual(self.crash_and_recover().get_pick_by_id(picks[0].id).quality, 'B')
+
+    def test_torn_entry_is_dropped(self):
+        """Test a partly written last entry is ignored and truncated"""
+        self.add(1.0)
+        self.journal.sync()
+        with open(self.journal.log_path, 'ab') as f:
+            f.write(b'{"seq":2,"op":"exe')
+
+        recovered = self.crash_and_recover()
+        self.assertEqual(len(recovered.get_all_picks()), 1)
+        self.add(2.0)
+        self.assertEqual(len(self.crash_and_recover().get_all_picks()), 2)
+
+    def test_clean_close(self):
+        """Test a cleanly closed session leaves nothing to replay and keeps its picks"""
+        self.add(1.0)
+        self.add(2.0)
+        self.journal.close()
+        pick_manager = PickManager(store_path='')
+        self.journal = SessionJournal(self.temp_dir, pick_manager, fsync_interval=60)
+        self.assertEqual(self.journal.recover(), 0)
+        self.assertEqual(len(pick_manager.get_all_picks()), 2)  # From the snapshot, as there is no pick store
+
+        self.journal.close()
+        store_path = os.path.join(self.temp_dir, 'picks.db')
+        self.pick_manager = PickManager(store_path=store_path)
+        self.journal = SessionJournal(self.temp_dir, self.pick_manager, fsync_interval=60)
+        self.journal.recover()
+        self.history = CommandHistory(journal=self.journal)
+        self.add(3.0)
+        self.journal.close()
+        self.pick_manager.close()
+
+        pick_manager = PickManager(store_path=store_path)
+        self.journal = SessionJournal(self.temp_dir, pick_manager, fsync_interval=60)
+        self.assertEqual(self.journal.recover(), 0)
+        self.assertEqual(os.path.getsize(self.journal.log_path), 0)
+        self.assertFalse(os.path.exists(self.journal.snapshot_path))
+        self.assertEqual(len(pick_manager.get_all_picks()), 3)
+        pick_manager.close()
+
+    def test_compaction(self):
+        """Test the journal is compacted into a snapshot past the threshold"""
+        self.journal.close()
+        self.pick_manager, self.journal, self.history = self.start_session(compact_entries=10)
+        for i in range(25):
+            self.add(float(i))
+        self.history.undo()
+        expected = self.picks(self.pick_manager)
+
+        self.assertTrue(os.path.exists(self.journal.snapshot_path))
+        self.assertLess(self.journal.entries, 10)
+        self.journal.sync()
+        with open(self.journal.log_path) as f:
+            self.assertEqual(len(f.readlines()), self.journal.entries)
+
+        self.assertEqual(self.picks(self.crash_and_recover(compact_entries=10)), expected)
+
+if __name__ == '__main__':
+    unittest.main()
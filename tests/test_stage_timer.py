@@ -0,0 +1,113 @@
+"""
+Stage Timing Tests
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+import unittest
+from core.stage_timer import StageTimer, StageHistogram, format_stage_times
+from core.data_exporter import BatchSummary
+from core.batch_logger import BatchLogger
+
+class TestStageTimer(unittest.TestCase):
+    """Stage Timer Tests"""
+
+    def test_stages(self):
+        """Test stages accumulate wall and CPU time, also when they raise"""
+        timer = StageTimer()
+        with timer.stage('read'):
+            time.sleep(0.01)
+        with timer.stage('read'):
+            pass
+        with self.assertRaises(ValueError):
+            with timer.stage('pick'):
+                raise ValueError("no pick")
+        timer.add('persist', 0.5, 0.25)
+        self.assertGreaterEqual(timer.times['read'][0], 0.01)
+        self.assertLess(timer.times['read'][1], 0.01)  # Sleeping costs no CPU
+        self.assertIn('pick', timer.times)
+        self.assertEqual(timer.times['persist'], (0.5, 0.25))
+
+    def test_disabled(self):
+        """Test a disabled timer records nothing and shares one no-op context"""
+        timer = StageTimer(False)
+        with timer.stage('read'):
+            pass
+        timer.add('persist', 1.0, 1.0)
+        self.assertEqual(timer.times, {})
+        self.assertIs(timer.stage('read'), StageTimer(False).stage('pick'))
+
+class TestStageHistogram(unittest.TestCase):
+    """Stage Histogram Tests"""
+
+    def test_percentiles(self):
+        """Test percentiles fall in the bin of the exact value"""
+        histogram = StageHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for _ in range(90):
+            histogram.add(0.002)
+        for _ in range(10):
+            histogram.add(0.5)
+        histogram.add(0.0)
+        histogram.add(1e6)
+        self.assertGreaterEqual(histogram.percentile(50), 0.002)
+        self.assertLess(histogram.percentile(50), 0.002 * 1.6)
+        self.assertGreaterEqual(histogram.percentile(95), 0.5)
+        self.assertEqual(histogram.max, 1e6)
+        self.assertEqual(sum(count for _, count in histogram.to_dict()['bins']), 102)
+
+    def test_summary(self):
+        """Test the batch summary keeps a histogram per stage and formats it"""
+        summary = BatchSummary()
+        for i in range(20):
+            summary.update({'file': f'f{i}', 'success': True, 'picks': [],
+                            'stage_times': {'read': (0.01, 0.001), 'pick': (0.001 * (i + 1), 0.001)}})
+        stage_times = summary.to_dict()['stage_times']
+        self.assertEqual(stage_times['read']['count'], 20)
+        self.assertAlmostEqual(stage_times['read']['wall'], 0.2)
+        self.assertGreaterEqual(stage_times['pick']['p95'], 0.019)
+        self.assertEqual(stage_times['pick']['max'], 0.02)
+        lines = format_stage_times(stage_times)
+        self.assertTrue(lines[0].startswith('read: 20 files, wall 0.200 s (p50'))
+
+class TestBatchLogger(unittest.TestCase):
+    """Batch Logger Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.log_dir = tempfile.mkdtemp()
+        self.batch_logger = BatchLogger(self.log_dir)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        for handler in list(self.batch_logger.logger.handlers):
+            handler.close()
+            self.batch_logger.logger.removeHandler(handler)
+        shutil.rmtree(self.log_dir)
+
+    def test_durations(self):
+        """Test processing_time is a duration and stage timings reach the progress file and log"""
+        self.batch_logger.log_start(1)
+        self.batch_logger.log_file_complete('a.mseed', True, duration=0.25,
+                                            stage_times={'read': (0.2, 0.1), 'pick': (0.05, 0.05)})
+        summary = BatchSummary()
+        summary.update({'file': 'a.mseed', 'success': True, 'picks': [],
+                        'stage_times': {'read': (0.2, 0.1), 'pick': (0.05, 0.05)}})
+        with self.assertLogs('batch_processor', level=logging.INFO) as logs:
+            self.batch_logger.log_complete(summary)
+        self.assertTrue(any('Stage read: 1 files' in line for line in logs.output))
+
+        with open(os.path.join(self.log_dir, 'progress.json')) as f:
+            progress = json.load(f)
+        result = progress['results'][0]
+        self.assertEqual(result['processing_time'], 0.25)
+        self.assertEqual(result['stage_times']['read'], [0.2, 0.1])
+        self.assertIn('completed_at', result)
+        self.assertEqual(progress['summary']['stage_times']['pick']['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
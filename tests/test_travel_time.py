@@ -0,0 +1,112 @@
+"""
+Travel Time Tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from obspy import Trace, UTCDateTime
+from obspy.taup import TauPyModel
+from core.travel_time import TravelTimeTable, ArrivalPredictor
+from core.file_manager import FileManager
+from core.pick_manager import PickManager
+from core.batch_processor import BatchProcessor
+
+class TestTravelTimeTable(unittest.TestCase):
+    """Travel-Time Table Tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a coarse table once"""
+        cls.table = TravelTimeTable.build('iasp91', distance_step=1.0, depth_step=50.0, max_depth=300.0)
+        cls.model = TauPyModel('iasp91')
+
+    def test_grid_matches_taup(self):
+        """Test grid nodes agree with TauP first P arrivals"""
+        for distance, depth in [(5.0, 0.0), (30.0, 50.0), (95.0, 300.0)]:
+            expected = self.model.get_travel_times(depth, distance, phase_list=['ttp'])[0].time
+            i = int(np.argmin(np.abs(self.table.distances - distance)))
+            j = int(np.argmin(np.abs(self.table.depths - depth)))
+            self.assertAlmostEqual(self.table.times[i, j], expected, delta=0.1)
+
+    def test_lookup_is_vectorized(self):
+        """Test interpolation between nodes"""
+        distances = np.array([30.3, 30.3, 179.9, 500.0])
+        depths = np.array([10.0, 33.0, 0.0, 0.0])
+        times = self.table.lookup(distances, depths)
+        self.assertEqual(times.shape, (4,))
+        expected = self.model.get_travel_times(33.0, 30.3, phase_list=['ttp'])[0].time
+        self.assertAlmostEqual(times[1], expected, delta=1.0)
+        self.assertLess(times[1], times[0])  # Deeper sources arrive earlier at teleseismic distances
+        self.assertEqual(times[3], self.table.lookup([180.0], [0.0])[0])  # Clipped to the grid
+
+class TestArrivalPredictor(unittest.TestCase):
+    """Arrival Predictor Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        table = TravelTimeTable.build('iasp91', distance_step=1.0, depth_step=100.0, max_depth=200.0)
+        events = pd.DataFrame({'event_id': ['100', '200'], 'time': ['2020-01-01T00:00:00', '2020-06-01T12:00:00'],
+                               'latitude': [0.0, 10.0], 'longitude': [0.0, 20.0], 'depth': [10.0, 150.0]})
+        stations = pd.DataFrame({'network': ['XX', 'XX'], 'station': ['NEAR', 'FAR'],
+                                 'latitude': [0.0, 0.0], 'longitude': [10.0, 60.0]})
+        self.predictor = ArrivalPredictor(table, events, stations)
+
+    def test_predict(self):
+        """Test arrivals are predicted for known events and stations only"""
+        files = ['/data/XX.NEAR.evid.100.mseed', '/data/XX.FAR.evid.100.mseed',
+                 '/data/XX.FAR.evid.200.mseed', '/data/XX.NONE.evid.100.mseed', '/data/XX.NEAR.evid.999.mseed']
+        arrivals = self.predictor.predict(files)
+        origin = UTCDateTime(2020, 1, 1)
+        self.assertAlmostEqual(arrivals[files[0]] - origin, 146.0, delta=3.0)
+        self.assertGreater(arrivals[files[1]] - origin, arrivals[files[0]] - origin)
+        self.assertGreater(arrivals[files[2]], UTCDateTime(2020, 6, 1, 12))
+        self.assertIsNone(arrivals[files[3]])
+        self.assertIsNone(arrivals[files[4]])
+
+    def test_windows(self):
+        """Test windows surround the prediction"""
+        path = '/data/XX.NEAR.evid.100.mseed'
+        start, end = self.predictor.windows([path], 5.0, 20.0)[path]
+        self.assertAlmostEqual(end - start, 25.0)
+        self.assertAlmostEqual(self.predictor.predict([path])[path] - start, 5.0)
+
+class TestWindowedPicking(unittest.TestCase):
+    """Picking in Predicted-Arrival Windows"""
+
+    def setUp(self):
+        """Write a record with a spurious burst at 15 s and an arrival at 40 s"""
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        data = rng.normal(0, 100, 6000)
+        data[1500:1600] *= 50
+        data[4000:] *= 20
+        self.start = UTCDateTime(2020, 1, 1)
+        self.path = os.path.join(self.temp_dir, 'XX.AAA.evid.1.mseed')
+        Trace(data=data.astype(np.int32), header={'network': 'XX', 'station': 'AAA', 'sampling_rate': 100.0,
+                                                  'starttime': self.start}).write(self.path, format='MSEED')
+        self.processor = BatchProcessor(FileManager(), PickManager(store_path=''))
+        self.processor.file_manager.settings.settings['process']['preprocess'] = False
+
+    def tearDown(self):
+        """Cleanup after test"""
+        shutil.rmtree(self.temp_dir)
+
+    def pick(self, window=None):
+        """Pick the record as a batch does, returning the stored pick time"""
+        self.processor.pick_manager = PickManager(store_path='')
+        success, _ = self.processor._process_single_file(self.path, 'auto', window)
+        picks = self.processor.pick_manager.get_picks_for_file(self.path)
+        return picks[0].time if success else None
+
+    def test_pick_in_window(self):
+        """Test triggers outside the window are ignored and times stay relative to the record start"""
+        self.assertLess(self.pick(), 20.0)
+        self.assertAlmostEqual(self.pick((self.start + 25.0, self.start + 55.0)), 40.0, delta=1.0)
+        self.assertIsNone(self.pick((self.start + 100.0, self.start + 110.0)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Waveform Processor Tests
+"""
+
+import copy
+import unittest
+import numpy as np
+from obspy import Trace, Stream
+from config.settings import Settings
+from config.constants import DEFAULT_PARAMS
+from core.waveform_processor import WaveformProcessor, ProcessingPlan
+
+def make_trace(npts=5000, sampling_rate=100.0, seed=0):
+    """Random integer trace with an offset"""
+    rng = np.random.default_rng(seed)
+    data = (rng.normal(0, 100, npts) + 500).astype(np.int32)
+    return Trace(data=data, header={'sampling_rate': sampling_rate})
+
+class TestProcessingPlan(unittest.TestCase):
+    """Processing Plan Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.settings = Settings()
+        self.settings.settings = copy.deepcopy(DEFAULT_PARAMS)
+
+    def test_from_settings(self):
+        """Test the settings compile into ordered stages"""
+        plan = ProcessingPlan.from_settings(self.settings)
+        self.assertEqual([name for name, _ in plan.stages], ['demean', 'resample', 'filter'])
+        self.assertEqual(plan.stages[2][1], {'type': 'bandpass', 'freqs': [1.0, 10.0]})
+
+        self.settings.settings['process']['preprocess'] = False
+        self.assertEqual(len(ProcessingPlan.from_settings(self.settings)), 0)
+
+    def test_key(self):
+        """Test the plan key follows the stages"""
+        key = ProcessingPlan.from_settings(self.settings).key
+        self.assertEqual(ProcessingPlan.from_settings(self.settings).key, key)
+        self.settings.settings['filter']['freq_range'] = [2.0, 8.0]
+        self.assertNotEqual(ProcessingPlan.from_settings(self.settings).key, key)
+        self.settings.settings['paths']['data_dir'] = '/elsewhere'
+        self.assertEqual(ProcessingPlan.from_settings(self.settings).key,
+                         ProcessingPlan().add('demean').add('resample', sampling_rate=100.0)
+                         .add('filter', type='bandpass', freqs=[2.0, 8.0]).key)
+
+    def test_invalid_stage(self):
+        """Test unknown stages and filter types are rejected"""
+        with self.assertRaises(ValueError):
+            ProcessingPlan().add('smooth')
+        with self.assertRaises(ValueError):
+            ProcessingPlan().add('filter', type='notch', freqs=[50.0])
+
+class TestWaveformProcessor(unittest.TestCase):
+    """Waveform Processor Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.processor = WaveformProcessor(Settings())
+        self.plan = ProcessingPlan().add('demean').add('filter', type='bandpass', freqs=[1.0, 10.0])
+
+    def test_matches_obspy(self):
+        """Test the plan gives the same samples as obspy's detrend and filter"""
+        expected = make_trace()
+        expected.detrend('demean')
+        expected.filter('bandpass', freqmin=1.0, freqmax=10.0)
+
+        trace = self.processor.process(make_trace(), self.plan)
+        np.testing.assert_allclose(trace.data, expected.data, rtol=1e-10, atol=1e-9)
+
+    def test_in_place(self):
+        """Test float64 buffers are modified without a copy"""
+        trace = make_trace()
+        trace.data = trace.data.astype(np.float64)
+        buffer = trace.data
+        self.processor.process(trace, ProcessingPlan().add('demean').add('taper', max_percentage=0.1).add('normalize'))
+        self.assertIs(trace.data, buffer)
+        self.assertAlmostEqual(np.abs(buffer).max(), 1.0)
+        self.assertEqual(buffer[0], 0.0)
+
+    def test_resample_skips_same_rate(self):
+        """Test resampling to the current rate leaves the data alone"""
+        trace = make_trace()
+        trace.data = trace.data.astype(np.float64)
+        before = trace.data.copy()
+        self.processor.process(trace, ProcessingPlan().add('resample', sampling_rate=100.0))
+        np.testing.assert_array_equal(trace.data, before)
+        self.processor.process(trace, ProcessingPlan().add('resample', sampling_rate=50.0))
+        self.assertEqual(trace.stats.npts, 2500)
+
+    def test_process_many(self):
+        """Test batching gives the same result as processing traces one by one"""
+        traces = [make_trace(seed=i) for i in range(5)] + [make_trace(npts=3000, sampling_rate=40.0)]
+        expected = [self.processor.process(make_trace(seed=i), self.plan).data for i in range(5)]
+        expected.append(self.processor.process(make_trace(npts=3000, sampling_rate=40.0), self.plan).data)
+
+        self.processor.preprocess(Stream(traces), self.plan)
+        for trace, data in zip(traces, expected):
+            np.testing.assert_allclose(trace.data, data)
+
+    def test_envelope_and_snr(self):
+        """Test the envelope stage and SNR"""
+        trace = self.processor.process(make_trace(), ProcessingPlan().add('demean'))
+        trace.data[2500:] *= 10
+        self.assertGreater(self.processor.calculate_snr(trace, window_length=1000), 10)
+
+        self.processor.process(trace, ProcessingPlan().add('envelope'))
+        self.assertTrue(np.all(trace.data >= 0))
+
+if __name__ == '__main__':
+    unittest.main()
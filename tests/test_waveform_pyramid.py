@@ -0,0 +1,77 @@
+"""
+Waveform Pyramid Tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from obspy import Trace
+from core.waveform_pyramid import WaveformPyramid, PyramidCache
+
+class TestWaveformPyramid(unittest.TestCase):
+    """Waveform Pyramid Tests"""
+
+    def setUp(self):
+        """Setup before test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'XF.H1090.evid.38307.mseed')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'waveform')
+        data = np.random.default_rng(0).normal(size=300001).astype(np.float32)
+        data[123457] = 25.0
+        self.trace = Trace(data)
+        self.trace.stats.sampling_rate = 100.0
+        self.cache = PyramidCache(os.path.join(self.temp_dir, 'cache'), min_samples=1000)
+
+    def tearDown(self):
+        """Cleanup after test"""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_levels(self):
+        """Test each level keeps the extremes of the level below"""
+        pyramid = WaveformPyramid.build(self.trace.data, 100.0, factor=4, min_bins=100)
+        self.assertEqual(len(pyramid.levels[0]), 75001)
+        for level in pyramid.levels:
+            self.assertEqual(level[:, 1].max(), 25.0)
+            self.assertEqual(level[:, 0].min(), self.trace.data.min())
+        self.assertGreaterEqual(len(pyramid.levels[-1]), 100)
+
+    def test_envelope(self):
+        """Test envelopes stay within one pixel and keep the spike"""
+        pyramid = WaveformPyramid.build(self.trace.data, 100.0, factor=4, min_bins=100)
+        times, values = pyramid.envelope(0.0, 3000.0, 500)
+        self.assertLessEqual(len(times), 2 * 502)
+        self.assertEqual(values.max(), 25.0)
+        self.assertAlmostEqual(times[values.argmax()], 1234.57, delta=3000.0 / 500)
+
+        # Zoomed in below the finest level, raw samples are used
+        times, values = pyramid.envelope(1234.0, 1235.0, 500)
+        self.assertAlmostEqual(times[values.argmax()], 1234.57)
+
+    def test_background_build_and_reload(self):
+        """Test a miss builds in the background and the next lookup hits the disk cache"""
+        built = []
+        self.assertIsNone(self.cache.get(self.file_path, self.trace, 'key', lambda path, p: built.append(p)))
+        self.cache.close()
+        self.assertEqual(len(built), 1)
+
+        pyramid = PyramidCache(self.cache.cache_dir).load(self.file_path, self.trace, 'key')
+        self.assertIsInstance(pyramid.levels[0], np.memmap)
+        self.assertEqual(pyramid.envelope(0.0, 3000.0, 500)[1].max(), 25.0)
+
+    def test_invalidated_by_settings(self):
+        """Test a different preprocessing key misses and replaces the old entry"""
+        pyramid = WaveformPyramid.build(self.trace.data, 100.0)
+        self.cache.store(self.file_path, pyramid, 'old')
+        self.assertIsNotNone(self.cache.load(self.file_path, self.trace, 'old'))
+        self.assertIsNone(self.cache.load(self.file_path, self.trace, 'new'))
+
+        self.cache.store(self.file_path, pyramid, 'new')
+        self.assertIsNone(self.cache.load(self.file_path, self.trace, 'old'))
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+
+if __name__ == '__main__':
+    unittest.main()